@@ -1,43 +1,223 @@
-from fastapi import APIRouter, Query, HTTPException
-from .data_loader import data_loader
+from fastapi import APIRouter, Query, HTTPException, Request, Response
+from . import config
+from .athlete_profiles import COLUMNS as PROFILE_COLUMNS, build_athlete_documents, encode_document, merge_documents
+from .biometrics import POINT_COLUMNS as BIOMETRIC_COLUMNS, bin_biometrics, sample_points, sample_positions
+from .data_loader import data_loader, MIXED_SEX
+from .disk_cache import DiskCache
+from .filters import Filters, normalize_value
+from .response_cache import ResponseCache, encode_json
+from pydantic import BaseModel
 import pandas as pd
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence
 
+import dataclasses
 import functools
+import hashlib
+import inspect
 import json
+import sqlite3
 
 # Cache em memória para respostas
-RESPONSE_CACHE = {}
+RESPONSE_CACHE = ResponseCache(config.RESPONSE_CACHE_MAX_BYTES, config.RESPONSE_CACHE_TTL or None)
+
+# Segundo nível em disco, compartilhado entre workers (desligado sem caminho)
+DISK_CACHE = DiskCache(config.DISK_CACHE_PATH) if config.DISK_CACHE_PATH else None
+
+# Respostas em memória vêm do banco anterior após uma troca do olympics.db;
+# o cache em disco já separa as entradas pela versão
+data_loader.on_reload(lambda version: RESPONSE_CACHE.clear())
 
 router = APIRouter()
 
+def _columnar_store():
+    """Retorna o motor colunar quando habilitado por configuração, senão None."""
+    if config.QUERY_ENGINE != "columnar":
+        return None
+    return data_loader.get_columnar_store()
+
+def _medal_cube():
+    """Retorna o cubo de medalhas quando habilitado por configuração, senão None."""
+    if not config.MEDAL_CUBE_ENABLED:
+        return None
+    return data_loader.get_medal_cube()
+
+def _athlete_tallies():
+    """Retorna os rankings de atletas por partição quando habilitados, senão None."""
+    if not config.ATHLETE_TALLIES_ENABLED:
+        return None
+    return data_loader.get_athlete_tallies()
+
+def _athlete_bitsets():
+    """Retorna os bitsets de atletas por partição quando habilitados, senão None."""
+    if not config.ATHLETE_BITSETS_ENABLED:
+        return None
+    return data_loader.get_athlete_bitsets()
+
+def _biometric_samples():
+    """Retorna as amostras de biometria por partição quando habilitadas, senão None."""
+    if not config.BIOMETRICS_SAMPLES_ENABLED:
+        return None
+    return data_loader.get_biometric_samples()
+
+# Parâmetros de filtro normalizados pela chave de cache
+FILTER_PARAMS = ("year", "start_year", "end_year", "season", "sex", "sport", "medal_type")
+
 def get_cache_key(func_name, kwargs):
-    """Gera chave única para cache baseada nos parâmetros."""
-    clean_kwargs = {k: v for k, v in kwargs.items() if v is not None}
-    serializable_kwargs = {}
-    for k, v in clean_kwargs.items():
+    """Gera chave canônica para cache baseada nos parâmetros.
+
+    Os filtros passam pela mesma normalização de `Filters`: valores neutros
+    ('Both', 'All', 'Total') e None somem, `year` vira o intervalo
+    `start_year`/`end_year` e listas são ordenadas sem repetição. Requisições
+    equivalentes compartilham a mesma entrada.
+    """
+    params = dict(kwargs)
+    filters = Filters.from_params(**{k: params.pop(k) for k in FILTER_PARAMS if k in params})
+    canonical = {k: v for k, v in dataclasses.asdict(filters).items() if v is not None}
+
+    country = normalize_value("country", params.pop("country", None))
+    if country:
+        canonical["country"] = country
+    for k, v in params.items():
         if isinstance(v, list):
-            serializable_kwargs[k] = sorted(v)
-        else:
-            serializable_kwargs[k] = v
-    return f"{func_name}:{json.dumps(serializable_kwargs, sort_keys=True)}"
+            if v:
+                canonical[k] = sorted(set(v))
+        elif v is not None:
+            canonical[k] = v
+    return f"{func_name}:{json.dumps(canonical, sort_keys=True)}"
+
+def make_etag(dataset_version: str, key: str) -> str:
+    """ETag forte derivado da versão do banco e da chave canônica."""
+    digest = hashlib.sha256(f"{dataset_version}|{key}".encode("utf-8")).hexdigest()[:32]
+    return f'"{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Indica se o cabeçalho If-None-Match contém o ETag (ou '*')."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in ("*", etag):
+            return True
+    return False
+
+def cached_endpoint(func=None, *, ttl: Optional[float] = None):
+    """Decorator para cachear respostas de endpoints.
+
+    O cache guarda o corpo JSON já serializado; um acerto devolve uma
+    `Response` com esses bytes, sem codificar o resultado de novo. Toda
+    resposta leva ETag e Cache-Control, e um If-None-Match igual ao ETag é
+    respondido com 304 antes de qualquer cálculo. Aceita
+    `@cached_endpoint` ou `@cached_endpoint(ttl=segundos)` para um
+    TTL próprio do endpoint; sem ele vale o TTL padrão do cache.
+
+    Com o cache em disco ligado, uma falha na memória consulta o disco antes
+    de calcular, e o corpo calculado é gravado lá para os outros workers.
+    """
+    if func is None:
+        return lambda f: cached_endpoint(f, ttl=ttl)
 
-def cached_endpoint(func):
-    """Decorator para cachear respostas de endpoints."""
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
+        request = kwargs.pop("request", None)
         key = get_cache_key(func.__name__, kwargs)
-        if key in RESPONSE_CACHE:
-            return RESPONSE_CACHE[key]
+        version = data_loader.get_dataset_version()
+        headers = {"ETag": make_etag(version, key)}
+        if config.HTTP_CACHE_CONTROL:
+            headers["Cache-Control"] = config.HTTP_CACHE_CONTROL
+        if request is not None and etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        def compute():
+            disk = DISK_CACHE
+            if disk is not None:
+                body = disk.get(version, key)
+                if body is not None:
+                    return body
+            body = encode_json(func(*args, **kwargs))
+            # Não grava sob a versão antiga um corpo calculado durante uma troca do banco
+            if disk is not None and version != "missing" and data_loader.get_dataset_version() == version:
+                disk.set(version, key, body)
+            return body
+
+        cached = RESPONSE_CACHE.get_or_compute(key, compute, ttl=ttl)
+        return Response(content=cached.body, media_type=cached.media_type, headers=headers)
+
+    # FastAPI injeta a requisição para a leitura do If-None-Match
+    signature = inspect.signature(func)
+    wrapper.__signature__ = signature.replace(parameters=[
+        *signature.parameters.values(),
+        inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+    ])
+    return wrapper
+
+def _map_payload(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Monta a resposta do mapa a partir de contagens (NOC, Medal, Count)."""
+    if df.empty:
+        return []
         
-        result = func(*args, **kwargs)
+    pivot = df.pivot(index='NOC', columns='Medal', values='Count').fillna(0)
+
+    for col in ['Gold', 'Silver', 'Bronze']:
+        if col not in pivot.columns:
+            pivot[col] = 0
+
+    pivot['Total'] = pivot['Gold'] + pivot['Silver'] + pivot['Bronze']
+
+    result = []
+    for noc, row in pivot.iterrows():
+        result.append({
+            "id": noc, 
+            "gold": int(row['Gold']),
+            "silver": int(row['Silver']),
+            "bronze": int(row['Bronze']),
+            "total": int(row['Total'])
+        })
         
-        if len(RESPONSE_CACHE) > 1000:
-            RESPONSE_CACHE.clear()
-            
-        RESPONSE_CACHE[key] = result
-        return result
-    return wrapper
+    return result
+
+def _medal_table_payload(df: pd.DataFrame, group_col: str) -> List[Dict[str, Any]]:
+    """Monta o quadro de medalhas a partir de contagens (Key, Medal, Count)."""
+    if df.empty:
+        return []
+        
+    pivot = df.pivot(index='Key', columns='Medal', values='Count').fillna(0)
+    
+    for col in ['Gold', 'Silver', 'Bronze']:
+        if col not in pivot.columns:
+            pivot[col] = 0
+            
+    pivot['Total'] = pivot['Gold'] + pivot['Silver'] + pivot['Bronze']
+    pivot = pivot.sort_values(by=['Gold', 'Silver', 'Bronze'], ascending=False)
+    
+    noc_map = {}
+    if group_col == 'NOC':
+        noc_map = data_loader.get_noc_map()
+        
+    result = []
+    for key, row in pivot.iterrows():
+        label = str(key)
+        if group_col == 'NOC':
+            label = noc_map.get(key, key)
+            
+        result.append({
+            "name": label,
+            "code": str(key), 
+            "gold": int(row['Gold']),
+            "silver": int(row['Silver']),
+            "bronze": int(row['Bronze']),
+            "total": int(row['Total'])
+        })
+    return result
+
+def _evolution_payload(df_evo: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Monta a série temporal a partir de contagens (Year, NOC, Medals)."""
+    if df_evo.empty: 
+        return []
+
+    pivot = df_evo.pivot(index='Year', columns='NOC', values='Medals').fillna(0).reset_index()
+    return pivot.to_dict(orient='records')
 
 @router.get("/filters")
 @cached_endpoint
@@ -83,66 +263,40 @@ def get_map_stats(
 ):
     """Retorna medalhas por país para o mapa."""
     try:
-        with data_loader.get_connection_context() as conn:
-            # Conta eventos distintos para evitar duplicação em esportes coletivos
-            query = """
+        filters = Filters.from_params(
+            year=year, start_year=start_year, end_year=end_year, season=season,
+            sex=sex, country=country, sport=sport
+        )
+        cube = _medal_cube()
+        store = _columnar_store() if cube is None else None
+        if cube is not None:
+            mask = filters.to_mask(cube, mixed_sex=cube.mixed_sex)
+            df = cube.totals(mask, ("NOC", "Medal"))
+        elif store is not None:
+            mask = filters.to_mask(store) & store.has_medal
+            df = store.distinct_count(
+                mask, ("Year", "Season", "NOC", "Event", "Medal"), ("NOC", "Medal")
+            )
+        else:
+            # medal_events conta cada evento uma vez (esportes coletivos)
+            where, params = filters.to_sql(mixed_sex=MIXED_SEX)
+            query = f"""
                 SELECT NOC, Medal, COUNT(*) as Count
-                FROM (
-                    SELECT DISTINCT Year, Season, NOC, Event, Medal
-                    FROM athletes
-                    WHERE Medal != 'No Medal'
+                FROM medal_events
+                {where}
+                GROUP BY NOC, Medal
             """
-            params = []
-            
-            if year:
-                query += " AND Year = ?"
-                params.append(year)
-            if start_year is not None and end_year is not None:
-                query += " AND Year >= ? AND Year <= ?"
-                params.extend([start_year, end_year])
-            if season and season != "Both":
-                query += " AND Season = ?"
-                params.append(season)
-            if sex and sex != "Both":
-                query += " AND Sex = ?"
-                params.append(sex)
-            if country and country != "All":
-                query += " AND NOC = ?"
-                params.append(country)
-            if sport and sport != "All":
-                query += " AND Sport = ?"
-                params.append(sport)
-
-            query += ") GROUP BY NOC, Medal"
-            
-            df = pd.read_sql_query(query, conn, params=params)
-            
-            if df.empty:
-                return []
-                
-            pivot = df.pivot(index='NOC', columns='Medal', values='Count').fillna(0)
-            
-            for col in ['Gold', 'Silver', 'Bronze']:
-                if col not in pivot.columns:
-                    pivot[col] = 0
-            
-            pivot['Total'] = pivot['Gold'] + pivot['Silver'] + pivot['Bronze']
+            with data_loader.get_connection_context() as conn:
+                df = pd.read_sql_query(query, conn, params=params)
             
-            result = []
-            for noc, row in pivot.iterrows():
-                result.append({
-                    "id": noc, 
-                    "gold": int(row['Gold']),
-                    "silver": int(row['Silver']),
-                    "bronze": int(row['Bronze']),
-                    "total": int(row['Total'])
-                })
-                
-            return result
+        return _map_payload(df)
     except Exception as e:
         print(f"Erro map stats: {e}")
         return []
 
+# Atletas distintos por sexo no banco inteiro, gerado pelo conversor
+SEX_COUNTS_SQL = "SELECT Sex, Count FROM athlete_sex_counts ORDER BY Sex"
+
 @router.get("/stats/gender")
 @cached_endpoint
 def get_gender_stats(
@@ -157,45 +311,39 @@ def get_gender_stats(
 ):
     """Retorna distribuição de atletas por gênero."""
     try:
-        with data_loader.get_connection_context() as conn:
-            query = """
+        filters = Filters.from_params(
+            year=year, start_year=start_year, end_year=end_year, season=season,
+            sex=sex, country=country, sport=sport, medal_type=medal_type
+        )
+        bitsets = _athlete_bitsets()
+        store = _columnar_store() if bitsets is None else None
+        if bitsets is not None:
+            df = bitsets.distinct_count(filters, by="Sex")
+        elif store is not None:
+            df = store.distinct_count(filters.to_mask(store), ("Sex", "ID"), ("Sex",))
+        else:
+            where, params = filters.to_sql()
+            query = f"""
                 SELECT Sex, COUNT(DISTINCT ID) as Count
                 FROM athletes
-                WHERE 1=1
+                {where}
+                GROUP BY Sex
             """
-            params = []
-            
-            if year:
-                query += " AND Year = ?"
-                params.append(year)
-            if start_year is not None and end_year is not None:
-                query += " AND Year >= ? AND Year <= ?"
-                params.extend([start_year, end_year])
-            if season and season != "Both":
-                query += " AND Season = ?"
-                params.append(season)
-            if sex and sex != "Both":
-                query += " AND Sex = ?"
-                params.append(sex)
-            if country and country != "All":
-                query += " AND NOC = ?"
-                params.append(country)
-            if sport and sport != "All":
-                query += " AND Sport = ?"
-                params.append(sport)
-            
-            if medal_type and medal_type != "Total":
-                query += " AND Medal = ?"
-                params.append(medal_type)
-            
-            query += " GROUP BY Sex"
-            
-            df = pd.read_sql_query(query, conn, params=params)
-            
-            if df.empty:
-                return []
-                
-            return df.to_dict(orient='records')
+            with data_loader.get_connection_context() as conn:
+                df = None
+                if filters == Filters():
+                    # Sem filtros, a contagem vem pronta do conversor (athlete_sex_counts)
+                    try:
+                        df = pd.DataFrame(conn.execute(SEX_COUNTS_SQL).fetchall(), columns=["Sex", "Count"])
+                    except sqlite3.OperationalError:
+                        pass
+                if df is None:
+                    df = pd.read_sql_query(query, conn, params=params)
+            
+        if df.empty:
+            return []
+            
+        return df.to_dict(orient='records')
             
     except Exception as e:
         print(f"Erro gender stats: {e}")
@@ -206,48 +354,88 @@ def get_gender_stats(
 def get_biometrics(
     sport: Optional[str] = "All", 
     year: Optional[int] = None,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
     season: Optional[str] = None,
     sex: Optional[str] = None,
-    country: Optional[str] = None
+    country: Optional[str] = None,
+    mode: str = Query("points", pattern="^(points|bins)$", description="points (atletas) ou bins (grade altura x peso)"),
+    height_bin: Optional[float] = Query(None, gt=0, le=50, description="Largura das faixas de altura em cm (mode=bins)"),
+    weight_bin: Optional[float] = Query(None, gt=0, le=50, description="Largura das faixas de peso em kg (mode=bins)"),
+    sample_size: Optional[int] = Query(
+        None, ge=1, le=config.BIOMETRICS_SAMPLE_MAX, description="Pontos da amostra (mode=points)"
+    ),
 ):
-    """Retorna dados de altura e peso dos atletas."""
+    """Retorna dados de altura e peso dos atletas.
+
+    Com mode=points, devolve uma amostra estratificada por sexo e medalha,
+    sempre a mesma para o mesmo filtro, e a população que ela representa.
+    Com mode=bins, agrega todas as linhas filtradas em uma grade de altura x
+    peso, com contagens e medalhas por célula.
+    """
+    height_bin = height_bin or config.BIOMETRICS_HEIGHT_BIN
+    weight_bin = weight_bin or config.BIOMETRICS_WEIGHT_BIN
     try:
-        with data_loader.get_connection_context() as conn:
-            query = """
-                SELECT Name, Sex, Height, Weight, Medal, NOC, Year, Sport
-                FROM athletes
-                WHERE Height IS NOT NULL AND Weight IS NOT NULL
-            """
-            params = []
-            
-            if year:
-                query += " AND Year = ?"
-                params.append(year)
-            if season and season != "Both":
-                query += " AND Season = ?"
-                params.append(season)
-            if sex and sex != "Both":
-                query += " AND Sex = ?"
-                params.append(sex)
-            if country and country != "All":
-                query += " AND NOC = ?"
-                params.append(country)
-            if sport and sport != "All":
-                query += " AND Sport = ?"
-                params.append(sport)
-            
-            query += " LIMIT 2000"
-            
-            df = pd.read_sql_query(query, conn, params=params)
-            
-            if df.empty:
-                return []
-                
-            return df.to_dict(orient='records')
+        filters = Filters.from_params(
+            year=year, start_year=start_year, end_year=end_year, season=season,
+            sex=sex, country=country, sport=sport
+        )
+        if mode == "bins":
+            return _biometric_bins(filters, height_bin, weight_bin)
+        return _biometric_points(filters, sample_size or config.BIOMETRICS_SAMPLE_SIZE)
             
     except Exception as e:
         print(f"Erro biometrics: {e}")
-        return []
+        if mode == "bins":
+            return bin_biometrics(pd.DataFrame(columns=["Height", "Weight", "Medal"]), height_bin, weight_bin)
+        return {"population": 0, "points": []}
+
+# Parâmetros por consulta, abaixo do limite de 999 variáveis do SQLite anterior à 3.32
+SQL_MAX_PARAMS = 900
+
+def _biometric_points(filters: Filters, size: int, store=None) -> Dict[str, Any]:
+    """Amostra de pontos do filtro: listas prontas por partição, motor colunar ou SQL."""
+    samples = _biometric_samples()
+    if samples is not None:
+        return samples.sample(filters, size)
+    store = store or _columnar_store()
+    if store is not None:
+        mask = filters.to_mask(store) & store.has_biometrics
+        return sample_points(
+            store.rows(mask, BIOMETRIC_COLUMNS), store.rowids[mask], size, config.BIOMETRICS_SAMPLE_SEED
+        )
+    # Sorteio sobre (rowid, Sex, Medal), lidos do índice de biometria; só os pontos sorteados vêm da tabela
+    where, params = filters.to_sql(base=("Height IS NOT NULL", "Weight IS NOT NULL"))
+    with data_loader.get_connection_context() as conn:
+        population = pd.read_sql_query(f"SELECT rowid AS _rowid, Sex, Medal FROM athletes {where}", conn, params=params)
+        rowids = population["_rowid"].to_numpy()
+        picked = rowids[sample_positions(
+            population["Sex"].to_numpy(object), population["Medal"].to_numpy(object),
+            rowids, size, config.BIOMETRICS_SAMPLE_SEED,
+        )].tolist()
+        # Os rowids sorteados vêm em ordem; cada bloco mantém a ordem de rowid
+        points = []
+        for start in range(0, len(picked), SQL_MAX_PARAMS):
+            chunk = picked[start:start + SQL_MAX_PARAMS]
+            df = pd.read_sql_query(
+                f"SELECT {', '.join(BIOMETRIC_COLUMNS)} FROM athletes "
+                f"WHERE rowid IN ({', '.join('?' * len(chunk))}) ORDER BY rowid",
+                conn, params=chunk,
+            )
+            points.extend(df.to_dict(orient='records'))
+    return {"population": len(population), "points": points}
+
+def _biometric_bins(filters: Filters, height_bin: float, weight_bin: float) -> Dict[str, Any]:
+    """Grade de altura x peso sobre todas as linhas com biometria do filtro."""
+    columns = ["Height", "Weight", "Medal"]
+    store = _columnar_store()
+    if store is not None:
+        df = store.rows(filters.to_mask(store) & store.has_biometrics, columns)
+    else:
+        where, params = filters.to_sql(base=("Height IS NOT NULL", "Weight IS NOT NULL"))
+        with data_loader.get_connection_context() as conn:
+            df = pd.read_sql_query(f"SELECT {', '.join(columns)} FROM athletes {where}", conn, params=params)
+    return bin_biometrics(df, height_bin, weight_bin)
 
 @router.get("/stats/evolution")
 @cached_endpoint
@@ -260,69 +448,69 @@ def get_evolution(
 ):
     """Retorna evolução de medalhas ao longo dos anos."""
     try:
-        with data_loader.get_connection_context() as conn:
-            target_countries = []
-            if country and country != "All":
-                target_countries = [country]
-            elif countries:
-                target_countries = countries
-            
+        target_countries = []
+        if country and country != "All":
+            target_countries = [country]
+        elif countries:
+            target_countries = countries
+
+        filters = Filters.from_params(season=season, sex=sex, sport=sport)
+        cube = _medal_cube()
+        store = _columnar_store() if cube is None else None
+        if cube is not None:
             if not target_countries:
-                # Busca os 10 países com mais medalhas
-                base_query = """
-                    SELECT NOC, COUNT(*) as Medals 
-                    FROM (
-                        SELECT DISTINCT Year, Season, NOC, Event, Medal
-                        FROM athletes 
-                        WHERE Medal != 'No Medal'
-                """
-                params = []
-                if season and season != "Both":
-                    base_query += " AND Season = ?"
-                    params.append(season)
-                if sex and sex != "Both":
-                    base_query += " AND Sex = ?"
-                    params.append(sex)
-                if sport and sport != "All":
-                    base_query += " AND Sport = ?"
-                    params.append(sport)
-                
-                base_query += ") GROUP BY NOC ORDER BY Medals DESC LIMIT 10"
-                
-                df_top = pd.read_sql_query(base_query, conn, params=params)
-                if df_top.empty: 
+                df_top = cube.totals(filters.to_mask(cube, mixed_sex=cube.mixed_sex), ("NOC",))
+                if df_top.empty:
                     return []
+                df_top = df_top.sort_values('Count', ascending=False, kind='stable').head(10)
                 target_countries = df_top['NOC'].tolist()
 
-            # Busca evolução por ano
-            evo_query = f"""
-                SELECT Year, NOC, COUNT(*) as Medals
-                FROM (
-                    SELECT DISTINCT Year, Season, NOC, Event, Medal
-                    FROM athletes
-                    WHERE Medal != 'No Medal'
-                    AND NOC IN ({','.join(['?']*len(target_countries))})
-            """
-            evo_params = target_countries[:]
-            
-            if season and season != "Both":
-                evo_query += " AND Season = ?"
-                evo_params.append(season)
-            if sex and sex != "Both":
-                evo_query += " AND Sex = ?"
-                evo_params.append(sex)
-            if sport and sport != "All":
-                evo_query += " AND Sport = ?"
-                evo_params.append(sport)
-
-            evo_query += ") GROUP BY Year, NOC ORDER BY Year"
-            
-            df_evo = pd.read_sql_query(evo_query, conn, params=evo_params)
-            if df_evo.empty: 
-                return []
+            filters = dataclasses.replace(filters, countries=tuple(sorted(set(target_countries))))
+            mask = filters.to_mask(cube, mixed_sex=cube.mixed_sex)
+            df_evo = cube.totals(mask, ("Year", "NOC")).rename(columns={'Count': 'Medals'})
+        elif store is not None:
+            distinct = ("Year", "Season", "NOC", "Event", "Medal")
+            if not target_countries:
+                mask = filters.to_mask(store) & store.has_medal
+                df_top = store.distinct_count(mask, distinct, ("NOC",))
+                if df_top.empty:
+                    return []
+                df_top = df_top.sort_values('Count', ascending=False, kind='stable').head(10)
+                target_countries = df_top['NOC'].tolist()
+
+            filters = dataclasses.replace(filters, countries=tuple(sorted(set(target_countries))))
+            mask = filters.to_mask(store) & store.has_medal
+            df_evo = store.distinct_count(mask, distinct, ("Year", "NOC")).rename(
+                columns={'Count': 'Medals'}
+            )
+        else:
+            with data_loader.get_connection_context() as conn:
+                if not target_countries:
+                    # Busca os 10 países com mais medalhas
+                    where, params = filters.to_sql(mixed_sex=MIXED_SEX)
+                    base_query = f"""
+                        SELECT NOC, COUNT(*) as Medals 
+                        FROM medal_events
+                        {where}
+                        GROUP BY NOC ORDER BY Medals DESC, NOC LIMIT 10
+                    """
+                    df_top = pd.read_sql_query(base_query, conn, params=params)
+                    if df_top.empty: 
+                        return []
+                    target_countries = df_top['NOC'].tolist()
+
+                # Busca evolução por ano
+                filters = dataclasses.replace(filters, countries=tuple(sorted(set(target_countries))))
+                where, evo_params = filters.to_sql(mixed_sex=MIXED_SEX)
+                evo_query = f"""
+                    SELECT Year, NOC, COUNT(*) as Medals
+                    FROM medal_events
+                    {where}
+                    GROUP BY Year, NOC ORDER BY Year
+                """
+                df_evo = pd.read_sql_query(evo_query, conn, params=evo_params)
 
-            pivot = df_evo.pivot(index='Year', columns='NOC', values='Medals').fillna(0).reset_index()
-            return pivot.to_dict(orient='records')
+        return _evolution_payload(df_evo)
             
     except Exception as e:
         print(f"Erro em evolution: {e}")
@@ -332,6 +520,8 @@ def get_evolution(
 @cached_endpoint
 def get_medal_table(
     year: Optional[int] = None, 
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
     season: Optional[str] = None, 
     sex: Optional[str] = None,
     country: Optional[str] = None,
@@ -339,70 +529,35 @@ def get_medal_table(
 ):
     """Retorna quadro de medalhas."""
     try:
-        with data_loader.get_connection_context() as conn:
-            # Agrupa por esporte se país específico, senão por país
-            group_col = 'Sport' if (country and country != "All") else 'NOC'
-            
+        filters = Filters.from_params(
+            year=year, start_year=start_year, end_year=end_year, season=season,
+            sex=sex, country=country, sport=sport
+        )
+        # Agrupa por esporte se país específico, senão por país
+        group_col = 'Sport' if (country and country != "All") else 'NOC'
+
+        cube = _medal_cube()
+        store = _columnar_store() if cube is None else None
+        if cube is not None:
+            mask = filters.to_mask(cube, mixed_sex=cube.mixed_sex)
+            df = cube.totals(mask, (group_col, "Medal")).rename(columns={group_col: 'Key'})
+        elif store is not None:
+            mask = filters.to_mask(store) & store.has_medal
+            df = store.distinct_count(
+                mask, ("Year", "Season", "NOC", "Sport", "Event", "Medal"), (group_col, "Medal")
+            ).rename(columns={group_col: 'Key'})
+        else:
+            where, params = filters.to_sql(mixed_sex=MIXED_SEX)
             query = f"""
                 SELECT {group_col} as Key, Medal, COUNT(*) as Count
-                FROM (
-                    SELECT DISTINCT Year, Season, NOC, Sport, Event, Medal
-                    FROM athletes
-                    WHERE Medal != 'No Medal'
+                FROM medal_events
+                {where}
+                GROUP BY {group_col}, Medal
             """
-            params = []
-            
-            if year:
-                query += " AND Year = ?"
-                params.append(year)
-            if season and season != "Both":
-                query += " AND Season = ?"
-                params.append(season)
-            if sex and sex != "Both":
-                query += " AND Sex = ?"
-                params.append(sex)
-            if country and country != "All":
-                query += " AND NOC = ?"
-                params.append(country)
-            if sport and sport != "All":
-                query += " AND Sport = ?"
-                params.append(sport)
-                
-            query += f") GROUP BY {group_col}, Medal"
-            
-            df = pd.read_sql_query(query, conn, params=params)
-            
-            if df.empty:
-                return []
-                
-            pivot = df.pivot(index='Key', columns='Medal', values='Count').fillna(0)
-            
-            for col in ['Gold', 'Silver', 'Bronze']:
-                if col not in pivot.columns:
-                    pivot[col] = 0
-                    
-            pivot['Total'] = pivot['Gold'] + pivot['Silver'] + pivot['Bronze']
-            pivot = pivot.sort_values(by=['Gold', 'Silver', 'Bronze'], ascending=False)
+            with data_loader.get_connection_context() as conn:
+                df = pd.read_sql_query(query, conn, params=params)
             
-            noc_map = {}
-            if group_col == 'NOC':
-                noc_map = data_loader.get_noc_map()
-                
-            result = []
-            for key, row in pivot.iterrows():
-                label = str(key)
-                if group_col == 'NOC':
-                    label = noc_map.get(key, key)
-                    
-                result.append({
-                    "name": label,
-                    "code": str(key), 
-                    "gold": int(row['Gold']),
-                    "silver": int(row['Silver']),
-                    "bronze": int(row['Bronze']),
-                    "total": int(row['Total'])
-                })
-            return result
+        return _medal_table_payload(df, group_col)
     except Exception as e:
         print(f"Erro medal table: {e}")
         return []
@@ -422,144 +577,273 @@ def get_top_athletes(
 ):
     """Retorna ranking dos atletas mais medalhistas."""
     try:
-        with data_loader.get_connection_context() as conn:
-            query = """
+        filters = Filters.from_params(
+            year=year, start_year=start_year, end_year=end_year, season=season,
+            sex=sex, country=country, sport=sport, medal_type=medal_type
+        )
+        sort_col = filters.medal_type.lower() if filters.medal_type else 'total'
+
+        tallies = _athlete_tallies()
+        store = _columnar_store() if tallies is None else None
+        if tallies is not None:
+            df = tallies.top(filters, sort_col, limit)
+        elif store is not None:
+            mask = filters.to_mask(store) & store.has_medal
+            df = store.medal_tally(mask, sort_col, limit)
+        else:
+            where, params = filters.to_sql()
+            query = f"""
                 SELECT ID as id, Name as name, NOC as noc,
                     SUM(CASE WHEN Medal = 'Gold' THEN 1 ELSE 0 END) as gold,
                     SUM(CASE WHEN Medal = 'Silver' THEN 1 ELSE 0 END) as silver,
                     SUM(CASE WHEN Medal = 'Bronze' THEN 1 ELSE 0 END) as bronze,
                     COUNT(*) as total
-                FROM (
-                    SELECT DISTINCT ID, Name, NOC, Year, Season, Event, Medal
-                    FROM athletes
-                    WHERE Medal != 'No Medal'
+                FROM athlete_medals
+                {where}
+                GROUP BY ID, Name, NOC
+                ORDER BY {sort_col} DESC, id, name, noc LIMIT ?
             """
-            params = []
-            
-            if year:
-                query += " AND Year = ?"
-                params.append(year)
-            if start_year is not None and end_year is not None:
-                query += " AND Year >= ? AND Year <= ?"
-                params.extend([start_year, end_year])
-            if season and season != "Both":
-                query += " AND Season = ?"
-                params.append(season)
-            if sex and sex != "Both":
-                query += " AND Sex = ?"
-                params.append(sex)
-            if country and country != "All":
-                query += " AND NOC = ?"
-                params.append(country)
-            if sport and sport != "All":
-                query += " AND Sport = ?"
-                params.append(sport)
-            
-            if medal_type and medal_type != "Total":
-                query += " AND Medal = ?"
-                params.append(medal_type)
-
-            query += ") GROUP BY ID, Name, NOC"
-            
-            sort_col = medal_type.lower() if medal_type and medal_type != "Total" else 'total'
-            query += f" ORDER BY {sort_col} DESC LIMIT ?"
             params.append(limit)
+            with data_loader.get_connection_context() as conn:
+                df = pd.read_sql_query(query, conn, params=params)
             
-            df = pd.read_sql_query(query, conn, params=params)
-            
-            return df.to_dict(orient='records')
+        return df.to_dict(orient='records')
             
     except Exception as e:
         print(f"Erro top athletes: {e}")
         return []
 
+@router.get("/stats/dashboard")
+@cached_endpoint
+def get_dashboard(
+    year: Optional[int] = None,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    season: Optional[str] = None,
+    sex: Optional[str] = None,
+    country: Optional[str] = None,
+    sport: Optional[str] = None,
+    medal_type: Optional[str] = None,
+    countries: Optional[List[str]] = Query(None),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """Retorna os dados de todos os gráficos do painel para um mesmo filtro.
+
+    Cada chave tem o mesmo formato do endpoint individual correspondente.
+    Os eventos medalhados do filtro são lidos uma única vez (ou vêm do cubo
+    em memória). Gênero, ranking e biometria vêm dos bitsets, rankings e
+    amostras prontos; as linhas de atletas do filtro só são lidas, uma
+    única vez, quando algum deles está desligado e não há motor colunar.
+    """
+    try:
+        filters = Filters.from_params(
+            year=year, start_year=start_year, end_year=end_year, season=season,
+            sex=sex, country=country, sport=sport, medal_type=medal_type
+        )
+        # Mapa, quadro e biometria ignoram o tipo de medalha; a evolução cobre todos os anos e países
+        athlete_filters = dataclasses.replace(filters, medal_type=None)
+        evolution_filters = Filters.from_params(season=season, sex=sex, sport=sport)
+
+        cube = _medal_cube() or data_loader.load_medal_events_slice(evolution_filters)
+        tallies = _athlete_tallies()
+        bitsets = _athlete_bitsets()
+        samples = _biometric_samples()
+        store = _columnar_store()
+
+        def athletes():
+            """Motor colunar ou recorte de atletas do filtro, lido só na primeira chamada."""
+            nonlocal store
+            if store is None:
+                store = data_loader.load_athletes_slice(athlete_filters)
+            return store
+
+        mask = athlete_filters.to_mask(cube, mixed_sex=cube.mixed_sex)
+        group_col = 'Sport' if (country and country != "All") else 'NOC'
+        medals = cube.totals(mask, (group_col, "Medal")).rename(columns={group_col: 'Key'})
+
+        target_countries = [country] if country and country != "All" else countries
+        if not target_countries:
+            df_top = cube.totals(evolution_filters.to_mask(cube, mixed_sex=cube.mixed_sex), ("NOC",))
+            df_top = df_top.sort_values('Count', ascending=False, kind='stable').head(10)
+            target_countries = df_top['NOC'].tolist()
+        evolution_mask = dataclasses.replace(
+            evolution_filters, countries=tuple(sorted(set(target_countries)))
+        ).to_mask(cube, mixed_sex=cube.mixed_sex)
+        evolution = cube.totals(evolution_mask, ("Year", "NOC")).rename(columns={'Count': 'Medals'})
+
+        sort_col = filters.medal_type.lower() if filters.medal_type else 'total'
+        biometrics = _biometric_points(
+            athlete_filters, config.BIOMETRICS_SAMPLE_SIZE, athletes() if samples is None else None
+        )
+
+        return {
+            "map": _map_payload(cube.totals(mask, ("NOC", "Medal"))),
+            "medals": _medal_table_payload(medals, group_col),
+            "evolution": _evolution_payload(evolution),
+            "gender": (
+                bitsets.distinct_count(filters, by="Sex") if bitsets is not None
+                else athletes().distinct_count(filters.to_mask(athletes()), ("Sex", "ID"), ("Sex",))
+            ).to_dict(orient='records'),
+            "top_athletes": (
+                tallies.top(filters, sort_col, limit) if tallies is not None
+                else athletes().medal_tally(filters.to_mask(athletes()) & athletes().has_medal, sort_col, limit)
+            ).to_dict(orient='records'),
+            "biometrics": biometrics,
+        }
+    except Exception as e:
+        print(f"Erro dashboard: {e}")
+        return {key: [] for key in ("map", "medals", "evolution", "gender", "top_athletes", "biometrics")}
+
+# Busca por nome: prefixos primeiro, depois ordem alfabética
+SEARCH_SQL = """
+SELECT {columns}
+FROM {table}
+WHERE Name LIKE ?
+ORDER BY Name LIKE ? DESC, Name, ID
+LIMIT ?
+"""
+
 @router.get("/athletes/search")
 def search_athletes(
     query: str = Query(..., min_length=2, description="Nome do atleta"),
-    limit: int = Query(20, ge=1, le=100)
+    limit: int = Query(20, ge=1, le=100),
+    fuzzy: bool = Query(False, description="Completa com nomes parecidos (erros de digitação)"),
+    max_distance: Optional[int] = Query(None, ge=0, le=3, description="Edições toleradas por palavra na busca aproximada"),
 ):
-    """Busca atletas pelo nome."""
+    """Busca atletas pelo nome.
+
+    Com o índice em memória (padrão), a busca ignora acentos e maiúsculas
+    e ordena por nome igual ao termo, prefixo, trecho e ordem alfabética.
+    Sem ele, termos com 3 ou mais caracteres usam o índice FTS5 trigram
+    gerado pelo conversor (athlete_search); termos mais curtos e bancos sem
+    o índice varrem o índice de nomes de athletes, com prefixos primeiro.
+
+    Com `fuzzy=true` (só no índice em memória), as vagas restantes recebem
+    os nomes cujas palavras estão a poucas edições das palavras buscadas,
+    do mais próximo ao mais distante.
+    """
+    if max_distance is None:
+        max_distance = config.SEARCH_FUZZY_MAX_DISTANCE
     try:
+        if config.SEARCH_INDEX_ENABLED:
+            rows = data_loader.get_search_index().search(query, limit, fuzzy=fuzzy, max_distance=max_distance)
+            return [
+                {"id": athlete_id, "name": name, "noc": noc, "sport": sport}
+                for athlete_id, name, noc, sport in rows
+            ]
+
         with data_loader.get_connection_context() as conn:
-            sql = """
-            SELECT DISTINCT ID, Name, NOC, Sport 
-            FROM athletes 
-            WHERE Name LIKE ? 
-            LIMIT ?
-            """
-            search_param = f"%{query}%"
-            df = pd.read_sql_query(sql, conn, params=[search_param, limit*2])
-            
-            if df.empty:
-                return []
-            
-            # Prioriza nomes que começam com o termo buscado
-            df['starts_with'] = df['Name'].str.lower().str.startswith(query.lower())
-            df = df.sort_values(['starts_with', 'Name'], ascending=[False, True]).head(limit)
-            
-            results = []
-            for _, row in df.iterrows():
-                results.append({
-                    "id": int(row['ID']),
-                    "name": row['Name'],
-                    "noc": row['NOC'],
-                    "sport": row['Sport']
-                })
-            return results
+            params = [f"%{query}%", f"{query}%", limit]
+            rows = None
+            if len(query) >= 3:
+                try:
+                    rows = conn.execute(SEARCH_SQL.format(columns="ID, Name, NOC, Sport", table="athlete_search"), params).fetchall()
+                except sqlite3.OperationalError:
+                    pass
+            if rows is None:
+                rows = conn.execute(SEARCH_SQL.format(columns="DISTINCT ID, Name, NOC, Sport", table="athletes"), params).fetchall()
+        return [
+            {"id": int(athlete_id), "name": name, "noc": noc, "sport": sport}
+            for athlete_id, name, noc, sport in rows
+        ]
     except Exception as e:
         print(f"Erro na busca: {e}")
         return []
 
+# Documentos prontos gerados pelo conversor (athlete_profiles)
+PROFILE_SQL = "SELECT ID, {columns} FROM athlete_profiles WHERE ID IN ({placeholders})"
+
+# Documentos que compõem a resposta de /athletes/{id}/full
+ATHLETE_DOCUMENTS = ("profile", "stats")
+
+class AthleteBatchRequest(BaseModel):
+    """Corpo de POST /athletes/batch."""
+    ids: List[int]
+
+def _athlete_documents(athlete_ids: Sequence[int], columns: Sequence[str]) -> Dict[int, List[bytes]]:
+    """Retorna os documentos pedidos ('profile', 'stats') dos atletas, codificados.
+
+    Com a tabela athlete_profiles, é uma consulta pela chave primária que
+    devolve os bytes guardados. Bancos gerados antes dela leem as linhas dos
+    atletas de uma vez e montam os documentos juntos. Atletas inexistentes
+    ficam de fora do dicionário. Os IDs vão em blocos de até SQL_MAX_PARAMS.
+    """
+    athlete_ids = list(athlete_ids)
+    chunks = [athlete_ids[start:start + SQL_MAX_PARAMS] for start in range(0, len(athlete_ids), SQL_MAX_PARAMS)]
+    with data_loader.get_connection_context() as conn:
+        try:
+            rows = [
+                row for chunk in chunks
+                for row in conn.execute(
+                    PROFILE_SQL.format(columns=", ".join(columns), placeholders=", ".join("?" * len(chunk))), chunk
+                ).fetchall()
+            ]
+        except sqlite3.OperationalError:
+            athlete_data = pd.concat([
+                pd.read_sql_query(
+                    f"SELECT {', '.join(PROFILE_COLUMNS)} FROM athletes WHERE ID IN ({', '.join('?' * len(chunk))})",
+                    conn, params=chunk,
+                )
+                for chunk in chunks
+            ], ignore_index=True)
+        else:
+            return {row[0]: [bytes(body) for body in row[1:]] for row in rows}
+
+    documents = {}
+    for athlete_id, profile, stats in build_athlete_documents(athlete_data):
+        built = {"profile": profile, "stats": stats}
+        documents[athlete_id] = [encode_document(built[column]) for column in columns]
+    return documents
+
+def _athlete_response(athlete_id: int, columns: Sequence[str]):
+    """Responde com a união dos documentos pedidos, ou o erro de atleta inexistente."""
+    documents = _athlete_documents([athlete_id], columns).get(athlete_id)
+    if documents is None:
+        return {"error": "Atleta não encontrado"}
+    return Response(content=merge_documents(documents), media_type="application/json")
+
+@router.post("/athletes/batch")
+def get_athletes_batch(batch: AthleteBatchRequest):
+    """Retorna os perfis de vários atletas, indexados pelo ID.
+
+    Cada perfil tem o formato de `/athletes/{id}`; IDs repetidos contam uma
+    vez e IDs inexistentes ficam de fora. Todos vêm de uma única consulta
+    (ou de uma por bloco de SQL_MAX_PARAMS IDs, em lotes maiores).
+    """
+    athlete_ids = list(dict.fromkeys(batch.ids))
+    if len(athlete_ids) > config.ATHLETE_BATCH_MAX_IDS:
+        raise HTTPException(status_code=422, detail=f"Máximo de {config.ATHLETE_BATCH_MAX_IDS} IDs por requisição")
+    if not athlete_ids:
+        return {}
+    try:
+        documents = _athlete_documents(athlete_ids, ("profile",))
+    except Exception as e:
+        print(f"Erro nos perfis: {e}")
+        return {}
+    body = b",".join(
+        b'"%d":%s' % (athlete_id, documents[athlete_id][0])
+        for athlete_id in athlete_ids if athlete_id in documents
+    )
+    return Response(content=b"{" + body + b"}", media_type="application/json")
+
+@router.get("/athletes/{athlete_id}/full")
+def get_athlete_full(athlete_id: int):
+    """Retorna perfil e estatísticas de um atleta em um único objeto.
+
+    Junta os campos de `/athletes/{id}` e `/athletes/{id}/stats`, que são
+    recortes deste documento.
+    """
+    try:
+        return _athlete_response(athlete_id, ATHLETE_DOCUMENTS)
+    except Exception as e:
+        print(f"Erro no perfil: {e}")
+        return {"error": "Erro ao buscar dados"}
+
 @router.get("/athletes/{athlete_id}")
 def get_athlete_profile(athlete_id: int):
     """Retorna perfil completo de um atleta."""
     try:
-        with data_loader.get_connection_context() as conn:
-            query = "SELECT * FROM athletes WHERE ID = ?"
-            athlete_data = pd.read_sql_query(query, conn, params=[athlete_id])
-            
-        if athlete_data.empty:
-            return {"error": "Atleta não encontrado"}
-        
-        latest = athlete_data.sort_values('Year', ascending=False).iloc[0]
-        participations = []
-        for _, row in athlete_data.iterrows():
-            participations.append({
-                "year": int(row['Year']),
-                "season": row['Season'],
-                "city": row['City'] if pd.notna(row['City']) else None,
-                "sport": row['Sport'],
-                "event": row['Event'],
-                "medal": row['Medal'] if row['Medal'] != 'No Medal' else None
-            })
-        
-        participations.sort(key=lambda x: x['year'])
-        medals = athlete_data[athlete_data['Medal'] != 'No Medal']['Medal'].value_counts().to_dict()
-        sports = athlete_data['Sport'].unique().tolist()
-        years = sorted(athlete_data['Year'].unique().tolist())
-        
-        return {
-            "id": athlete_id,
-            "name": latest['Name'],
-            "sex": latest['Sex'],
-            "noc": latest['NOC'],
-            "team": latest['Team'] if pd.notna(latest['Team']) else latest['NOC'],
-            "height": float(latest['Height']) if pd.notna(latest['Height']) else None,
-            "weight": float(latest['Weight']) if pd.notna(latest['Weight']) else None,
-            "age_range": {
-                "min": int(athlete_data['Age'].min()) if pd.notna(athlete_data['Age'].min()) else None,
-                "max": int(athlete_data['Age'].max()) if pd.notna(athlete_data['Age'].max()) else None
-            },
-            "sports": sports,
-            "years": years,
-            "medals": {
-                "gold": int(medals.get('Gold', 0)),
-                "silver": int(medals.get('Silver', 0)),
-                "bronze": int(medals.get('Bronze', 0)),
-                "total": sum(medals.values())
-            },
-            "participations": participations
-        }
+        return _athlete_response(athlete_id, ("profile",))
     except Exception as e:
         print(f"Erro no perfil: {e}")
         return {"error": "Erro ao buscar dados"}
@@ -568,52 +852,6 @@ def get_athlete_profile(athlete_id: int):
 def get_athlete_stats(athlete_id: int):
     """Retorna estatísticas detalhadas de um atleta."""
     try:
-        with data_loader.get_connection_context() as conn:
-            query = "SELECT * FROM athletes WHERE ID = ?"
-            athlete_data = pd.read_sql_query(query, conn, params=[athlete_id])
-            
-        if athlete_data.empty:
-            return {"error": "Atleta não encontrado"}
-        
-        evolution = []
-        for year in sorted(athlete_data['Year'].unique()):
-            year_data = athlete_data[athlete_data['Year'] == year]
-            medals = year_data[year_data['Medal'] != 'No Medal']['Medal'].value_counts().to_dict()
-            evolution.append({
-                "Year": int(year),
-                "Gold": int(medals.get('Gold', 0)),
-                "Silver": int(medals.get('Silver', 0)),
-                "Bronze": int(medals.get('Bronze', 0)),
-                "Total": sum(medals.values()),
-                "Events": len(year_data)
-            })
-        
-        latest = athlete_data.sort_values('Year', ascending=False).iloc[0]
-        biometrics = {
-            "height": float(latest['Height']) if pd.notna(latest['Height']) else None,
-            "weight": float(latest['Weight']) if pd.notna(latest['Weight']) else None,
-            "sex": latest['Sex']
-        }
-        
-        medals_by_sport = []
-        for sport in athlete_data['Sport'].unique():
-            sport_data = athlete_data[athlete_data['Sport'] == sport]
-            medals = sport_data[sport_data['Medal'] != 'No Medal']['Medal'].value_counts().to_dict()
-            medals_by_sport.append({
-                "name": sport,
-                "code": sport,
-                "gold": int(medals.get('Gold', 0)),
-                "silver": int(medals.get('Silver', 0)),
-                "bronze": int(medals.get('Bronze', 0)),
-                "total": sum(medals.values())
-            })
-        
-        medals_by_sport.sort(key=lambda x: x['total'], reverse=True)
-        
-        return {
-            "evolution": evolution,
-            "biometrics": biometrics,
-            "medals_by_sport": medals_by_sport
-        }
+        return _athlete_response(athlete_id, ("stats",))
     except Exception as e:
         return {"error": str(e)}
@@ -0,0 +1,127 @@
+"""Conjuntos de atletas por partição, em bitsets de uint64 compactados."""
+import sqlite3
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .filters import Filters
+
+# Dimensões das partições; cobrem todos os filtros de `Filters`
+PARTITION_DIMENSIONS = ("Year", "Season", "Sex", "NOC", "Sport", "Medal")
+
+# Lido do índice idx_athletes_games, que cobre exatamente essas colunas
+BITSETS_SQL = """
+SELECT DISTINCT Year, Season, Sex, NOC, Sport, Medal, ID
+FROM athletes
+"""
+
+# Bits ligados em cada valor de byte, para NumPy sem np.bitwise_count
+_BYTE_COUNTS = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """Quantidade de bits ligados em cada palavra uint64."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).astype(np.int64)
+    return _popcount_table(words)
+
+
+def _popcount_table(words: np.ndarray) -> np.ndarray:
+    return _BYTE_COUNTS[np.ascontiguousarray(words, dtype=np.uint64).view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+class AthleteBitsets:
+    """IDs de atletas de cada partição (Year, Season, Sex, NOC, Sport, Medal).
+
+    Cada atleta recebe um código denso, em ordem de (NOC, Sport, ID) da sua
+    primeira linha, e cada partição guarda só as palavras de 64 bits não
+    nulas do seu bitset. Atletas de um país e esporte ficam em códigos
+    vizinhos, então uma partição ocupa poucas palavras. Contar atletas
+    distintos de um filtro é um OR das palavras das partições selecionadas,
+    agrupadas pela posição, seguido de um popcount.
+    """
+
+    def __init__(self, rows: pd.DataFrame):
+        rows = rows.reset_index(drop=True)
+        ids = rows["ID"].to_numpy(np.int64)
+        first = rows.drop_duplicates("ID").sort_values(["NOC", "Sport", "ID"], kind="stable")
+        self.ids = np.sort(first["ID"].to_numpy(np.int64))
+        codes = np.empty(len(self.ids), dtype=np.int64)
+        codes[np.searchsorted(self.ids, first["ID"].to_numpy(np.int64))] = np.arange(len(first))
+        athlete = codes[np.searchsorted(self.ids, ids)]
+        self.n_words = (len(self.ids) + 63) // 64
+
+        partition = rows.groupby(list(PARTITION_DIMENSIONS), sort=True, dropna=False).ngroup().to_numpy(np.int64)
+        n_partitions = int(partition.max()) + 1 if len(rows) else 0
+        heads = np.zeros(n_partitions, dtype=np.int64)
+        heads[partition[::-1]] = np.arange(len(rows))[::-1]
+        self.years = rows["Year"].to_numpy(np.int64)[heads]
+        self.codes: Dict[str, np.ndarray] = {}
+        self.categories: Dict[str, np.ndarray] = {}
+        for dim in ("Season", "Sex", "NOC", "Sport", "Medal"):
+            codes, uniques = pd.factorize(rows[dim].iloc[heads], sort=True)
+            self.codes[dim] = codes
+            self.categories[dim] = np.asarray(uniques, dtype=object)
+        self.codes["Year"], uniques = pd.factorize(self.years, sort=True)
+        self.categories["Year"] = np.asarray(uniques, dtype=np.int64)
+
+        # Palavras não nulas de cada partição, em ordem de (partição, posição)
+        bits = np.left_shift(np.uint64(1), (athlete & 63).astype(np.uint64))
+        keys, words = self._or_words(partition * self.n_words + (athlete >> 6), bits)
+        self.word_partition = keys // max(self.n_words, 1)
+        self.word_index = keys % max(self.n_words, 1)
+        self.word_bits = words
+
+    @classmethod
+    def from_connection(cls, conn: sqlite3.Connection) -> "AthleteBitsets":
+        """Lê as combinações distintas de partição e atleta da tabela athletes."""
+        return cls(pd.read_sql_query(BITSETS_SQL, conn))
+
+    def __len__(self) -> int:
+        return len(self.years)
+
+    def isin(self, dim: str, values) -> np.ndarray:
+        """Máscara das partições cujo valor da dimensão está em `values`."""
+        categories = self.categories[dim]
+        positions = np.searchsorted(categories, values)
+        codes = [
+            int(pos) for pos, value in zip(positions, values)
+            if pos < len(categories) and categories[pos] == value
+        ]
+        return np.isin(self.codes[dim], codes)
+
+    @staticmethod
+    def _or_words(keys: np.ndarray, bits: np.ndarray):
+        """OR das palavras com a mesma chave; devolve as chaves ordenadas e as palavras."""
+        if not len(keys):
+            return keys, bits
+        order = np.argsort(keys, kind="stable")
+        unique, starts = np.unique(keys[order], return_index=True)
+        return unique, np.bitwise_or.reduceat(bits[order], starts)
+
+    def distinct_count(self, filters: Filters, by: Optional[str] = None) -> pd.DataFrame:
+        """Atletas distintos das partições do filtro, no total ou por uma dimensão.
+
+        Equivale a `SELECT by, COUNT(DISTINCT ID) ... GROUP BY by`; sem `by`,
+        devolve uma única linha com a coluna Count.
+        """
+        selected = filters.to_mask(self)
+        entries = np.flatnonzero(selected[self.word_partition])
+        group = (
+            self.codes[by][self.word_partition[entries]].astype(np.int64) + 1 if by
+            else np.ones(len(entries), dtype=np.int64)
+        )
+        keys, words = self._or_words(group * self.n_words + self.word_index[entries], self.word_bits[entries])
+        groups, inverse = np.unique(keys // max(self.n_words, 1), return_inverse=True)
+        counts = np.bincount(inverse.ravel(), weights=popcount(words), minlength=len(groups)).astype(np.int64)
+        if by is None:
+            return pd.DataFrame({"Count": [int(counts.sum())]})
+        values = self.categories[by][np.maximum(groups - 1, 0)] if len(groups) else self.categories[by][:0]
+        if (groups == 0).any():
+            values = np.where(groups == 0, None, values)
+        return pd.DataFrame({by: values, "Count": counts})
+
+    def stats(self) -> Dict[str, int]:
+        """Tamanho da estrutura: atletas, partições e palavras guardadas."""
+        return {"athletes": len(self.ids), "partitions": len(self), "words": len(self.word_bits)}
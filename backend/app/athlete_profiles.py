@@ -0,0 +1,135 @@
+"""Documentos de perfil e estatísticas dos atletas, montados em lote."""
+import json
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+MEDALS = ("Gold", "Silver", "Bronze")
+
+# Colunas de athletes lidas para montar os documentos
+COLUMNS = ("ID", "Name", "Sex", "Age", "Height", "Weight", "Team", "NOC",
+           "Year", "Season", "City", "Sport", "Event", "Medal")
+
+
+def encode_document(document: Dict[str, Any]) -> bytes:
+    """Codifica um documento com as mesmas opções do JSONResponse do FastAPI."""
+    return json.dumps(document, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def merge_documents(bodies: List[bytes]) -> bytes:
+    """Junta objetos JSON já codificados em um único objeto, sem decodificá-los."""
+    return b"{" + b",".join(body[1:-1] for body in bodies) + b"}"
+
+
+def _optional(values: pd.Series) -> list:
+    """Valores da coluna como lista, com None no lugar de NaN."""
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+def _medal_counts(gold: int, silver: int, bronze: int, total: int) -> Dict[str, int]:
+    return {"gold": gold, "silver": silver, "bronze": bronze, "total": total}
+
+
+def build_athlete_documents(rows: pd.DataFrame) -> Iterator[Tuple[int, Dict[str, Any], Dict[str, Any]]]:
+    """Gera (ID, perfil, estatísticas) para cada atleta presente nas linhas.
+
+    Serve tanto para as linhas de um atleta quanto para a tabela inteira: as
+    contagens saem de agrupamentos únicos por atleta, ano e esporte, e o laço
+    final só distribui os resultados já calculados. A ordem das linhas
+    recebidas desempata participações, esportes e o registro mais recente,
+    como nas respostas montadas linha a linha.
+    """
+    if rows.empty:
+        return
+    medal = rows["Medal"]
+    df = pd.DataFrame({
+        "ID": rows["ID"].to_numpy(),
+        "Year": rows["Year"].to_numpy(),
+        "Sport": rows["Sport"].to_numpy(),
+        "Age": rows["Age"].to_numpy(),
+        "_row": np.arange(len(rows)),
+        "Gold": (medal == "Gold").to_numpy(np.int64),
+        "Silver": (medal == "Silver").to_numpy(np.int64),
+        "Bronze": (medal == "Bronze").to_numpy(np.int64),
+        "Total": (medal.notna() & (medal != "No Medal")).to_numpy(np.int64),
+    })
+
+    # Participações em ordem de ano, desempatadas pela ordem das linhas
+    order = df.sort_values(["ID", "Year", "_row"], kind="stable").index.to_numpy()
+    ids = df["ID"].to_numpy()[order]
+    athletes, starts = np.unique(ids, return_index=True)
+    ends = np.append(starts[1:], len(ids))
+    sorted_rows = rows.iloc[order]
+    participations = list(zip(
+        sorted_rows["Year"].tolist(), sorted_rows["Season"].tolist(), _optional(sorted_rows["City"]),
+        sorted_rows["Sport"].tolist(), sorted_rows["Event"].tolist(),
+        [None if m == "No Medal" else m for m in _optional(sorted_rows["Medal"])],
+    ))
+
+    # Registro mais recente: primeira linha do último ano de cada atleta
+    latest_order = df.sort_values(["ID", "Year", "_row"], ascending=[True, False, True], kind="stable")
+    latest = rows.iloc[latest_order.drop_duplicates("ID").index.to_numpy()]
+    names, sexes, nocs = latest["Name"].tolist(), latest["Sex"].tolist(), latest["NOC"].tolist()
+    teams = [team if team is not None else noc for team, noc in zip(_optional(latest["Team"]), nocs)]
+    heights = [None if h is None else float(h) for h in _optional(latest["Height"])]
+    weights = [None if w is None else float(w) for w in _optional(latest["Weight"])]
+
+    ages = df.groupby("ID", sort=True)["Age"].agg(["min", "max"])
+    age_min = [None if a is None else int(a) for a in _optional(ages["min"])]
+    age_max = [None if a is None else int(a) for a in _optional(ages["max"])]
+
+    counts = list(MEDALS) + ["Total"]
+    totals = df.groupby("ID", sort=True)[counts].sum().to_numpy().tolist()
+
+    by_year = df.groupby(["ID", "Year"], sort=True).agg(
+        **{column: (column, "sum") for column in counts}, Events=("_row", "size")
+    ).reset_index()
+    year_bounds = np.searchsorted(by_year["ID"].to_numpy(), athletes, side="left")
+    year_ends = np.searchsorted(by_year["ID"].to_numpy(), athletes, side="right")
+    year_rows = by_year[["Year", *counts, "Events"]].to_numpy().tolist()
+
+    # Esportes na ordem em que aparecem; medalhas por esporte do maior total ao menor
+    by_sport = df.groupby(["ID", "Sport"], sort=False).agg(
+        **{column: (column, "sum") for column in counts}, First=("_row", "min")
+    ).reset_index()
+    sports = by_sport.sort_values(["ID", "First"], kind="stable")
+    sport_ids = sports["ID"].to_numpy()
+    sport_bounds = np.searchsorted(sport_ids, athletes, side="left")
+    sport_ends = np.searchsorted(sport_ids, athletes, side="right")
+    sport_names = sports["Sport"].tolist()
+    ranked = sports.sort_values(["ID", "Total"], ascending=[True, False], kind="stable")
+    ranked_rows = list(zip(ranked["Sport"].tolist(), ranked[counts].to_numpy().tolist()))
+
+    for i, athlete_id in enumerate(athletes.tolist()):
+        start, end = starts[i], ends[i]
+        gold, silver, bronze, total = totals[i]
+        profile = {
+            "id": athlete_id,
+            "name": names[i],
+            "sex": sexes[i],
+            "noc": nocs[i],
+            "team": teams[i],
+            "height": heights[i],
+            "weight": weights[i],
+            "age_range": {"min": age_min[i], "max": age_max[i]},
+            "sports": sport_names[sport_bounds[i]:sport_ends[i]],
+            "years": [row[0] for row in year_rows[year_bounds[i]:year_ends[i]]],
+            "medals": _medal_counts(gold, silver, bronze, total),
+            "participations": [
+                {"year": year, "season": season, "city": city, "sport": sport, "event": event, "medal": won}
+                for year, season, city, sport, event, won in participations[start:end]
+            ],
+        }
+        stats = {
+            "evolution": [
+                {"Year": year, "Gold": g, "Silver": s, "Bronze": b, "Total": t, "Events": events}
+                for year, g, s, b, t, events in year_rows[year_bounds[i]:year_ends[i]]
+            ],
+            "biometrics": {"height": heights[i], "weight": weights[i], "sex": sexes[i]},
+            "medals_by_sport": [
+                {"name": sport, "code": sport, **_medal_counts(*sport_counts)}
+                for sport, sport_counts in ranked_rows[sport_bounds[i]:sport_ends[i]]
+            ],
+        }
+        yield athlete_id, profile, stats
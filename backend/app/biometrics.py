@@ -0,0 +1,207 @@
+"""Agregações e amostras de altura e peso para /stats/biometrics."""
+import dataclasses
+import sqlite3
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+from .filters import Filters
+
+MEDALS = ("Gold", "Silver", "Bronze")
+SEXES = ("F", "M")
+
+# Estratos da amostra: sexo (F, M ou outro) x medalha (ouro, prata, bronze ou nenhuma)
+STRATA = (len(SEXES) + 1) * (len(MEDALS) + 1)
+
+# Colunas de cada ponto da amostra
+POINT_COLUMNS = ["Name", "Sex", "Height", "Weight", "Medal", "NOC", "Year", "Sport"]
+
+# Partições com amostra pronta; Sex e Medal definem também o estrato
+PARTITION_DIMENSIONS = ("Year", "Season", "Sex", "NOC", "Sport", "Medal")
+
+SAMPLES_SQL = """
+SELECT rowid AS _rowid, Name, Sex, Height, Weight, Medal, NOC, Year, Season, Sport
+FROM athletes
+WHERE Height IS NOT NULL AND Weight IS NOT NULL
+ORDER BY rowid
+"""
+
+
+def bin_biometrics(rows: pd.DataFrame, height_bin: float, weight_bin: float) -> Dict[str, Any]:
+    """Agrupa as linhas (Height, Weight, Medal) em uma grade de altura x peso.
+
+    Cada célula é identificada pelo limite inferior das faixas, múltiplos de
+    `height_bin` cm e `weight_bin` kg, e conta as participações (linhas de
+    atleta por evento) e as medalhas de cada tipo. Só células com linhas são
+    devolvidas, em ordem de altura e depois de peso.
+    """
+    heights = np.floor(rows["Height"].to_numpy(np.float64) / height_bin).astype(np.int64)
+    weights = np.floor(rows["Weight"].to_numpy(np.float64) / weight_bin).astype(np.int64)
+    result: Dict[str, Any] = {
+        "height_bin": height_bin, "weight_bin": weight_bin, "population": len(rows), "bins": [],
+    }
+    if not len(rows):
+        return result
+
+    # Chave única por célula: deslocamentos a partir da menor faixa de cada eixo
+    height_min, weight_min = heights.min(), weights.min()
+    span = int(weights.max() - weight_min) + 1
+    cells, inverse = np.unique((heights - height_min) * span + (weights - weight_min), return_inverse=True)
+    medal = rows["Medal"].to_numpy(object)
+    counts = {"count": np.bincount(inverse)}
+    for name in MEDALS:
+        counts[name.lower()] = np.bincount(inverse, weights=medal == name, minlength=len(cells)).astype(np.int64)
+
+    frame = pd.DataFrame({
+        "height": ((cells // span + height_min) * height_bin).round(6),
+        "weight": ((cells % span + weight_min) * weight_bin).round(6),
+        **counts,
+    })
+    result["bins"] = frame.to_dict(orient="records")
+    return result
+
+
+def strata_of(sex: np.ndarray, medal: np.ndarray) -> np.ndarray:
+    """Código do estrato (sexo x medalha) de cada linha."""
+    sex_index = np.full(len(sex), len(SEXES), dtype=np.int64)
+    for i, value in enumerate(SEXES):
+        sex_index[sex == value] = i
+    medal_index = np.full(len(medal), len(MEDALS), dtype=np.int64)
+    for i, value in enumerate(MEDALS):
+        medal_index[medal == value] = i
+    return sex_index * (len(MEDALS) + 1) + medal_index
+
+
+def row_priorities(rowids: np.ndarray, seed: int) -> np.ndarray:
+    """Prioridade pseudoaleatória de cada linha: splitmix64 do rowid com a semente.
+
+    Depende só da linha e da semente, então o mesmo filtro sorteia sempre os
+    mesmos pontos, em qualquer motor e sem guardar estado entre requisições.
+    """
+    z = rowids.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15) + np.uint64(seed)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def allocate(populations: np.ndarray, size: int) -> np.ndarray:
+    """Vagas da amostra por estrato.
+
+    Metade das vagas é dividida igualmente entre os estratos presentes, para
+    que medalhistas raros apareçam; o restante segue a proporção de cada
+    estrato, com as sobras pelos maiores restos. Nenhum estrato recebe mais
+    vagas do que linhas.
+    """
+    populations = np.asarray(populations, dtype=np.int64)
+    if populations.sum() <= size:
+        return populations
+    present = np.count_nonzero(populations)
+    quotas = np.minimum(populations, size // (2 * present))
+    rest = populations - quotas
+    free = size - int(quotas.sum())
+    shares = free * rest / rest.sum()
+    quotas += np.floor(shares).astype(np.int64)
+    missing = size - int(quotas.sum())
+    remainders = shares - np.floor(shares)
+    quotas[np.lexsort((np.arange(len(shares)), -remainders))[:missing]] += 1
+    return quotas
+
+
+def select_sample(strata: np.ndarray, priorities: np.ndarray, quotas: np.ndarray) -> np.ndarray:
+    """Posições das linhas de menor prioridade de cada estrato, até a sua cota."""
+    order = np.lexsort((priorities, strata))
+    sorted_strata = strata[order]
+    starts = np.searchsorted(sorted_strata, np.arange(STRATA))
+    rank = np.arange(len(order)) - starts[sorted_strata]
+    return order[rank < quotas[sorted_strata]]
+
+
+def sample_positions(sex: np.ndarray, medal: np.ndarray, rowids: np.ndarray, size: int, seed: int) -> np.ndarray:
+    """Posições da amostra estratificada das linhas recebidas, na ordem de rowid."""
+    strata = strata_of(sex, medal)
+    picked = select_sample(strata, row_priorities(rowids, seed), allocate(np.bincount(strata, minlength=STRATA), size))
+    return picked[np.argsort(rowids[picked], kind="stable")]
+
+
+def sample_points(rows: pd.DataFrame, rowids: np.ndarray, size: int, seed: int) -> Dict[str, Any]:
+    """Amostra estratificada das linhas recebidas (todas com altura e peso)."""
+    picked = sample_positions(rows["Sex"].to_numpy(object), rows["Medal"].to_numpy(object), rowids, size, seed)
+    return {"population": len(rows), "points": rows.iloc[picked][POINT_COLUMNS].to_dict(orient="records")}
+
+
+class BiometricSamples:
+    """Amostras prontas por partição (Year, Season, Sex, NOC, Sport, Medal).
+
+    Cada partição guarda as `max_size` linhas de menor prioridade e a sua
+    população. Como a amostra de um estrato são as linhas de menor
+    prioridade da união das partições selecionadas, ela está contida nas
+    listas guardadas: a requisição só junta as listas e corta cada estrato
+    na sua cota, com o mesmo resultado de `sample_points` sobre a tabela.
+    """
+
+    def __init__(self, rows: pd.DataFrame, max_size: int, seed: int):
+        rows = rows.reset_index(drop=True)
+        self.max_size = max_size
+        self.seed = seed
+        partition = rows.groupby(list(PARTITION_DIMENSIONS), sort=True, dropna=False).ngroup().to_numpy(np.int64)
+        heads = np.zeros(int(partition.max()) + 1 if len(rows) else 0, dtype=np.int64)
+        heads[partition[::-1]] = np.arange(len(rows))[::-1]
+
+        # Uma entrada por partição, com as dimensões dos filtros e o estrato
+        self.counts = np.bincount(partition, minlength=len(heads))
+        self.years = rows["Year"].to_numpy(np.int64)[heads]
+        self.codes: Dict[str, np.ndarray] = {}
+        self.categories: Dict[str, np.ndarray] = {}
+        for dim in ("Season", "Sex", "NOC", "Sport"):
+            codes, uniques = pd.factorize(rows[dim].iloc[heads], sort=True)
+            self.codes[dim] = codes
+            self.categories[dim] = np.asarray(uniques, dtype=object)
+        strata = strata_of(rows["Sex"].to_numpy(object), rows["Medal"].to_numpy(object))
+        self.strata = strata[heads]
+
+        # Linhas guardadas: as max_size de menor prioridade de cada partição
+        rowids = rows["_rowid"].to_numpy(np.int64)
+        priorities = row_priorities(rowids, seed)
+        order = np.lexsort((priorities, partition))
+        starts = np.searchsorted(partition[order], np.arange(len(heads)))
+        kept = order[np.arange(len(order)) - starts[partition[order]] < max_size]
+        self.rows = rows.iloc[kept][POINT_COLUMNS].reset_index(drop=True)
+        self.row_partition = partition[kept]
+        self.row_rowids = rowids[kept]
+        self.row_priorities = priorities[kept]
+
+    @classmethod
+    def from_connection(cls, conn: sqlite3.Connection, max_size: int, seed: int) -> "BiometricSamples":
+        """Lê as linhas com altura e peso e monta as amostras por partição."""
+        return cls(pd.read_sql_query(SAMPLES_SQL, conn), max_size, seed)
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def isin(self, dim: str, values) -> np.ndarray:
+        """Máscara das partições cujo valor da dimensão está em `values`."""
+        categories = self.categories[dim]
+        positions = np.searchsorted(categories, values)
+        codes = [
+            int(pos) for pos, value in zip(positions, values)
+            if pos < len(categories) and categories[pos] == value
+        ]
+        return np.isin(self.codes[dim], codes)
+
+    def sample(self, filters: Filters, size: int) -> Dict[str, Any]:
+        """Amostra de até `size` pontos do filtro (o tipo de medalha é ignorado)."""
+        size = min(size, self.max_size)
+        selected = dataclasses.replace(filters, medal_type=None).to_mask(self)
+        populations = np.bincount(self.strata[selected], weights=self.counts[selected], minlength=STRATA)
+        quotas = allocate(populations.astype(np.int64), size)
+
+        candidates = np.flatnonzero(selected[self.row_partition])
+        strata = self.strata[self.row_partition[candidates]]
+        picked = candidates[select_sample(strata, self.row_priorities[candidates], quotas)]
+        picked = picked[np.argsort(self.row_rowids[picked], kind="stable")]
+        return {"population": int(populations.sum()), "points": self.rows.iloc[picked].to_dict(orient="records")}
+
+    def stats(self) -> Dict[str, int]:
+        """Tamanho da estrutura: partições e linhas guardadas."""
+        return {"partitions": len(self), "rows": len(self.rows)}
@@ -0,0 +1,167 @@
+"""Motor de consulta colunar em memória sobre a tabela de atletas."""
+import sqlite3
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+CATEGORICAL_COLUMNS = ("Season", "Sex", "NOC", "Sport", "Event", "City", "Medal")
+# Colunas também codificadas para agrupamentos e deduplicações
+KEY_COLUMNS = CATEGORICAL_COLUMNS + ("ID", "Name", "Year")
+
+
+def _small_int_codes(codes: np.ndarray, cardinality: int) -> np.ndarray:
+    """Converte códigos para o menor inteiro com sinal que os comporta."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if cardinality < np.iinfo(dtype).max:
+            return codes.astype(dtype)
+    return codes.astype(np.int64)
+
+
+def combined_key(code_arrays: Sequence[np.ndarray], cardinalities: Sequence[int]) -> np.ndarray:
+    """Combina colunas de códigos em uma chave int64 que preserva a ordem lexicográfica.
+
+    Códigos nulos (-1) são deslocados para 0. Quando a base mista estouraria
+    int64, a chave parcial é recompactada em ranks densos antes de continuar.
+    """
+    n = len(code_arrays[0]) if code_arrays else 0
+    key = np.zeros(n, dtype=np.int64)
+    span = 1
+    limit = np.iinfo(np.int64).max
+    for codes, cardinality in zip(code_arrays, cardinalities):
+        radix = cardinality + 1
+        if span > limit // radix:
+            _, key = np.unique(key, return_inverse=True)
+            key = key.astype(np.int64)
+            span = int(key.max()) + 1 if n else 1
+        key = key * radix + (codes.astype(np.int64) + 1)
+        span *= radix
+    return key
+
+
+class ColumnarStore:
+    """Tabela de atletas carregada em arrays NumPy com colunas codificadas em dicionário."""
+
+    def __init__(self, frame: pd.DataFrame, rowids: Optional[np.ndarray] = None):
+        self.frame = frame.reset_index(drop=True)
+        # rowid de cada linha no SQLite (posição + 1 quando o frame não vem do banco)
+        self.rowids = (
+            np.arange(1, len(self.frame) + 1, dtype=np.int64) if rowids is None
+            else np.asarray(rowids, dtype=np.int64)
+        )
+        self.codes: Dict[str, np.ndarray] = {}
+        self.categories: Dict[str, np.ndarray] = {}
+        for column in KEY_COLUMNS:
+            codes, uniques = pd.factorize(self.frame[column], sort=True)
+            self.codes[column] = _small_int_codes(codes, len(uniques))
+            self.categories[column] = np.asarray(uniques, dtype=object)
+        self.years = self.frame["Year"].to_numpy(dtype=np.int64)
+        self.has_biometrics = (
+            self.frame["Height"].notna().to_numpy() & self.frame["Weight"].notna().to_numpy()
+        )
+        self.has_medal = self.codes["Medal"] != self.code_of("Medal", "No Medal")
+
+    @classmethod
+    def from_connection(
+        cls, conn: sqlite3.Connection, where: str = "", params: Sequence = ()
+    ) -> "ColumnarStore":
+        """Carrega a tabela de atletas (ou o recorte `where`) na ordem de armazenamento."""
+        frame = pd.read_sql_query(
+            f"SELECT rowid AS _rowid, * FROM athletes {where} ORDER BY rowid", conn, params=list(params)
+        )
+        return cls(frame, frame.pop("_rowid").to_numpy())
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def code_of(self, column: str, value) -> int:
+        """Retorna o código de um valor, ou -2 se ele não existir na coluna."""
+        categories = self.categories[column]
+        pos = int(np.searchsorted(categories, value)) if len(categories) else 0
+        if pos < len(categories) and categories[pos] == value:
+            return pos
+        return -2
+
+    def isin(self, column: str, values: Sequence) -> np.ndarray:
+        """Máscara das linhas cujo valor da coluna está em `values`."""
+        wanted = [self.code_of(column, v) for v in values]
+        return np.isin(self.codes[column], wanted)
+
+    def _key(self, columns: Sequence[str], rows: np.ndarray) -> np.ndarray:
+        return combined_key(
+            [self.codes[c][rows] for c in columns],
+            [len(self.categories[c]) for c in columns],
+        )
+
+    def _decode(self, column: str, codes: np.ndarray) -> np.ndarray:
+        categories = self.categories[column]
+        values = categories[np.where(codes < 0, 0, codes)] if len(categories) else codes.astype(object)
+        if (codes < 0).any():
+            values = np.where(codes < 0, None, values)
+        return values
+
+    def distinct_rows(self, mask: np.ndarray, columns: Sequence[str]) -> np.ndarray:
+        """Índices de uma linha representante por combinação distinta de colunas."""
+        rows = np.flatnonzero(mask)
+        if rows.size == 0:
+            return rows
+        _, first = np.unique(self._key(columns, rows), return_index=True)
+        return rows[first]
+
+    def distinct_count(
+        self, mask: np.ndarray, distinct: Sequence[str], group: Sequence[str]
+    ) -> pd.DataFrame:
+        """Equivale a `SELECT group, COUNT(*) FROM (SELECT DISTINCT distinct ...) GROUP BY group`."""
+        rows = self.distinct_rows(mask, distinct)
+        if rows.size == 0:
+            return pd.DataFrame(columns=[*group, "Count"])
+        uniq, first, inverse = np.unique(
+            self._key(group, rows), return_index=True, return_inverse=True
+        )
+        data = {c: self._decode(c, self.codes[c][rows[first]]) for c in group}
+        data["Count"] = np.bincount(inverse.ravel(), minlength=len(uniq)).astype(np.int64)
+        frame = pd.DataFrame(data)
+        if "Year" in group:
+            frame["Year"] = frame["Year"].astype(np.int64)
+        if "ID" in group:
+            frame["ID"] = frame["ID"].astype(np.int64)
+        return frame
+
+    def medal_tally(self, mask: np.ndarray, sort_col: str, limit: int) -> pd.DataFrame:
+        """Ranking de atletas por medalhas distintas, como em /stats/top-athletes."""
+        columns = ["id", "name", "noc", "gold", "silver", "bronze", "total"]
+        rows = self.distinct_rows(
+            mask, ("ID", "Name", "NOC", "Year", "Season", "Event", "Medal")
+        )
+        if rows.size == 0:
+            return pd.DataFrame(columns=columns)
+        uniq, first, inverse = np.unique(
+            self._key(("ID", "Name", "NOC"), rows), return_index=True, return_inverse=True
+        )
+        inverse = inverse.ravel()
+        medal_codes = self.codes["Medal"][rows]
+        counts = {}
+        for medal in ("Gold", "Silver", "Bronze"):
+            hits = (medal_codes == self.code_of("Medal", medal)).astype(np.int64)
+            counts[medal.lower()] = np.bincount(inverse, weights=hits, minlength=len(uniq)).astype(np.int64)
+        counts["total"] = np.bincount(inverse, minlength=len(uniq)).astype(np.int64)
+
+        order = np.argsort(-counts[sort_col], kind="stable")[:limit]
+        heads = rows[first[order]]
+        return pd.DataFrame({
+            "id": self._decode("ID", self.codes["ID"][heads]).astype(np.int64),
+            "name": self._decode("Name", self.codes["Name"][heads]),
+            "noc": self._decode("NOC", self.codes["NOC"][heads]),
+            **{c: counts[c][order] for c in ("gold", "silver", "bronze", "total")},
+        }, columns=columns)
+
+    def rows(
+        self, mask: np.ndarray, columns: Optional[Sequence[str]] = None, limit: Optional[int] = None
+    ) -> pd.DataFrame:
+        """Retorna as linhas selecionadas na ordem de armazenamento."""
+        selected = np.flatnonzero(mask)
+        if limit is not None:
+            selected = selected[:limit]
+        frame = self.frame if columns is None else self.frame[list(columns)]
+        return frame.iloc[selected].reset_index(drop=True)
@@ -0,0 +1,100 @@
+"""Configurações da aplicação lidas de variáveis de ambiente."""
+import os
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def env_int(name: str, default: int) -> int:
+    """Lê um inteiro de variável de ambiente, com valor padrão."""
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    return int(value)
+
+
+def env_float(name: str, default: float) -> float:
+    """Lê um float de variável de ambiente, com valor padrão."""
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    return float(value)
+
+
+def env_bool(name: str, default: bool) -> bool:
+    """Lê um booleano (1/0, true/false, yes/no, on/off) de variável de ambiente."""
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_list(name: str, default: str) -> list:
+    """Lê uma lista separada por vírgulas de variável de ambiente."""
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        value = default
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+# Banco de dados
+DB_PATH = os.environ.get("OLYMPICS_DB_PATH") or os.path.join(BASE_DIR, "data", "olympics.db")
+
+# Pool de conexões somente leitura
+DB_POOL_SIZE = env_int("OLYMPICS_DB_POOL_SIZE", 8)
+DB_POOL_TIMEOUT = env_float("OLYMPICS_DB_POOL_TIMEOUT", 10.0)
+DB_STATEMENT_CACHE = env_int("OLYMPICS_DB_STATEMENT_CACHE", 256)
+DB_MMAP_SIZE = env_int("OLYMPICS_DB_MMAP_SIZE", 256 * 1024 * 1024)
+DB_CACHE_SIZE_KB = env_int("OLYMPICS_DB_CACHE_SIZE_KB", 64 * 1024)
+
+# Troca para um olympics.db regerado sem reiniciar o servidor
+DB_HOT_RELOAD = env_bool("OLYMPICS_DB_HOT_RELOAD", True)
+
+# Motor de consulta: "sqlite" (padrão) ou "columnar" (arrays NumPy em memória)
+QUERY_ENGINE = os.environ.get("OLYMPICS_QUERY_ENGINE", "sqlite").strip().lower()
+
+# Cubo de medalhas em memória para mapa, quadro de medalhas e evolução
+MEDAL_CUBE_ENABLED = env_bool("OLYMPICS_MEDAL_CUBE", True)
+
+# Rankings prontos de atletas por partição para /stats/top-athletes (0 = SQL)
+ATHLETE_TALLIES_ENABLED = env_bool("OLYMPICS_ATHLETE_TALLIES", True)
+
+# Busca de atletas por índice em memória, sem acentos nem maiúsculas (0 = SQL)
+SEARCH_INDEX_ENABLED = env_bool("OLYMPICS_SEARCH_INDEX", True)
+# Limite de edições por palavra na busca aproximada (fuzzy=true); termos
+# curtos toleram menos: 0 até 2 letras, 1 até 7
+SEARCH_FUZZY_MAX_DISTANCE = env_int("OLYMPICS_SEARCH_FUZZY_MAX_DISTANCE", 2)
+
+# Resolução padrão da grade de /stats/biometrics?mode=bins (cm e kg por faixa)
+BIOMETRICS_HEIGHT_BIN = env_float("OLYMPICS_BIOMETRICS_HEIGHT_BIN", 2.0)
+BIOMETRICS_WEIGHT_BIN = env_float("OLYMPICS_BIOMETRICS_WEIGHT_BIN", 2.0)
+
+# Bitsets de atletas por partição para contagens de atletas distintos (0 = SQL)
+ATHLETE_BITSETS_ENABLED = env_bool("OLYMPICS_ATHLETE_BITSETS", True)
+
+# Amostra estratificada (sexo x medalha) dos pontos de /stats/biometrics:
+# tamanho padrão, máximo aceito por sample_size e semente do sorteio
+BIOMETRICS_SAMPLES_ENABLED = env_bool("OLYMPICS_BIOMETRICS_SAMPLES", True)
+BIOMETRICS_SAMPLE_SIZE = env_int("OLYMPICS_BIOMETRICS_SAMPLE_SIZE", 2000)
+BIOMETRICS_SAMPLE_MAX = env_int("OLYMPICS_BIOMETRICS_SAMPLE_MAX", 5000)
+BIOMETRICS_SAMPLE_SEED = env_int("OLYMPICS_BIOMETRICS_SAMPLE_SEED", 2016)
+
+# Máximo de IDs aceitos por POST /api/athletes/batch
+ATHLETE_BATCH_MAX_IDS = env_int("OLYMPICS_ATHLETE_BATCH_MAX_IDS", 500)
+
+# Cache de respostas: orçamento em bytes e TTL padrão em segundos (0 = sem expiração)
+RESPONSE_CACHE_MAX_BYTES = env_int("OLYMPICS_RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+RESPONSE_CACHE_TTL = env_float("OLYMPICS_RESPONSE_CACHE_TTL", 0.0)
+
+# Cache de respostas em disco (SQLite) compartilhado entre workers e reinícios (vazio = desligado)
+DISK_CACHE_PATH = os.environ.get("OLYMPICS_DISK_CACHE_PATH", "").strip()
+
+# Cache HTTP: Cache-Control das respostas em cache (vazio = sem o cabeçalho)
+HTTP_CACHE_CONTROL = os.environ.get("OLYMPICS_HTTP_CACHE_CONTROL", "public, max-age=60")
+
+# Aquecimento do cache na inicialização, em segundo plano
+WARMUP_ENABLED = env_bool("OLYMPICS_WARMUP", True)
+WARMUP_WORKERS = env_int("OLYMPICS_WARMUP_WORKERS", 2)
+WARMUP_COMBINATIONS = env_list("OLYMPICS_WARMUP_COMBINATIONS", "unfiltered,years,games,seasons,sexes")
+WARMUP_ENDPOINTS = env_list(
+    "OLYMPICS_WARMUP_ENDPOINTS", "map,medals,gender,top-athletes,biometrics,evolution,dashboard"
+)
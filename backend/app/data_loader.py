@@ -2,34 +2,379 @@ import pandas as pd
 import sqlite3
 import os
 import contextlib
-from typing import Optional, List
+import hashlib
+import queue
+import threading
+import time
+from typing import Optional, List, Callable, Dict, Any
+from urllib.request import pathname2url
+
+from . import config
+from .config import DB_PATH
+from .athlete_bitsets import AthleteBitsets
+from .athlete_tallies import AthleteTallies
+from .biometrics import BiometricSamples
+from .columnar import ColumnarStore
+from .filters import Filters
+from .medal_cube import MedalCube
+from .search_index import SearchIndex
+
+# Valor de Sex em medal_events para medalhas divididas por atletas dos dois sexos
+MIXED_SEX = 'X'
+
+
+def read_dataset_version(path: str) -> str:
+    """Lê a versão gravada pelo conversor em dataset_meta.
+
+    Bancos gerados antes da tabela existir usam o prefixo do SHA-256 do
+    conteúdo do arquivo, o que também dá a mesma versão em todas as cópias.
+    """
+    try:
+        uri = f"file:{pathname2url(os.path.abspath(path))}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True)
+        try:
+            row = conn.execute("SELECT value FROM dataset_meta WHERE key = 'version'").fetchone()
+        finally:
+            conn.close()
+        if row and row[0]:
+            return str(row[0])
+    except sqlite3.Error:
+        pass
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+class ConnectionPool:
+    """Pool limitado de conexões SQLite reutilizáveis entre requisições."""
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], size: int, timeout: float):
+        self._connect = connect
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._in_use = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_seconds = 0.0
+        self._connect_seconds = 0.0
+        self._retired = False
+
+    def acquire(self) -> sqlite3.Connection:
+        """Obtém uma conexão ociosa, abrindo uma nova se o limite permitir."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+
+        if conn is None:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                started = time.perf_counter()
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+                with self._lock:
+                    self._connect_seconds += time.perf_counter() - started
+            else:
+                started = time.perf_counter()
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._timeouts += 1
+                    raise TimeoutError(
+                        f"Nenhuma conexão livre no pool após {self.timeout}s"
+                    )
+                with self._lock:
+                    self._waits += 1
+                    self._wait_seconds += time.perf_counter() - started
+
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Devolve a conexão ao pool (ou a fecha, se o pool foi aposentado)."""
+        with self._lock:
+            self._in_use -= 1
+            retired = self._retired
+            if retired:
+                self._opened -= 1
+        if retired:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        """Fecha todas as conexões ociosas."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+
+    def retire(self) -> None:
+        """Fecha as conexões ociosas e as emprestadas assim que voltarem."""
+        with self._lock:
+            self._retired = True
+        self.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas de uso do pool."""
+        with self._lock:
+            return {
+                "size": self.size,
+                "opened": self._opened,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "wait_seconds": round(self._wait_seconds, 6),
+                "connect_seconds": round(self._connect_seconds, 6),
+            }
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DB_PATH = os.path.join(BASE_DIR, "data", "olympics.db")
 
 class DataLoader:
     """Classe singleton para carregar e consultar dados olímpicos."""
     _instance = None
+
+    # Estruturas em memória derivadas do banco: atributo -> construtor
+    _STRUCTURES = {
+        "_columnar": ColumnarStore.from_connection,
+        "_medal_cube": lambda conn: MedalCube.from_connection(conn, MIXED_SEX),
+        "_search_index": SearchIndex.from_connection,
+        "_athlete_tallies": AthleteTallies.from_connection,
+        "_athlete_bitsets": AthleteBitsets.from_connection,
+        "_biometric_samples": lambda conn: BiometricSamples.from_connection(
+            conn, config.BIOMETRICS_SAMPLE_MAX, config.BIOMETRICS_SAMPLE_SEED
+        ),
+    }
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(DataLoader, cls).__new__(cls)
+            cls._instance._pool = None
+            cls._instance._pool_lock = threading.Lock()
+            cls._instance._columnar = None
+            cls._instance._medal_cube = None
+            cls._instance._search_index = None
+            cls._instance._athlete_tallies = None
+            cls._instance._athlete_bitsets = None
+            cls._instance._biometric_samples = None
+            cls._instance._structures_lock = threading.Lock()
+            cls._instance._reload_lock = threading.Lock()
+            cls._instance._signature = None
+            cls._instance._version = None
+            cls._instance._reloads = 0
+            cls._instance._reload_listeners = []
         return cls._instance
 
     def get_connection(self):
-        """Retorna conexão com o banco SQLite."""
+        """Retorna nova conexão somente leitura com o banco SQLite."""
         if not os.path.exists(DB_PATH):
             raise FileNotFoundError(f"Banco de dados não encontrado em {DB_PATH}")
-        return sqlite3.connect(DB_PATH)
+        uri = f"file:{pathname2url(os.path.abspath(DB_PATH))}?mode=ro&immutable=1"
+        conn = sqlite3.connect(
+            uri,
+            uri=True,
+            check_same_thread=False,
+            cached_statements=config.DB_STATEMENT_CACHE,
+        )
+        conn.execute(f"PRAGMA mmap_size = {int(config.DB_MMAP_SIZE)}")
+        conn.execute(f"PRAGMA cache_size = -{int(config.DB_CACHE_SIZE_KB)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    def get_pool(self) -> ConnectionPool:
+        """Retorna o pool de conexões, criando-o na primeira chamada."""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ConnectionPool(
+                        self.get_connection, config.DB_POOL_SIZE, config.DB_POOL_TIMEOUT
+                    )
+        return self._pool
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do pool de conexões."""
+        return self.get_pool().stats()
+
+    def close(self) -> None:
+        """Fecha as conexões ociosas do pool."""
+        if self._pool is not None:
+            self._pool.close()
+
+    def get_dataset_version(self) -> str:
+        """Retorna a versão do banco em uso ("missing" se o arquivo não existe)."""
+        self.refresh()
+        return self._version or "missing"
+
+    def on_reload(self, listener: Callable[[str], None]) -> None:
+        """Registra uma função chamada com a nova versão após cada troca do banco."""
+        self._reload_listeners.append(listener)
+
+    def refresh(self) -> bool:
+        """Passa a usar um novo olympics.db se o arquivo mudou.
+
+        O conversor troca o arquivo por `os.replace`, então a mudança aparece
+        como outro inode, tamanho ou mtime em um `os.stat` barato. Enquanto
+        uma thread prepara a troca (versão, estruturas em memória já
+        carregadas), as demais continuam servindo o banco anterior; depois o
+        pool antigo é aposentado sem interromper as consultas em andamento
+        e os ouvintes de `on_reload` invalidam seus caches. A assinatura só
+        muda depois da troca; se a reconstrução falhar, o banco anterior
+        continua em uso e a próxima requisição tenta de novo.
+        """
+        if not config.DB_HOT_RELOAD and self._signature is not None:
+            return False
+        try:
+            stat = os.stat(DB_PATH)
+        except OSError:
+            return False
+        signature = (DB_PATH, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if signature == self._signature:
+            return False
+        # Sem versão ainda não há banco anterior para servir: espera a carga
+        if not self._reload_lock.acquire(blocking=self._version is None):
+            return False
+        try:
+            if signature == self._signature:
+                return False
+            try:
+                version = read_dataset_version(DB_PATH)
+            except OSError:
+                return False
+            if self._signature is None or version == self._version:
+                self._signature, self._version = signature, version
+                return False
+
+            loaded = [attr for attr in self._STRUCTURES if getattr(self, attr) is not None]
+            rebuilt = {}
+            try:
+                if loaded:
+                    conn = self.get_connection()
+                    try:
+                        for attr in loaded:
+                            rebuilt[attr] = self._STRUCTURES[attr](conn)
+                    finally:
+                        conn.close()
+            except Exception as e:
+                # Assinatura inalterada: segue no banco anterior e tenta de novo
+                print(f"Erro ao recarregar banco de dados: {e}")
+                return False
+            with self._structures_lock:
+                for attr in self._STRUCTURES:
+                    setattr(self, attr, rebuilt.get(attr))
+            with self._pool_lock:
+                old_pool, self._pool = self._pool, None
+            if old_pool is not None:
+                old_pool.retire()
+            self._signature, self._version = signature, version
+            self._reloads += 1
+        finally:
+            self._reload_lock.release()
+
+        print(f"Banco de dados recarregado (versão {version})")
+        for listener in list(self._reload_listeners):
+            try:
+                listener(version)
+            except Exception as e:
+                print(f"Erro ao notificar recarga do banco: {e}")
+        return True
+
+    def get_dataset_info(self) -> Dict[str, Any]:
+        """Retorna a versão em uso e quantas vezes o banco foi recarregado."""
+        return {"version": self.get_dataset_version(), "reloads": self._reloads}
+
+    def uses_columnar_engine(self) -> bool:
+        """Indica se as consultas devem usar o motor colunar em memória."""
+        return config.QUERY_ENGINE == "columnar"
+
+    def _load_once(self, attr: str, build: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Constrói uma estrutura em memória a partir do banco na primeira chamada."""
+        self.refresh()
+        value = getattr(self, attr)
+        if value is None:
+            with self._structures_lock:
+                value = getattr(self, attr)
+                if value is None:
+                    with self._pooled_connection() as conn:
+                        value = build(conn)
+                    setattr(self, attr, value)
+        return value
+
+    def invalidate(self) -> None:
+        """Descarta as estruturas em memória derivadas do banco."""
+        with self._structures_lock:
+            for attr in self._STRUCTURES:
+                setattr(self, attr, None)
+
+    def get_columnar_store(self) -> ColumnarStore:
+        """Retorna o motor colunar, carregando a tabela de atletas uma única vez."""
+        return self._load_once('_columnar', self._STRUCTURES['_columnar'])
+
+    def get_medal_cube(self) -> MedalCube:
+        """Retorna o cubo de medalhas, agregando medal_events uma única vez."""
+        return self._load_once('_medal_cube', self._STRUCTURES['_medal_cube'])
+
+    def get_search_index(self) -> SearchIndex:
+        """Retorna o índice de busca de atletas, montado uma única vez."""
+        return self._load_once('_search_index', self._STRUCTURES['_search_index'])
+
+    def get_athlete_tallies(self) -> AthleteTallies:
+        """Retorna o quadro de medalhas por atleta com os rankings por partição."""
+        return self._load_once('_athlete_tallies', self._STRUCTURES['_athlete_tallies'])
+
+    def get_athlete_bitsets(self) -> AthleteBitsets:
+        """Retorna os bitsets de atletas por partição, montados uma única vez."""
+        return self._load_once('_athlete_bitsets', self._STRUCTURES['_athlete_bitsets'])
+
+    def get_biometric_samples(self) -> BiometricSamples:
+        """Retorna as amostras de altura e peso por partição, montadas uma única vez."""
+        return self._load_once('_biometric_samples', self._STRUCTURES['_biometric_samples'])
+
+    def load_athletes_slice(self, filters: Filters) -> ColumnarStore:
+        """Lê uma única vez as linhas de atletas do filtro em um motor colunar próprio."""
+        where, params = filters.to_sql()
+        with self.get_connection_context() as conn:
+            return ColumnarStore.from_connection(conn, where, params)
+
+    def load_medal_events_slice(self, filters: Filters) -> MedalCube:
+        """Agrega uma única vez os eventos medalhados do filtro em um cubo próprio."""
+        where, params = filters.to_sql(mixed_sex=MIXED_SEX)
+        with self.get_connection_context() as conn:
+            return MedalCube.from_connection(conn, MIXED_SEX, where, params)
 
-    @contextlib.contextmanager
     def get_connection_context(self):
-        """Context manager para conexão com fechamento automático."""
-        conn = self.get_connection()
+        """Context manager que empresta uma conexão do pool e a devolve ao final."""
+        self.refresh()
+        return self._pooled_connection()
+
+    @contextlib.contextmanager
+    def _pooled_connection(self):
+        pool = self.get_pool()
+        conn = pool.acquire()
         try:
             yield conn
         finally:
-            conn.close()
+            pool.release(conn)
 
     def query_filtered(
         self, 
@@ -43,41 +388,18 @@ class DataLoader:
         countries: Optional[List[str]] = None
     ) -> pd.DataFrame:
         """Executa consulta filtrada na tabela de atletas."""
-        query = "SELECT * FROM athletes WHERE 1=1"
-        params = []
-
-        if year:
-            query += " AND Year = ?"
-            params.append(year)
-        
-        if start_year is not None and end_year is not None:
-            query += " AND Year >= ? AND Year <= ?"
-            params.extend([start_year, end_year])
-
-        if season and season != "Both":
-            query += " AND Season = ?"
-            params.append(season)
-            
-        if sex and sex != "Both":
-            query += " AND Sex = ?"
-            params.append(sex)
-            
-        if country and country != "All":
-            query += " AND NOC = ?"
-            params.append(country)
-        
-        if countries:
-            placeholders = ','.join(['?'] * len(countries))
-            query += f" AND NOC IN ({placeholders})"
-            params.extend(countries)
-            
-        if sport and sport != "All":
-            query += " AND Sport = ?"
-            params.append(sport)
-            
+        filters = Filters.from_params(
+            year=year, start_year=start_year, end_year=end_year, season=season,
+            sex=sex, country=country, countries=countries, sport=sport,
+        )
         try:
+            if self.uses_columnar_engine():
+                store = self.get_columnar_store()
+                return store.rows(filters.to_mask(store))
+
+            where, params = filters.to_sql()
             with self.get_connection_context() as conn:
-                return pd.read_sql_query(query, conn, params=params)
+                return pd.read_sql_query(f"SELECT * FROM athletes {where}", conn, params=params)
         except Exception as e:
             print(f"Erro ao executar query: {e}")
             return pd.DataFrame() 
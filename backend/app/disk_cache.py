@@ -0,0 +1,122 @@
+"""Segundo nível do cache de respostas: arquivo SQLite compartilhado entre processos."""
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .response_cache import CachedBody
+
+
+class DiskCache:
+    """Respostas já codificadas guardadas em disco por (versão do banco, chave).
+
+    Vários workers (e reinícios) apontando para o mesmo arquivo calculam cada
+    agregação uma vez por versão do banco. O arquivo usa WAL para leituras
+    concorrentes com um escritor por vez. Erros de disco nunca chegam à
+    requisição: são contados e tratados como falha de cache.
+
+    A tabela `versions` registra a ordem em que cada versão apareceu no
+    arquivo. Um processo só apaga entradas de versões registradas antes da
+    sua, então, durante uma troca gradual de workers, um processo antigo
+    não apaga as respostas da versão nova.
+    """
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.path = path
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pruned_version: Optional[str] = None
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._errors = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self._timeout, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    version TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    media_type TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (version, key)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS versions (
+                    seq INTEGER PRIMARY KEY,
+                    version TEXT NOT NULL UNIQUE
+                )
+            """)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, version: str, key: str) -> Optional[CachedBody]:
+        """Retorna o corpo guardado para a versão e chave, ou None."""
+        with self._lock:
+            try:
+                row = self._connection().execute(
+                    "SELECT body, media_type FROM responses WHERE version = ? AND key = ?",
+                    (version, key),
+                ).fetchone()
+            except sqlite3.Error as e:
+                print(f"Erro ao ler cache em disco: {e}")
+                self._errors += 1
+                return None
+            if row is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            return CachedBody(bytes(row[0]), row[1])
+
+    def set(self, version: str, key: str, value: CachedBody) -> None:
+        """Grava um corpo; na primeira gravação de uma versão, apaga as anteriores a ela."""
+        with self._lock:
+            try:
+                conn = self._connection()
+                if self._pruned_version != version:
+                    conn.execute("INSERT OR IGNORE INTO versions (version) VALUES (?)", (version,))
+                    # Versões sem registro vêm de arquivos anteriores à tabela e também saem
+                    conn.execute("""
+                        DELETE FROM responses WHERE version NOT IN (
+                            SELECT version FROM versions
+                            WHERE seq >= (SELECT seq FROM versions WHERE version = ?)
+                        )
+                    """, (version,))
+                    self._pruned_version = version
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                    (version, key, value.body, value.media_type, time.time()),
+                )
+                conn.commit()
+                self._writes += 1
+            except sqlite3.Error as e:
+                print(f"Erro ao gravar cache em disco: {e}")
+                self._errors += 1
+
+    def close(self) -> None:
+        """Fecha a conexão com o arquivo."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas de uso do cache em disco."""
+        with self._lock:
+            return {
+                "path": self.path,
+                "hits": self._hits,
+                "misses": self._misses,
+                "writes": self._writes,
+                "errors": self._errors,
+            }
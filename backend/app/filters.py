@@ -0,0 +1,139 @@
+"""Filtros da API compilados para SQL ou para máscaras vetorizadas."""
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Valores enviados pelo frontend que significam "sem filtro"
+NO_FILTER = {"season": "Both", "sex": "Both", "country": "All", "sport": "All", "medal_type": "Total"}
+
+
+def normalize_value(name: str, value: Optional[str]) -> Optional[str]:
+    """Retorna None para valores vazios ou neutros do filtro `name`."""
+    if not value or value == NO_FILTER[name]:
+        return None
+    return value
+
+
+@dataclass(frozen=True)
+class Filters:
+    """Conjunto normalizado de filtros de uma consulta.
+
+    Construído por `from_params`, que descarta valores neutros ('Both', 'All',
+    'Total'), une `year` e o intervalo `start_year`/`end_year` em um único
+    intervalo e junta `country` e `countries` em uma tupla ordenada. Filtros
+    equivalentes geram o mesmo objeto e, portanto, o mesmo SQL e os mesmos
+    parâmetros. `countries=()` não seleciona nenhum país; `None` não filtra.
+    """
+
+    start_year: Optional[int] = None
+    end_year: Optional[int] = None
+    season: Optional[str] = None
+    sex: Optional[str] = None
+    countries: Optional[Tuple[str, ...]] = None
+    sport: Optional[str] = None
+    medal_type: Optional[str] = None
+
+    @classmethod
+    def from_params(
+        cls,
+        year: Optional[int] = None,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        season: Optional[str] = None,
+        sex: Optional[str] = None,
+        country: Optional[str] = None,
+        countries: Optional[Iterable[str]] = None,
+        sport: Optional[str] = None,
+        medal_type: Optional[str] = None,
+    ) -> "Filters":
+        """Normaliza os parâmetros recebidos pelos endpoints."""
+        low = high = None
+        if start_year is not None and end_year is not None:
+            low, high = start_year, end_year
+        if year:
+            low = year if low is None else max(low, year)
+            high = year if high is None else min(high, year)
+
+        selected = None
+        country = normalize_value("country", country)
+        if countries:
+            selected = set(countries)
+        if country:
+            selected = {country} if selected is None else selected & {country}
+
+        return cls(
+            start_year=low,
+            end_year=high,
+            season=normalize_value("season", season),
+            sex=normalize_value("sex", sex),
+            countries=tuple(sorted(selected)) if selected is not None else None,
+            sport=normalize_value("sport", sport),
+            medal_type=normalize_value("medal_type", medal_type),
+        )
+
+    def to_sql(self, base: Sequence[str] = (), mixed_sex: Optional[str] = None) -> Tuple[str, List]:
+        """Compila os filtros em uma cláusula WHERE e sua lista de parâmetros.
+
+        `base` são condições fixas do endpoint, colocadas antes dos filtros.
+        Com `mixed_sex`, o filtro de sexo também aceita esse valor (tabela
+        medal_events). Colunas e parâmetros saem sempre na mesma ordem.
+        """
+        clauses = list(base)
+        params: List = []
+        if self.start_year is not None:
+            if self.start_year == self.end_year:
+                clauses.append("Year = ?")
+                params.append(self.start_year)
+            else:
+                clauses.append("Year >= ? AND Year <= ?")
+                params.extend([self.start_year, self.end_year])
+        if self.season:
+            clauses.append("Season = ?")
+            params.append(self.season)
+        if self.sex:
+            if mixed_sex:
+                clauses.append(f"Sex IN (?, '{mixed_sex}')")
+            else:
+                clauses.append("Sex = ?")
+            params.append(self.sex)
+        if self.countries is not None:
+            if len(self.countries) == 1:
+                clauses.append("NOC = ?")
+            else:
+                clauses.append(f"NOC IN ({','.join(['?'] * len(self.countries))})")
+            params.extend(self.countries)
+        if self.sport:
+            clauses.append("Sport = ?")
+            params.append(self.sport)
+        if self.medal_type:
+            clauses.append("Medal = ?")
+            params.append(self.medal_type)
+
+        if not clauses:
+            return "", params
+        return "WHERE " + " AND ".join(clauses), params
+
+    def to_mask(self, index, mixed_sex: Optional[str] = None) -> np.ndarray:
+        """Compila os filtros em uma máscara booleana sobre um índice em memória.
+
+        `index` precisa oferecer `len()`, o array `years` e `isin(coluna, valores)`
+        (ColumnarStore e MedalCube). `mixed_sex` tem o mesmo papel de `to_sql`.
+        """
+        mask = np.ones(len(index), dtype=bool)
+        if self.start_year is not None:
+            if self.start_year == self.end_year:
+                mask &= index.years == self.start_year
+            else:
+                mask &= (index.years >= self.start_year) & (index.years <= self.end_year)
+        if self.season:
+            mask &= index.isin("Season", [self.season])
+        if self.sex:
+            mask &= index.isin("Sex", [self.sex, mixed_sex] if mixed_sex else [self.sex])
+        if self.countries is not None:
+            mask &= index.isin("NOC", self.countries)
+        if self.sport:
+            mask &= index.isin("Sport", [self.sport])
+        if self.medal_type:
+            mask &= index.isin("Medal", [self.medal_type])
+        return mask
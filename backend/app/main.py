@@ -1,8 +1,57 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .api import router as api_router
+from . import config
+from . import api
+from .api import router as api_router, RESPONSE_CACHE
+from .data_loader import data_loader
+from .warmup import cache_warmer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if data_loader.uses_columnar_engine():
+        try:
+            data_loader.get_columnar_store()
+        except Exception as e:
+            print(f"Erro ao carregar motor colunar: {e}")
+    if config.MEDAL_CUBE_ENABLED:
+        try:
+            data_loader.get_medal_cube()
+        except Exception as e:
+            print(f"Erro ao carregar cubo de medalhas: {e}")
+    if config.ATHLETE_TALLIES_ENABLED:
+        try:
+            data_loader.get_athlete_tallies()
+        except Exception as e:
+            print(f"Erro ao montar rankings de atletas: {e}")
+    if config.ATHLETE_BITSETS_ENABLED:
+        try:
+            data_loader.get_athlete_bitsets()
+        except Exception as e:
+            print(f"Erro ao montar bitsets de atletas: {e}")
+    if config.BIOMETRICS_SAMPLES_ENABLED:
+        try:
+            data_loader.get_biometric_samples()
+        except Exception as e:
+            print(f"Erro ao montar amostras de biometria: {e}")
+    if config.SEARCH_INDEX_ENABLED:
+        try:
+            data_loader.get_search_index()
+        except Exception as e:
+            print(f"Erro ao montar índice de busca: {e}")
+    if config.WARMUP_ENABLED:
+        cache_warmer.start()
+    yield
+    cache_warmer.stop()
+    if api.DISK_CACHE is not None:
+        api.DISK_CACHE.close()
+    data_loader.close()
 
-app = FastAPI(title="Olympic Data API")
+
+app = FastAPI(title="Olympic Data API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,3 +70,19 @@ def read_root():
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+@app.get("/health/ready")
+def health_ready():
+    """Prontidão para o balanceador: 200 após o aquecimento do cache, 503 antes."""
+    warmup = cache_warmer.status()
+    return JSONResponse({"ready": warmup["ready"], "warmup": warmup}, status_code=200 if warmup["ready"] else 503)
+
+@app.get("/health/stats")
+def health_stats():
+    """Retorna estatísticas de runtime (versão do banco, pool de conexões e caches de respostas)."""
+    return {
+        "dataset": data_loader.get_dataset_info(),
+        "db_pool": data_loader.get_pool_stats(),
+        "response_cache": RESPONSE_CACHE.stats(),
+        "disk_cache": api.DISK_CACHE.stats() if api.DISK_CACHE is not None else None,
+    }
@@ -0,0 +1,82 @@
+"""Cubo esparso de contagens de medalhas deduplicadas."""
+import sqlite3
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ("Year", "Season", "Sex", "NOC", "Sport", "Medal")
+
+
+class MedalCube:
+    """Contagens de medal_events por (Year, Season, Sex, NOC, Sport, Medal).
+
+    Só as células não vazias são guardadas, como arrays de códigos por
+    dimensão mais um array de contagens. Filtros viram máscaras sobre as
+    células e agrupamentos viram `np.bincount`, então o custo depende do
+    número de células e não do número de linhas de atletas.
+    """
+
+    def __init__(self, cells: pd.DataFrame, mixed_sex: str):
+        self.mixed_sex = mixed_sex
+        self.codes: Dict[str, np.ndarray] = {}
+        self.categories: Dict[str, np.ndarray] = {}
+        for dim in DIMENSIONS:
+            codes, uniques = pd.factorize(cells[dim], sort=True)
+            self.codes[dim] = codes.astype(np.int32)
+            self.categories[dim] = np.asarray(uniques)
+        self.counts = cells["Count"].to_numpy(dtype=np.int64)
+        self.years = self.categories["Year"][self.codes["Year"]].astype(np.int64) if len(cells) else np.zeros(0, np.int64)
+
+    @classmethod
+    def from_connection(
+        cls, conn: sqlite3.Connection, mixed_sex: str, where: str = "", params: Sequence = ()
+    ) -> "MedalCube":
+        """Agrega a tabela medal_events (ou o recorte `where`) nas células do cubo."""
+        cells = pd.read_sql_query(
+            f"""
+            SELECT {', '.join(DIMENSIONS)}, COUNT(*) as Count
+            FROM medal_events
+            {where}
+            GROUP BY {', '.join(DIMENSIONS)}
+            """,
+            conn,
+            params=list(params),
+        )
+        return cls(cells, mixed_sex)
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def _codes_for(self, dim: str, values: Sequence) -> List[int]:
+        categories = self.categories[dim]
+        positions = np.searchsorted(categories, values)
+        return [
+            int(pos) for pos, value in zip(positions, values)
+            if pos < len(categories) and categories[pos] == value
+        ]
+
+    def isin(self, dim: str, values: Sequence) -> np.ndarray:
+        """Máscara das células cujo valor da dimensão está em `values`."""
+        return np.isin(self.codes[dim], self._codes_for(dim, list(values)))
+
+    def totals(self, mask: np.ndarray, by: Sequence[str]) -> pd.DataFrame:
+        """Soma as células selecionadas agrupando pelas dimensões pedidas.
+
+        Retorna as combinações não vazias ordenadas como um GROUP BY do SQLite.
+        """
+        sizes = [len(self.categories[dim]) for dim in by]
+        key = np.zeros(int(mask.sum()), dtype=np.int64)
+        for dim, size in zip(by, sizes):
+            key = key * size + self.codes[dim][mask]
+        sums = np.bincount(key, weights=self.counts[mask], minlength=int(np.prod(sizes, dtype=np.int64)))
+        present = np.flatnonzero(sums)
+
+        data = {}
+        remainder = present
+        for dim, size in reversed(list(zip(by, sizes))):
+            data[dim] = self.categories[dim][remainder % size]
+            remainder = remainder // size
+        frame = pd.DataFrame({dim: data[dim] for dim in by})
+        frame["Count"] = sums[present].astype(np.int64)
+        return frame
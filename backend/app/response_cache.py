@@ -0,0 +1,214 @@
+"""Cache de respostas LRU limitado por memória, com TTL e estatísticas."""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# Valor devolvido por `get` quando a chave não está no cache
+MISSING = object()
+
+
+class _Flight:
+    """Cálculo em andamento de uma chave, aguardado pelas requisições concorrentes."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class CachedBody(NamedTuple):
+    """Corpo de resposta já codificado, pronto para ser enviado."""
+
+    body: bytes
+    media_type: str
+
+
+def encode_json(value: Any) -> CachedBody:
+    """Codifica um valor exatamente como o JSONResponse do FastAPI faria."""
+    return CachedBody(JSONResponse(jsonable_encoder(value)).body, JSONResponse.media_type)
+
+
+def estimate_size(value: Any) -> int:
+    """Tamanho em bytes de um corpo codificado, ou estimado pelo JSON do valor."""
+    if isinstance(value, CachedBody):
+        return len(value.body)
+    return len(json.dumps(value, default=str, separators=(",", ":")).encode("utf-8"))
+
+
+class ResponseCache:
+    """Cache LRU com orçamento em bytes e expiração opcional por entrada.
+
+    Ao inserir além do orçamento, apenas as entradas menos usadas
+    recentemente saem, uma a uma, até a nova caber; o cache nunca é
+    esvaziado de uma vez. Respostas maiores que o orçamento inteiro não são
+    guardadas. Todas as operações são protegidas por um lock.
+
+    `get_or_compute` agrupa falhas concorrentes da mesma chave: só a
+    primeira requisição calcula o valor e as demais aguardam o resultado.
+    Um valor cujo cálculo começou antes de um `clear` não é guardado.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        default_ttl: Optional[float] = None,
+        sizeof: Callable[[Any], int] = estimate_size,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._sizeof = sizeof
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._rejected = 0
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._coalesced = 0
+        self._generation = 0
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """Retorna o valor guardado (marcando-o como recente) ou `default`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= self._clock():
+                self._remove(key)
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> bool:
+        """Guarda um valor; retorna False se ele não couber no orçamento."""
+        return self._store(key, value, ttl, None)
+
+    def _store(self, key: Hashable, value: Any, ttl: Optional[float], generation: Optional[int]) -> bool:
+        size = self._sizeof(value)
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                self._rejected += 1
+                return False
+            while self._entries and self._bytes + size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+            expires_at = self._clock() + ttl if ttl else None
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            return True
+
+    def get_or_compute(
+        self, key: Hashable, compute: Callable[[], Any], ttl: Optional[float] = None
+    ) -> Any:
+        """Retorna o valor em cache ou o calcula uma única vez entre threads.
+
+        Requisições que chegam enquanto a chave está sendo calculada esperam
+        o cálculo em andamento e recebem o mesmo valor (ou a mesma exceção).
+        """
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+
+        with self._lock:
+            # O líder pode ter terminado entre a consulta acima e este ponto
+            entry = self._entries.get(key)
+            if entry is not None and (entry[2] is None or entry[2] > self._clock()):
+                self._coalesced += 1
+                return entry[0]
+            flight = self._flights.get(key)
+            leader = flight is None
+            generation = self._generation
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+            self._store(key, flight.value, ttl, generation)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self.get(key)
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: Hashable) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def keys(self):
+        """Retorna as chaves, da menos para a mais recentemente usada."""
+        with self._lock:
+            return list(self._entries.keys())
+
+    def clear(self) -> None:
+        """Remove todas as entradas (as estatísticas são mantidas)."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas de uso do cache."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "rejected": self._rejected,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._flights),
+            }
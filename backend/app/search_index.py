@@ -0,0 +1,297 @@
+"""Índice de busca de atletas em memória, insensível a acentos e maiúsculas."""
+import bisect
+import sqlite3
+import unicodedata
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Tamanhos de n-grama indexados: bigramas atendem termos de 2 caracteres
+NGRAM_SIZES = (2, 3)
+
+# Marcadores de início e fim de palavra nos bigramas da busca aproximada
+WORD_START, WORD_END = "\x01", "\x02"
+
+
+def normalize_name(text: str) -> str:
+    """Remove acentos, ignora maiúsculas e colapsa espaços ("Ítalo" -> "italo")."""
+    if not text.isascii():
+        decomposed = unicodedata.normalize("NFKD", text)
+        text = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(text.casefold().split())
+
+
+def char_matrix(texts: Sequence[str]) -> np.ndarray:
+    """Matriz (textos x maior comprimento) de code points, completada com 0."""
+    width = max(max((len(text) for text in texts), default=0), 1)
+    chars = np.asarray(texts, dtype=f"<U{width}").view(np.uint32)
+    return chars.reshape(len(texts), width).astype(np.int64)
+
+
+def ngram_codes(chars: np.ndarray, n: int) -> np.ndarray:
+    """Códigos inteiros dos n-gramas de cada linha de uma matriz de code points.
+
+    Cada caractere ocupa 21 bits, então um trigrama cabe em um int64 e
+    bigramas (abaixo de 2**42) nunca colidem com trigramas. Posições que
+    ultrapassam o fim do nome (preenchidas com 0) recebem -1.
+    """
+    width = chars.shape[1] - n + 1
+    if width <= 0:
+        return np.full((chars.shape[0], 0), -1, dtype=np.int64)
+    codes = np.zeros((chars.shape[0], width), dtype=np.int64)
+    for offset in range(n):
+        codes = (codes << 21) | chars[:, offset:offset + width]
+    codes[chars[:, n - 1:n - 1 + width] == 0] = -1
+    return codes
+
+
+def fuzzy_distance(term: str, max_distance: int) -> int:
+    """Distância tolerada para um termo: 0 até 2 letras, 1 até 7, 2 a partir de 8."""
+    automatic = 0 if len(term) <= 2 else 1 if len(term) <= 7 else 2
+    return min(automatic, max_distance)
+
+
+def edit_distances(term: str, words: np.ndarray, lengths: np.ndarray, max_distance: int) -> np.ndarray:
+    """Distância de edição (com transposição de vizinhos) do termo a cada palavra.
+
+    A programação dinâmica avança uma linha por letra do termo, vetorizada
+    sobre todas as palavras candidatas; a inserção vira um mínimo acumulado
+    ao longo da linha. Palavras cujo mínimo da linha passa de
+    `max_distance` saem do cálculo e recebem `max_distance + 1`.
+    """
+    result = np.full(len(words), max_distance + 1, dtype=np.int64)
+    if not len(words):
+        return result
+    query = [ord(ch) for ch in term]
+    columns = np.arange(words.shape[1] + 1)
+    alive = np.arange(len(words))
+    previous2 = None
+    previous = np.broadcast_to(columns, (len(words), len(columns))).copy()
+    for i, char in enumerate(query, start=1):
+        current = np.empty_like(previous)
+        current[:, 0] = i
+        current[:, 1:] = np.minimum(previous[:, 1:] + 1, previous[:, :-1] + (words != char))
+        if previous2 is not None:
+            swapped = (words[:, 1:] == query[i - 2]) & (words[:, :-1] == char)
+            current[:, 2:] = np.where(swapped, np.minimum(current[:, 2:], previous2[:, :-2] + 1), current[:, 2:])
+        current = np.minimum.accumulate(current - columns, axis=1) + columns
+        keep = current.min(axis=1) <= max_distance
+        if not keep.all():
+            alive, words, lengths, current, previous = (
+                alive[keep], words[keep], lengths[keep], current[keep], previous[keep]
+            )
+            if not len(alive):
+                return result
+        previous2, previous = previous, current
+    distances = previous[np.arange(len(alive)), lengths]
+    result[alive] = np.minimum(distances, max_distance + 1)
+    return result
+
+
+class Postings:
+    """Listas de posições por chave em formato CSR.
+
+    As chaves ficam ordenadas em `keys`; as posições de cada chave são
+    distintas, crescentes e ocupam `positions[bounds[i]:bounds[i + 1]]`.
+    """
+
+    def __init__(self, keys: np.ndarray, owners: np.ndarray):
+        key_ids, self.keys = pd.factorize(keys, sort=True)
+        span = int(owners.max()) + 1 if len(owners) else 1
+        pairs = np.sort(key_ids.astype(np.int64) * span + owners)
+        if len(pairs):
+            pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]
+        self.positions = (pairs % span).astype(np.int32)
+        self.bounds = np.searchsorted(pairs // span, np.arange(len(self.keys) + 1))
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def index_of(self, key) -> Optional[int]:
+        """Índice da chave em `keys`, ou None."""
+        index = int(np.searchsorted(self.keys, key))
+        if index == len(self.keys) or self.keys[index] != key:
+            return None
+        return index
+
+    def get(self, key) -> np.ndarray:
+        """Posições da chave (vazio se ela não existe)."""
+        index = self.index_of(key)
+        if index is None:
+            return self.positions[:0]
+        return self.positions[self.bounds[index]:self.bounds[index + 1]]
+
+    def expand(self, indexes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Concatena as posições de várias chaves e diz a qual delas cada uma pertence."""
+        starts, ends = self.bounds[indexes], self.bounds[indexes + 1]
+        sizes = ends - starts
+        owner = np.repeat(np.arange(len(indexes)), sizes)
+        offsets = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        return self.positions[np.repeat(starts, sizes) + offsets], owner
+
+
+class SearchIndex:
+    """Atletas distintos (ID, Name, NOC, Sport) ordenados pelo nome normalizado.
+
+    Cada linha recebe a posição na ordem (nome normalizado, Name, ID), que é
+    a ordem alfabética das respostas. Prefixos formam um intervalo contíguo
+    dessa ordem, achado por bissecção; trechos no meio do nome vêm da
+    interseção das listas de posições dos n-gramas do termo, conferidas no
+    texto. O ranking é: nome igual ao termo, prefixo, trecho, e dentro de
+    cada grupo a ordem alfabética.
+
+    A busca aproximada compara palavras: o vocabulário das palavras dos
+    nomes tem um índice de bigramas (com marcadores de início e fim) que
+    descarta as palavras sem bigramas suficientes em comum com o termo antes
+    do cálculo da distância de edição.
+    """
+
+    def __init__(self, athletes: pd.DataFrame):
+        normalized = [normalize_name(str(name)) for name in athletes["Name"]]
+        frame = athletes.assign(_key=normalized).sort_values(["_key", "Name", "ID"], kind="mergesort")
+        self.keys: List[str] = frame["_key"].tolist()
+        self.ids = frame["ID"].to_numpy(dtype=np.int64)
+        self.names: List[str] = frame["Name"].tolist()
+        self.nocs: List[str] = frame["NOC"].tolist()
+        self.sports: List[str] = frame["Sport"].tolist()
+        rows = np.arange(len(self.keys))
+
+        chars = char_matrix(self.keys)
+        grams, owners = [], []
+        for n in NGRAM_SIZES:
+            codes = ngram_codes(chars, n)
+            valid = codes >= 0
+            grams.append(codes[valid])
+            owners.append(np.broadcast_to(rows[:, None], codes.shape)[valid])
+        self.grams = Postings(np.concatenate(grams), np.concatenate(owners))
+
+        # Vocabulário: palavra -> atletas, e bigramas marcados -> palavras
+        split = pd.Series(self.keys, dtype=object).str.split(" ").explode()
+        split = split[split.fillna("") != ""]
+        self.words = Postings(split.to_numpy(dtype=object), split.index.to_numpy(dtype=np.int64))
+        vocabulary = [str(word) for word in self.words.keys]
+        self.word_chars = char_matrix(vocabulary)
+        self.word_lengths = np.fromiter((len(word) for word in vocabulary), dtype=np.int64, count=len(vocabulary))
+        marked = ngram_codes(char_matrix([f"{WORD_START}{word}{WORD_END}" for word in vocabulary]), 2)
+        valid = marked >= 0
+        word_rows = np.broadcast_to(np.arange(len(vocabulary))[:, None], marked.shape)[valid]
+        self.word_grams = Postings(marked[valid], word_rows)
+
+    @classmethod
+    def from_connection(cls, conn: sqlite3.Connection) -> "SearchIndex":
+        """Lê os atletas distintos de athlete_search (ou de athletes, se não existir)."""
+        try:
+            athletes = pd.read_sql_query("SELECT ID, Name, NOC, Sport FROM athlete_search", conn)
+        except Exception:
+            athletes = pd.read_sql_query("SELECT DISTINCT ID, Name, NOC, Sport FROM athletes", conn)
+        return cls(athletes)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _substring_candidates(self, term: str) -> np.ndarray:
+        n = max(size for size in NGRAM_SIZES if size <= len(term))
+        codes = set(ngram_codes(char_matrix([term]), n)[0].tolist())
+        lists = sorted((self.grams.get(code) for code in codes), key=len)
+        candidates = lists[0]
+        for positions in lists[1:]:
+            candidates = candidates[np.isin(candidates, positions, assume_unique=True)]
+            if not len(candidates):
+                break
+        return candidates
+
+    def _similar_words(self, term: str, max_distance: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Palavras do vocabulário a no máximo `max_distance` edições do termo."""
+        if max_distance == 0:
+            index = self.words.index_of(term)
+            if index is None:
+                return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+            return np.array([index]), np.array([0])
+
+        # Cada edição desfaz no máximo 3 bigramas marcados (transposição)
+        codes = set(ngram_codes(char_matrix([f"{WORD_START}{term}{WORD_END}"]), 2)[0].tolist())
+        words, shared = np.unique(np.concatenate([self.word_grams.get(code) for code in codes]), return_counts=True)
+        close = np.abs(self.word_lengths[words] - len(term)) <= max_distance
+        candidates = words[close & (shared >= len(codes) - 3 * max_distance)].astype(np.int64)
+        distances = edit_distances(
+            term, self.word_chars[candidates], self.word_lengths[candidates], max_distance
+        )
+        matched = distances <= max_distance
+        return candidates[matched], distances[matched]
+
+    def fuzzy_positions(self, query: str, max_distance: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Atletas com todas as palavras do termo a uma distância tolerada.
+
+        Cada palavra do termo casa com a palavra mais próxima do nome; a
+        distância do atleta é a soma. Retorna (posições, distâncias)
+        ordenados por distância e depois alfabeticamente.
+        """
+        empty = np.zeros(0, dtype=np.int64)
+        positions = distances = None
+        for term in normalize_name(query).split(" "):
+            if not term:
+                continue
+            words, word_distances = self._similar_words(term, fuzzy_distance(term, max_distance))
+            athletes, owner = self.words.expand(words)
+            if not len(athletes):
+                return empty, empty
+            # Menor distância por atleta para esta palavra do termo
+            best = word_distances[owner]
+            order = np.lexsort((best, athletes))
+            athletes, best = athletes[order], best[order]
+            first = np.concatenate(([True], athletes[1:] != athletes[:-1]))
+            athletes, best = athletes[first], best[first]
+            if positions is None:
+                positions, distances = athletes, best
+            else:
+                positions, left, right = np.intersect1d(positions, athletes, assume_unique=True, return_indices=True)
+                distances = distances[left] + best[right]
+            if not len(positions):
+                return empty, empty
+        if positions is None:
+            return empty, empty
+        order = np.lexsort((positions, distances))
+        return positions[order], distances[order]
+
+    def search(
+        self, query: str, limit: int, fuzzy: bool = False, max_distance: int = 2
+    ) -> List[Tuple[int, str, str, str]]:
+        """Retorna até `limit` atletas (ID, Name, NOC, Sport) na ordem do ranking.
+
+        Com `fuzzy`, as vagas que sobram depois dos resultados exatos são
+        preenchidas pelos nomes mais próximos, tolerando erros de digitação.
+        """
+        term = normalize_name(query)
+        if not term or limit <= 0:
+            return []
+        # Igual e prefixos: o intervalo [lo, hi) começa pelos nomes iguais ao termo
+        lo = bisect.bisect_left(self.keys, term)
+        hi = bisect.bisect_left(self.keys, term + "\U0010ffff", lo)
+        positions: List[int] = list(range(lo, min(hi, lo + limit)))
+
+        if len(positions) < limit and len(term) >= min(NGRAM_SIZES):
+            for position in self._substring_candidates(term).tolist():
+                if lo <= position < hi or term not in self.keys[position]:
+                    continue
+                positions.append(position)
+                if len(positions) == limit:
+                    break
+
+        if fuzzy and len(positions) < limit:
+            seen = set(positions)
+            for position in self.fuzzy_positions(term, max_distance)[0].tolist():
+                if position not in seen:
+                    positions.append(position)
+                    if len(positions) == limit:
+                        break
+        return [(int(self.ids[p]), self.names[p], self.nocs[p], self.sports[p]) for p in positions]
+
+    def stats(self) -> Dict[str, int]:
+        """Tamanho do índice."""
+        return {
+            "athletes": len(self.keys),
+            "ngrams": len(self.grams.keys),
+            "postings": len(self.grams),
+            "words": len(self.words.keys),
+        }
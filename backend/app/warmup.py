@@ -0,0 +1,174 @@
+"""Aquecimento do cache de respostas na inicialização."""
+import inspect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fastapi.params import Param
+
+from . import api, config
+from .data_loader import data_loader
+
+# Endpoints aquecidos, pelo nome usado em OLYMPICS_WARMUP_ENDPOINTS
+WARMUP_ENDPOINTS: Dict[str, Callable] = {
+    "map": api.get_map_stats,
+    "medals": api.get_medal_table,
+    "gender": api.get_gender_stats,
+    "top-athletes": api.get_top_athletes,
+    "biometrics": api.get_biometrics,
+    "evolution": api.get_evolution,
+    "dashboard": api.get_dashboard,
+}
+
+
+def warmup_combinations(year_season_map: Dict[int, List[str]], kinds: Sequence[str]) -> List[Dict[str, Any]]:
+    """Gera os filtros a aquecer.
+
+    `kinds` escolhe os grupos: "unfiltered" (sem filtro), "years" (cada ano,
+    como a tela inicial pede), "games" (cada edição, ano e temporada),
+    "seasons" (cada temporada) e "sexes" (cada sexo).
+    """
+    combos: List[Dict[str, Any]] = []
+    years = sorted(year_season_map)
+    if "unfiltered" in kinds:
+        combos.append({})
+    if "years" in kinds:
+        combos.extend({"year": year} for year in years)
+    if "games" in kinds:
+        combos.extend(
+            {"year": year, "season": season}
+            for year in years for season in sorted(year_season_map[year])
+        )
+    if "seasons" in kinds:
+        seasons = sorted({s for values in year_season_map.values() for s in values})
+        combos.extend({"season": season} for season in seasons)
+    if "sexes" in kinds:
+        combos.extend({"sex": sex} for sex in ("F", "M"))
+    return combos
+
+
+def call_kwargs(func: Callable, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Monta os argumentos de uma chamada direta ao endpoint.
+
+    Parâmetros que o endpoint não aceita são descartados e os padrões
+    declarados com `Query(...)` viram o valor padrão, como o FastAPI faria.
+    """
+    kwargs = {}
+    for name, parameter in inspect.signature(func).parameters.items():
+        if name == "request":
+            continue
+        if name in params:
+            kwargs[name] = params[name]
+        elif isinstance(parameter.default, Param):
+            kwargs[name] = parameter.default.default
+        elif parameter.default is not inspect.Parameter.empty:
+            kwargs[name] = parameter.default
+    return kwargs
+
+
+class CacheWarmer:
+    """Executa o aquecimento em segundo plano e acompanha o progresso."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._reset("idle")
+
+    def _reset(self, status: str) -> None:
+        self._status = status
+        self._total = 0
+        self._completed = 0
+        self._failed = 0
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+
+    def tasks(self) -> List[Tuple[Callable, Dict[str, Any]]]:
+        """Lista as chamadas a fazer, sem repetir chaves de cache equivalentes."""
+        year_season_map = data_loader.get_year_season_map()
+        combos = warmup_combinations(year_season_map, config.WARMUP_COMBINATIONS)
+        tasks, seen = [], set()
+        for combo in combos:
+            for name in config.WARMUP_ENDPOINTS:
+                func = WARMUP_ENDPOINTS.get(name)
+                if func is None:
+                    continue
+                kwargs = call_kwargs(func, combo)
+                key = api.get_cache_key(func.__name__, kwargs)
+                if key not in seen:
+                    seen.add(key)
+                    tasks.append((func, kwargs))
+        return tasks
+
+    def _run_task(self, func: Callable, kwargs: Dict[str, Any]) -> None:
+        if self._stop.is_set():
+            return
+        try:
+            func(**kwargs)
+            ok = True
+        except Exception as e:
+            print(f"Erro no aquecimento de {func.__name__}: {e}")
+            ok = False
+        with self._lock:
+            if ok:
+                self._completed += 1
+            else:
+                self._failed += 1
+
+    def run(self) -> None:
+        """Aquece /filters e as combinações configuradas, com paralelismo limitado."""
+        with self._lock:
+            self._reset("running")
+            self._started_at = time.monotonic()
+        try:
+            api.get_filters()
+            tasks = self.tasks()
+            with self._lock:
+                self._total = len(tasks)
+            with ThreadPoolExecutor(max_workers=max(1, config.WARMUP_WORKERS)) as executor:
+                for func, kwargs in tasks:
+                    executor.submit(self._run_task, func, kwargs)
+            status = "stopped" if self._stop.is_set() else "done"
+        except Exception as e:
+            print(f"Erro no aquecimento do cache: {e}")
+            status = "failed"
+        with self._lock:
+            self._status = status
+            self._finished_at = time.monotonic()
+
+    def start(self) -> threading.Thread:
+        """Inicia o aquecimento em uma thread de fundo."""
+        self._stop.clear()
+        with self._lock:
+            self._status = "running"
+        self._thread = threading.Thread(target=self.run, name="cache-warmup", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        """Pede que as tarefas restantes sejam ignoradas."""
+        self._stop.set()
+
+    def status(self) -> Dict[str, Any]:
+        """Retorna o progresso do aquecimento.
+
+        A instância fica pronta quando o aquecimento termina ou é interrompido;
+        se ele falhar por inteiro (não uma tarefa isolada), continua não pronta
+        para não receber tráfego com o cache frio.
+        """
+        with self._lock:
+            finished = self._completed + self._failed
+            end = self._finished_at if self._finished_at is not None else time.monotonic()
+            return {
+                "status": self._status,
+                "ready": self._status in ("done", "stopped") or not config.WARMUP_ENABLED,
+                "total": self._total,
+                "completed": self._completed,
+                "failed": self._failed,
+                "progress": round(finished / self._total, 4) if self._total else (1.0 if self._status == "done" else 0.0),
+                "elapsed_seconds": round(end - self._started_at, 3) if self._started_at is not None else 0.0,
+            }
+
+
+cache_warmer = CacheWarmer()
@@ -0,0 +1,72 @@
+"""Mede a latência da busca de atletas em memória, exata e aproximada.
+
+Usa os atletas do olympics.db multiplicados por `--scale` (cópias com IDs
+novos e um sufixo em parte dos sobrenomes, para o vocabulário crescer
+junto) e mede cada consulta várias vezes.
+
+    python scripts/benchmark_search.py --scale 10
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import DB_PATH  # noqa: E402
+from app.search_index import SearchIndex  # noqa: E402
+
+QUERIES = [
+    ("Phelps", False), ("phel", False), ("Italo", False), ("son", False),
+    ("Phelsp", True), ("Micheal Phelps", True), ("Bolt Usian", True), ("Itlao Manzine", True),
+]
+
+
+def load_athletes(db_path: str) -> pd.DataFrame:
+    """Lê os atletas distintos do banco."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return pd.read_sql_query("SELECT DISTINCT ID, Name, NOC, Sport FROM athletes", conn)
+    finally:
+        conn.close()
+
+
+def scale_athletes(athletes: pd.DataFrame, scale: int) -> pd.DataFrame:
+    """Replica os atletas `scale` vezes com IDs e sobrenomes novos."""
+    copies = [athletes]
+    offset = int(athletes["ID"].max()) + 1
+    for copy in range(1, scale):
+        suffix = np.where(np.arange(len(athletes)) % 2 == 0, f"{copy:x}", "")
+        copies.append(athletes.assign(ID=athletes["ID"] + offset * copy, Name=athletes["Name"] + suffix))
+    return pd.concat(copies, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    athletes = scale_athletes(load_athletes(args.db), args.scale)
+    started = time.perf_counter()
+    index = SearchIndex(athletes)
+    print(f"{len(index)} atletas, índice montado em {time.perf_counter() - started:.2f}s: {index.stats()}")
+
+    for query, fuzzy in QUERIES:
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            results = index.search(query, 20, fuzzy=fuzzy)
+            timings.append((time.perf_counter() - started) * 1000)
+        p50, p95 = np.percentile(timings, [50, 95])
+        label = f"{query!r}{' (fuzzy)' if fuzzy else ''}"
+        print(f"{label:28s} p50 {p50:7.3f} ms  p95 {p95:7.3f} ms  {len(results)} resultados")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,74 +1,274 @@
 """Script para converter CSV de atletas olímpicos para SQLite."""
 import pandas as pd
+import hashlib
 import sqlite3
 import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.athlete_profiles import COLUMNS as PROFILE_COLUMNS, build_athlete_documents, encode_document  # noqa: E402
+from app.athlete_tallies import TALLIES_SQL  # noqa: E402
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CSV_PATH = os.path.join(BASE_DIR, "data", "athlete_events.csv")
 DB_PATH = os.path.join(BASE_DIR, "data", "olympics.db")
 
-def convert_csv_to_sqlite():
-    """Converte o arquivo CSV para banco SQLite."""
-    if not os.path.exists(CSV_PATH):
-        print(f"Erro: Arquivo CSV não encontrado em {CSV_PATH}")
-        return
+# Versão do formato do banco; entra na versão dos dados junto com o CSV, para
+# que mudanças no conversor também invalidem os caches
+SCHEMA_VERSION = 7
 
-    print(f"Convertendo '{CSV_PATH}' para '{DB_PATH}'...")
-    
-    if os.path.exists(DB_PATH):
-        os.remove(DB_PATH)
+# Sexo usado em medal_events quando atletas de ambos os sexos dividem a medalha
+MIXED_SEX = 'X'
+
+
+# Índices da tabela athletes, casados com os filtros e colunas lidas pelos endpoints
+ATHLETE_INDEXES = {
+    # Perfil e estatísticas do atleta (WHERE ID = ?)
+    "idx_athletes_id": "ID",
+    # Filtros por ano/intervalo cobrindo as colunas de /stats/gender e o mapa ano-temporada
+    "idx_athletes_games": "Year, Season, Sex, NOC, Sport, Medal, ID",
+    # Demais filtros seguidos de (Sex, ID): COUNT(DISTINCT ID) por sexo lido só do índice
+    "idx_athletes_season": "Season, Sex, ID",
+    "idx_athletes_sex": "Sex, ID",
+    "idx_athletes_sport": "Sport, Sex, ID",
+    "idx_athletes_medal": "Medal, Sex, ID",
+    # Filtro por país e mapa NOC -> nome do time
+    "idx_athletes_noc": "NOC, Team",
+    # Grade e sorteio da amostra de /stats/biometrics sem filtros lidos só do índice
+    "idx_athletes_biometrics": "Height, Weight, Sex, Medal",
+    # Busca por nome varre o índice estreito em vez da tabela
+    "idx_athletes_search": "Name, ID, NOC, Sport",
+}
+
+
+def create_athlete_indexes(conn):
+    """Cria os índices da tabela athletes."""
+    cursor = conn.cursor()
+    for name, columns in ATHLETE_INDEXES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON athletes ({columns})")
+
+
+def build_medal_tables(conn):
+    """Cria as tabelas de fatos de medalhas deduplicadas.
+
+    `medal_events` tem uma linha por medalha conquistada por um país em um
+    evento (esportes coletivos contam uma vez). A coluna Sex vale 'M' ou 'F',
+    ou 'X' quando atletas dos dois sexos do país dividem a medalha; o filtro
+    por sexo deve então aceitar o valor pedido ou 'X'.
 
-    conn = sqlite3.connect(DB_PATH)
+    `athlete_medals` tem uma linha distinta por atleta, edição e evento
+    medalhado, usada no ranking de atletas, e `athlete_tallies` soma essas
+    medalhas por atleta, edição e esporte.
+    """
     cursor = conn.cursor()
+    cursor.execute("DROP TABLE IF EXISTS medal_events")
+    cursor.execute(f"""
+        CREATE TABLE medal_events AS
+        SELECT Year, Season, NOC, Sport, Event, Medal,
+            CASE WHEN MIN(Sex) = MAX(Sex) THEN MIN(Sex) ELSE '{MIXED_SEX}' END AS Sex
+        FROM athletes
+        WHERE Medal != 'No Medal'
+        GROUP BY Year, Season, NOC, Sport, Event, Medal
+    """)
+    cursor.execute("CREATE INDEX idx_medal_events_year ON medal_events (Year, Season)")
+    cursor.execute("CREATE INDEX idx_medal_events_noc ON medal_events (NOC, Year)")
+    cursor.execute("CREATE INDEX idx_medal_events_sport ON medal_events (Sport, Year)")
+
+    cursor.execute("DROP TABLE IF EXISTS athlete_medals")
+    cursor.execute("""
+        CREATE TABLE athlete_medals AS
+        SELECT DISTINCT ID, Name, NOC, Year, Season, Sex, Sport, Event, Medal
+        FROM athletes
+        WHERE Medal != 'No Medal'
+    """)
+    cursor.execute("CREATE INDEX idx_athlete_medals_year ON athlete_medals (Year, Season)")
+    cursor.execute("CREATE INDEX idx_athlete_medals_noc ON athlete_medals (NOC, Year)")
+    cursor.execute("CREATE INDEX idx_athlete_medals_sport ON athlete_medals (Sport, Year)")
+
+    # Medalhas por atleta e edição, lidas pelo ranking de atletas em memória
+    cursor.execute("DROP TABLE IF EXISTS athlete_tallies")
+    cursor.execute(f"CREATE TABLE athlete_tallies AS {TALLIES_SQL}")
+
+
+def build_sex_counts(conn):
+    """Cria a tabela athlete_sex_counts: atletas distintos por sexo no banco inteiro.
+
+    É a resposta de /stats/gender sem filtros, que de outro modo leria o
+    índice (Sex, ID) inteiro para contar os IDs distintos.
+    """
+    cursor = conn.cursor()
+    cursor.execute("DROP TABLE IF EXISTS athlete_sex_counts")
+    cursor.execute("""
+        CREATE TABLE athlete_sex_counts AS
+        SELECT Sex, COUNT(DISTINCT ID) AS Count
+        FROM athletes
+        GROUP BY Sex
+    """)
+
+
+def dataset_version(csv_path):
+    """Calcula a versão dos dados: hash do CSV de origem e do formato do banco."""
+    digest = hashlib.sha256(f"schema-{SCHEMA_VERSION}\n".encode())
+    with open(csv_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def write_dataset_meta(conn, version, total_rows):
+    """Grava a versão dos dados, lida pelo servidor para invalidar os caches."""
+    cursor = conn.cursor()
+    cursor.execute("DROP TABLE IF EXISTS dataset_meta")
+    cursor.execute("CREATE TABLE dataset_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    cursor.executemany("INSERT INTO dataset_meta VALUES (?, ?)", [
+        ("version", version),
+        ("schema_version", str(SCHEMA_VERSION)),
+        ("rows", str(total_rows)),
+        ("built_at", time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())),
+    ])
+
 
-    chunk_size = 10000
-    total_rows = 0
+def build_search_index(conn):
+    """Cria o índice de busca de atletas (FTS5 com tokenizador trigram).
+
+    Guarda uma linha por (ID, Name, NOC, Sport) distinto; o trigram permite
+    que `Name LIKE '%termo%'` use o índice em vez de varrer a tabela. Em
+    SQLite sem FTS5 ou sem o tokenizador (anterior à 3.34) a tabela não é
+    criada e a API busca direto em athletes. Retorna se o índice foi criado.
+    """
+    cursor = conn.cursor()
+    cursor.execute("DROP TABLE IF EXISTS athlete_search")
+    try:
+        cursor.execute("""
+            CREATE VIRTUAL TABLE athlete_search USING fts5(
+                Name, ID UNINDEXED, NOC UNINDEXED, Sport UNINDEXED,
+                tokenize = 'trigram'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        print(f"Aviso: índice de busca FTS5 indisponível ({e}); a busca usará LIKE")
+        return False
+    cursor.execute("""
+        INSERT INTO athlete_search (Name, ID, NOC, Sport)
+        SELECT DISTINCT Name, ID, NOC, Sport FROM athletes
+    """)
+    cursor.execute("INSERT INTO athlete_search (athlete_search) VALUES ('optimize')")
+    return True
+
+
+def build_athlete_profiles(conn):
+    """Cria a tabela athlete_profiles: perfil e estatísticas prontos por atleta.
+
+    Cada linha guarda, já codificados em JSON compacto, os corpos de
+    `/athletes/{id}` e `/athletes/{id}/stats`; os endpoints fazem uma busca
+    pela chave primária e devolvem os bytes sem montar nada.
+    """
+    rows = pd.read_sql_query(f"SELECT {', '.join(PROFILE_COLUMNS)} FROM athletes", conn)
+    cursor = conn.cursor()
+    cursor.execute("DROP TABLE IF EXISTS athlete_profiles")
+    cursor.execute("""
+        CREATE TABLE athlete_profiles (
+            ID INTEGER PRIMARY KEY,
+            profile BLOB NOT NULL,
+            stats BLOB NOT NULL
+        )
+    """)
+    cursor.executemany(
+        "INSERT INTO athlete_profiles VALUES (?, ?, ?)",
+        ((athlete_id, encode_document(profile), encode_document(stats))
+         for athlete_id, profile, stats in build_athlete_documents(rows)),
+    )
+
+
+def convert_csv_to_sqlite(csv_path=CSV_PATH, db_path=DB_PATH):
+    """Converte o arquivo CSV para banco SQLite.
+
+    O banco é montado em um arquivo temporário ao lado do destino e só
+    substitui o atual, com `os.replace` (atômico), quando está completo; um
+    servidor em execução continua lendo o banco anterior até perceber a troca.
+    """
+    if not os.path.exists(csv_path):
+        print(f"Erro: Arquivo CSV não encontrado em {csv_path}")
+        return
+
+    print(f"Convertendo '{csv_path}' para '{db_path}'...")
+
+    tmp_path = f"{db_path}.tmp-{os.getpid()}"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    cursor = conn.cursor()
+    try:
+        chunk_size = 10000
+        total_rows = 0
     
-    encodings = ['utf-8', 'latin-1']
-    success = False
+        encodings = ['utf-8', 'latin-1']
+        success = False
     
-    for encoding in encodings:
-        try:
-            print(f"Tentando ler CSV com encoding {encoding}...")
-            with pd.read_csv(CSV_PATH, chunksize=chunk_size, encoding=encoding) as reader:
-                for i, chunk in enumerate(reader):
-                    if 'Medal' in chunk.columns:
-                        chunk['Medal'] = chunk['Medal'].fillna('No Medal')
+        for encoding in encodings:
+            try:
+                print(f"Tentando ler CSV com encoding {encoding}...")
+                with pd.read_csv(csv_path, chunksize=chunk_size, encoding=encoding) as reader:
+                    for i, chunk in enumerate(reader):
+                        if 'Medal' in chunk.columns:
+                            chunk['Medal'] = chunk['Medal'].fillna('No Medal')
                     
-                    if 'Name' in chunk.columns:
-                        mask_talo = chunk['Name'].str.startswith('talo Manzine', na=False)
-                        if mask_talo.any():
-                            chunk.loc[mask_talo, 'Name'] = chunk.loc[mask_talo, 'Name'].str.replace(r'^talo Manzine', 'Ítalo Manzine', regex=True)
-                        chunk['Name'] = chunk['Name'].str.strip()
+                        if 'Name' in chunk.columns:
+                            mask_talo = chunk['Name'].str.startswith('talo Manzine', na=False)
+                            if mask_talo.any():
+                                chunk.loc[mask_talo, 'Name'] = chunk.loc[mask_talo, 'Name'].str.replace(r'^talo Manzine', 'Ítalo Manzine', regex=True)
+                            chunk['Name'] = chunk['Name'].str.strip()
                     
-                    chunk.to_sql('athletes', conn, if_exists='append', index=False)
-                    total_rows += len(chunk)
-                    print(f"Processado chunk {i+1} ({total_rows} linhas)...")
+                        chunk.to_sql('athletes', conn, if_exists='append', index=False)
+                        total_rows += len(chunk)
+                        print(f"Processado chunk {i+1} ({total_rows} linhas)...")
             
-            success = True
-            break
-        except UnicodeDecodeError:
-            continue
-        except Exception as e:
-            print(f"Erro: {e}")
-            break
-
-    if success:
-        print("Criando índices para performance...")
-        cursor.execute("CREATE INDEX idx_year ON athletes (Year)")
-        cursor.execute("CREATE INDEX idx_season ON athletes (Season)")
-        cursor.execute("CREATE INDEX idx_noc ON athletes (NOC)")
-        cursor.execute("CREATE INDEX idx_sport ON athletes (Sport)")
-        cursor.execute("CREATE INDEX idx_medal ON athletes (Medal)")
-        cursor.execute("CREATE INDEX idx_sex ON athletes (Sex)")
-        
-        conn.commit()
-        print(f"Sucesso! Banco de dados criado com {total_rows} registros.")
-        print(f"Arquivo salvo em: {DB_PATH}")
-    else:
-        print("Falha na conversão.")
-
-    conn.close()
+                success = True
+                break
+            except UnicodeDecodeError:
+                continue
+            except Exception as e:
+                print(f"Erro: {e}")
+                break
+
+        if success:
+            print("Criando índices para performance...")
+            create_athlete_indexes(conn)
+
+            print("Criando tabelas de medalhas deduplicadas...")
+            build_medal_tables(conn)
+
+            print("Contando atletas por sexo...")
+            build_sex_counts(conn)
+
+            print("Criando índice de busca de atletas...")
+            build_search_index(conn)
+
+            print("Montando perfis de atletas...")
+            build_athlete_profiles(conn)
+
+            print("Coletando estatísticas para o planejador (ANALYZE)...")
+            cursor.execute("ANALYZE")
+
+            version = dataset_version(csv_path)
+            write_dataset_meta(conn, version, total_rows)
+
+            conn.commit()
+            conn.close()
+            os.replace(tmp_path, db_path)
+            print(f"Sucesso! Banco de dados criado com {total_rows} registros (versão {version}).")
+            print(f"Arquivo salvo em: {db_path}")
+        else:
+            print("Falha na conversão.")
+    finally:
+        # Falhas em qualquer etapa não deixam cópias temporárias para trás
+        conn.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
 
 if __name__ == "__main__":
     convert_csv_to_sqlite()
@@ -1,11 +1,13 @@
 """Configurações e fixtures para testes."""
 import pytest
 from fastapi.testclient import TestClient
+from unittest.mock import patch
 import pandas as pd
 import numpy as np
 
 from app.main import app
-from app.data_loader import DataLoader
+from app.data_loader import DataLoader, data_loader
+from scripts.convert_to_sqlite import convert_csv_to_sqlite
 
 
 @pytest.fixture(scope="session")
@@ -68,6 +70,36 @@ def medals_only_dataframe():
     })
 
 
+@pytest.fixture
+def sample_db(tmp_path, sample_dataframe):
+    """Banco SQLite gerado pelo conversor a partir do DataFrame de exemplo."""
+    csv_path = tmp_path / "athlete_events.csv"
+    db_path = tmp_path / "olympics.db"
+    sample_dataframe.to_csv(csv_path, index=False)
+    convert_csv_to_sqlite(str(csv_path), str(db_path))
+    return str(db_path)
+
+
+@pytest.fixture
+def use_sample_db(sample_db):
+    """Aponta o data_loader para o banco de exemplo durante o teste.
+
+    A troca de caminho equivale a iniciar o servidor com outro banco, não a
+    uma recarga: a versão conhecida é esquecida na entrada e na saída.
+    """
+    def reset():
+        data_loader.close()
+        data_loader._pool = None
+        data_loader._signature = None
+        data_loader._version = None
+        data_loader.invalidate()
+
+    reset()
+    with patch('app.data_loader.DB_PATH', sample_db):
+        yield sample_db
+        reset()
+
+
 @pytest.fixture(autouse=True)
 def reset_cache():
     """Limpa o cache de respostas antes de cada teste."""
@@ -1,12 +1,17 @@
 """Testes para a API do backend."""
+import contextlib
+import sqlite3
+
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 import pandas as pd
 import numpy as np
 
+from app import config
 from app.main import app
 from app.api import router, RESPONSE_CACHE, get_cache_key, cached_endpoint
+from app.data_loader import data_loader
 
 client = TestClient(app)
 
@@ -47,6 +52,55 @@ class TestCacheUtils:
         assert response1.json() == response2.json()
 
 
+class TestCanonicalCacheKeys:
+    """Parâmetros equivalentes compartilham a mesma chave de cache."""
+
+    @pytest.mark.parametrize("a,b", [
+        ({"season": "Both"}, {}),
+        ({"season": "Both"}, {"season": None}),
+        ({"sex": "Both"}, {}),
+        ({"country": "All"}, {}),
+        ({"sport": "All"}, {}),
+        ({"medal_type": "Total"}, {}),
+        ({"year": 2016}, {"start_year": 2016, "end_year": 2016}),
+        ({"year": 2016, "start_year": 2000, "end_year": 2020}, {"year": 2016}),
+        ({"start_year": 2000}, {}),
+        ({"countries": ["USA", "BRA"]}, {"countries": ["BRA", "USA", "BRA"]}),
+        ({"countries": []}, {}),
+    ])
+    def test_equivalent_params_share_key(self, a, b):
+        """Grafias diferentes do mesmo filtro."""
+        assert get_cache_key("f", a) == get_cache_key("f", b)
+
+    @pytest.mark.parametrize("a,b", [
+        ({"season": "Summer"}, {"season": "Winter"}),
+        ({"year": 2016}, {"start_year": 2012, "end_year": 2016}),
+        ({"country": "USA"}, {"countries": ["USA"]}),
+        ({"limit": 10}, {"limit": 20}),
+    ])
+    def test_distinct_params_have_distinct_keys(self, a, b):
+        """Filtros diferentes não colidem."""
+        assert get_cache_key("f", a) != get_cache_key("f", b)
+
+    def test_biometrics_default_sport_shares_entry(self):
+        """sport padrão ('All') e sport omitido usam a mesma entrada."""
+        with patch('app.api.data_loader') as mock_loader:
+            mock_loader.get_connection_context.side_effect = Exception("sem banco")
+            client.get("/api/stats/biometrics")
+            client.get("/api/stats/biometrics?sport=All&season=Both&country=All")
+        assert len([k for k in RESPONSE_CACHE.keys() if k.startswith("get_biometrics")]) == 1
+
+    def test_year_and_single_year_range_share_entry(self):
+        """year=2016 e start_year=end_year=2016 reaproveitam a resposta."""
+        with patch('app.api.data_loader') as mock_loader:
+            mock_loader.get_connection_context.side_effect = Exception("sem banco")
+            client.get("/api/stats/gender?year=2016&medal_type=Total")
+            hits = RESPONSE_CACHE.stats()["hits"]
+            client.get("/api/stats/gender?start_year=2016&end_year=2016")
+        assert RESPONSE_CACHE.stats()["hits"] == hits + 1
+        assert len([k for k in RESPONSE_CACHE.keys() if k.startswith("get_gender_stats")]) == 1
+
+
 class TestFiltersEndpoint:
     """Testes para /api/filters."""
     
@@ -243,7 +297,8 @@ class TestBiometricsEndpoint:
         response = client.get("/api/stats/biometrics")
         assert response.status_code == 200
         data = response.json()
-        assert isinstance(data, list)
+        assert isinstance(data["points"], list)
+        assert data["population"] >= len(data["points"])
     
     def test_get_biometrics_with_sport(self):
         """Com filtro de esporte."""
@@ -266,7 +321,7 @@ class TestBiometricsEndpoint:
     def test_get_biometrics_structure(self):
         """Estrutura de retorno."""
         response = client.get("/api/stats/biometrics")
-        data = response.json()
+        data = response.json()["points"]
         
         if len(data) > 0:
             item = data[0]
@@ -540,6 +595,56 @@ class TestAthleteSearchEndpoint:
         data = response.json()
         assert data == []
     
+    SEARCH_NAMES = pd.DataFrame({
+        'ID': [1, 2, 3, 4],
+        'Name': ['Anna Silva', 'Silvana Costa', 'Bruno Silveira', 'Carla Souza'],
+        'Sex': ['F', 'F', 'M', 'F'],
+        'Age': [25, 28, 22, 30],
+        'Height': [170.0, 165.0, 180.0, 160.0],
+        'Weight': [60.0, 58.0, 75.0, 55.0],
+        'Team': ['Brazil'] * 4,
+        'NOC': ['BRA'] * 4,
+        'Year': [2016] * 4,
+        'Season': ['Summer'] * 4,
+        'City': ['Rio'] * 4,
+        'Sport': ['Judo', 'Judo', 'Swimming', 'Judo'],
+        'Event': ['Event 1', 'Event 2', 'Event 3', 'Event 4'],
+        'Medal': ['Gold', 'No Medal', 'No Medal', 'Silver'],
+    })
+
+    @pytest.mark.parametrize("search_index", [True, False])
+    @pytest.mark.parametrize("sample_dataframe", [SEARCH_NAMES])
+    def test_search_ranks_prefix_first(self, use_sample_db, sample_dataframe, search_index):
+        """Prefixo primeiro, depois ordem alfabética, sem diferenciar maiúsculas."""
+        with patch.object(config, 'SEARCH_INDEX_ENABLED', search_index):
+            data = client.get("/api/athletes/search?query=silv").json()
+        assert [item['name'] for item in data] == ['Silvana Costa', 'Anna Silva', 'Bruno Silveira']
+        assert data[0] == {"id": 2, "name": "Silvana Costa", "noc": "BRA", "sport": "Judo"}
+
+    @pytest.mark.parametrize("sample_dataframe", [SEARCH_NAMES])
+    def test_search_fuzzy(self, use_sample_db, sample_dataframe):
+        """fuzzy=true tolera erros de digitação depois dos resultados exatos."""
+        with patch.object(config, 'SEARCH_INDEX_ENABLED', True):
+            exact = client.get("/api/athletes/search?query=Slivana").json()
+            fuzzy = client.get("/api/athletes/search?query=Slivana&fuzzy=true").json()
+            strict = client.get("/api/athletes/search?query=Slivana&fuzzy=true&max_distance=0").json()
+        assert exact == []
+        assert [item['name'] for item in fuzzy] == ['Silvana Costa']
+        assert strict == []
+        assert client.get("/api/athletes/search?query=Slivana&max_distance=9").status_code == 422
+
+    def test_search_without_fts_index(self):
+        """Banco sem athlete_search e termos curtos usam athletes com a mesma ordem."""
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.SEARCH_NAMES.to_sql('athletes', conn, index=False)
+        with patch.object(config, 'SEARCH_INDEX_ENABLED', False), \
+                patch.object(data_loader, 'get_connection_context', side_effect=lambda: contextlib.nullcontext(conn)):
+            names = [item['name'] for item in client.get("/api/athletes/search?query=silv").json()]
+            short = [item['name'] for item in client.get("/api/athletes/search?query=Co").json()]
+        conn.close()
+        assert names == ['Silvana Costa', 'Anna Silva', 'Bruno Silveira']
+        assert short == ['Silvana Costa']
+
     def test_search_athletes_starts_with_priority(self):
         """Nomes que começam com a query aparecem primeiro."""
         response = client.get("/api/athletes/search?query=Phelps")
@@ -608,6 +713,82 @@ class TestAthleteProfileEndpoint:
                 assert "max" in data["age_range"]
 
 
+class TestAthleteProfileDocuments:
+    """Testes para os perfis lidos de athlete_profiles."""
+
+    def test_served_from_stored_bytes(self, use_sample_db):
+        """O corpo da resposta é o documento guardado pelo conversor."""
+        conn = sqlite3.connect(use_sample_db)
+        profile, stats = conn.execute("SELECT profile, stats FROM athlete_profiles WHERE ID = 2").fetchone()
+        conn.close()
+        assert client.get("/api/athletes/2").content == profile
+        assert client.get("/api/athletes/2/stats").content == stats
+        assert client.get("/api/athletes/99/stats").json() == {"error": "Atleta não encontrado"}
+
+    def test_full_joins_profile_and_stats(self, use_sample_db):
+        """/full traz os campos do perfil e das estatísticas em um objeto."""
+        full = client.get("/api/athletes/4/full").json()
+        profile = client.get("/api/athletes/4").json()
+        stats = client.get("/api/athletes/4/stats").json()
+        assert full == {**profile, **stats}
+        assert full["medals"]["bronze"] == 1
+        assert client.get("/api/athletes/99/full").json() == {"error": "Atleta não encontrado"}
+
+    def test_database_without_profiles_table(self, use_sample_db, sample_dataframe):
+        """Banco sem athlete_profiles monta as mesmas respostas a partir de athletes."""
+        urls = [f"/api/athletes/{athlete_id}{suffix}" for athlete_id in (1, 5, 99) for suffix in ("", "/stats", "/full")]
+        stored = [client.get(url).json() for url in urls]
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        sample_dataframe.to_sql('athletes', conn, index=False)
+        with patch.object(data_loader, 'get_connection_context', side_effect=lambda: contextlib.nullcontext(conn)):
+            rebuilt = [client.get(url).json() for url in urls]
+        conn.close()
+        assert rebuilt == stored
+
+
+class TestAthleteBatchEndpoint:
+    """Testes para POST /api/athletes/batch."""
+
+    def test_profiles_keyed_by_id(self, use_sample_db):
+        """Perfis na ordem pedida, sem repetição e sem IDs inexistentes."""
+        response = client.post("/api/athletes/batch", json={"ids": [3, 1, 99, 3]})
+        assert response.status_code == 200
+        data = response.json()
+        assert list(data) == ["3", "1"]
+        assert data["1"] == client.get("/api/athletes/1").json()
+        assert client.post("/api/athletes/batch", json={"ids": []}).json() == {}
+
+    def test_database_without_profiles_table(self, use_sample_db, sample_dataframe):
+        """Sem athlete_profiles, os perfis são montados das linhas de athletes."""
+        stored = client.post("/api/athletes/batch", json={"ids": [2, 7]}).json()
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        sample_dataframe.to_sql('athletes', conn, index=False)
+        with patch.object(data_loader, 'get_connection_context', side_effect=lambda: contextlib.nullcontext(conn)):
+            rebuilt = client.post("/api/athletes/batch", json={"ids": [2, 7]}).json()
+        conn.close()
+        assert rebuilt == stored
+
+    def test_ids_are_read_in_chunks(self, use_sample_db, sample_dataframe):
+        """Lotes maiores que SQL_MAX_PARAMS são lidos em blocos, com e sem athlete_profiles."""
+        ids = [3, 1, 99, 2, 7]
+        stored = client.post("/api/athletes/batch", json={"ids": ids}).json()
+        with patch('app.api.SQL_MAX_PARAMS', 2):
+            assert client.post("/api/athletes/batch", json={"ids": ids}).json() == stored
+            conn = sqlite3.connect(":memory:", check_same_thread=False)
+            sample_dataframe.to_sql('athletes', conn, index=False)
+            with patch.object(data_loader, 'get_connection_context', side_effect=lambda: contextlib.nullcontext(conn)):
+                assert client.post("/api/athletes/batch", json={"ids": ids}).json() == stored
+            conn.close()
+        assert list(stored) == ["3", "1", "2", "7"]
+
+    def test_rejects_too_many_ids(self):
+        """Acima do limite configurado responde 422."""
+        with patch.object(config, 'ATHLETE_BATCH_MAX_IDS', 2):
+            response = client.post("/api/athletes/batch", json={"ids": [1, 2, 3]})
+        assert response.status_code == 422
+        assert client.post("/api/athletes/batch", json={"ids": "1"}).status_code == 422
+
+
 class TestAthleteStatsEndpoint:
     """Testes para /api/athletes/{athlete_id}/stats."""
     
@@ -0,0 +1,103 @@
+"""Testes para os bitsets de atletas por partição."""
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app import config
+from app.api import RESPONSE_CACHE
+from app.athlete_bitsets import AthleteBitsets, _popcount_table, popcount
+from app.filters import Filters
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def athletes_db():
+    """Atletas espalhados por várias palavras, países, esportes e edições."""
+    rng = np.random.default_rng(11)
+    n = 3000
+    ids = rng.integers(1, 400, n)
+    frame = pd.DataFrame({
+        'ID': ids,
+        'Sex': np.where(ids % 3 == 0, 'F', 'M'),
+        'NOC': rng.choice(['BRA', 'USA', 'GER', 'KEN'], n),
+        'Year': rng.choice([2008, 2010, 2012, 2014, 2016], n),
+        'Season': rng.choice(['Summer', 'Winter'], n),
+        'Sport': rng.choice(['Judo', 'Rowing', 'Skiing'], n),
+        'Medal': rng.choice(['No Medal', 'Gold', 'Silver', 'Bronze'], n, p=[0.85, 0.05, 0.05, 0.05]),
+    })
+    conn = sqlite3.connect(":memory:")
+    frame.to_sql('athletes', conn, index=False)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture(scope="module")
+def bitsets(athletes_db):
+    return AthleteBitsets.from_connection(athletes_db)
+
+
+def sql_distinct(conn, filters, by):
+    """COUNT(DISTINCT ID) calculado pelo SQLite."""
+    where, params = filters.to_sql()
+    if by is None:
+        query = f"SELECT COUNT(DISTINCT ID) AS Count FROM athletes {where}"
+    else:
+        query = f"SELECT {by}, COUNT(DISTINCT ID) AS Count FROM athletes {where} GROUP BY {by}"
+    return pd.read_sql_query(query, conn, params=params).to_dict(orient='records')
+
+
+class TestPopcount:
+    """Testes para a contagem de bits."""
+
+    def test_table_matches_numpy(self):
+        """A tabela por byte conta o mesmo que a contagem direta."""
+        words = np.array([0, 1, 2**63, 2**64 - 1, 0x0F0F], dtype=np.uint64)
+        assert _popcount_table(words).tolist() == [0, 1, 1, 64, 8]
+        assert popcount(words).tolist() == [0, 1, 1, 64, 8]
+
+
+class TestAthleteBitsets:
+    """Testes para as contagens de atletas distintos."""
+
+    @pytest.mark.parametrize("params", [
+        {}, {'year': 2012}, {'start_year': 2008, 'end_year': 2012}, {'season': 'Winter'}, {'sex': 'F'},
+        {'country': 'KEN'}, {'countries': ['BRA', 'USA', 'ZZZ']}, {'sport': 'Rowing'}, {'medal_type': 'Gold'},
+        {'year': 2016, 'season': 'Summer', 'sex': 'M', 'country': 'USA', 'sport': 'Judo', 'medal_type': 'Silver'},
+        {'year': 1900},
+    ])
+    @pytest.mark.parametrize("by", [None, 'Sex', 'NOC', 'Year', 'Medal'])
+    def test_matches_count_distinct(self, athletes_db, bitsets, params, by):
+        """OR dos bitsets mais popcount dá o mesmo que COUNT(DISTINCT ID)."""
+        filters = Filters.from_params(**params)
+        assert bitsets.distinct_count(filters, by).to_dict(orient='records') == sql_distinct(athletes_db, filters, by)
+
+    def test_partitions_keep_only_used_words(self, athletes_db, bitsets):
+        """Cada partição guarda só as palavras com algum atleta."""
+        stats = bitsets.stats()
+        assert stats['athletes'] == athletes_db.execute("SELECT COUNT(DISTINCT ID) FROM athletes").fetchone()[0]
+        assert (bitsets.word_bits != 0).all()
+        assert stats['words'] < stats['partitions'] * bitsets.n_words
+
+    def test_empty_table(self):
+        """Sem linhas, toda contagem é zero."""
+        empty = AthleteBitsets(pd.DataFrame({c: [] for c in ('ID', 'Year', 'Season', 'Sex', 'NOC', 'Sport', 'Medal')}))
+        assert empty.distinct_count(Filters()).to_dict(orient='records') == [{'Count': 0}]
+        assert empty.distinct_count(Filters(), 'Sex').empty
+
+
+class TestGenderEndpointWithBitsets:
+    """Testes para /api/stats/gender lendo os bitsets."""
+
+    @pytest.mark.parametrize("query", ["", "country=USA", "year=2016&medal_type=Gold", "sex=F"])
+    def test_same_as_sql(self, use_sample_db, query):
+        """Bitsets e SQL devolvem a mesma distribuição."""
+        with patch.object(config, 'ATHLETE_BITSETS_ENABLED', False):
+            expected = client.get(f"/api/stats/gender?{query}").json()
+        RESPONSE_CACHE.clear()
+        assert client.get(f"/api/stats/gender?{query}").json() == expected
@@ -0,0 +1,71 @@
+"""Testes para a montagem dos documentos de perfil dos atletas."""
+import json
+
+import numpy as np
+import pandas as pd
+
+from app.athlete_profiles import build_athlete_documents, encode_document, merge_documents
+
+
+def athlete_rows():
+    return pd.DataFrame({
+        'ID': [7, 3, 7, 7, 7],
+        'Name': ['Ana Old', 'Bruno', 'Ana New', 'Ana Tie', 'Ana Early'],
+        'Sex': ['F', 'M', 'F', 'F', 'F'],
+        'Age': [30.0, np.nan, 31.0, 31.0, 22.0],
+        'Height': [170.0, np.nan, 171.0, 172.0, 168.0],
+        'Weight': [60.0, np.nan, 61.0, 62.0, 58.0],
+        'Team': ['Brazil', None, None, 'Brazil-2', 'Brazil'],
+        'NOC': ['BRA', 'ARG', 'BRA', 'BRA', 'BRA'],
+        'Year': [2012, 2016, 2016, 2016, 2008],
+        'Season': ['Summer'] * 5,
+        'City': ['London', 'Rio', None, 'Rio', 'Beijing'],
+        'Sport': ['Judo', 'Rowing', 'Sailing', 'Judo', 'Judo'],
+        'Event': ['E1', 'E2', 'E3', 'E4', 'E5'],
+        'Medal': ['Gold', 'No Medal', 'Silver', 'Silver', 'No Medal'],
+    })
+
+
+class TestBuildAthleteDocuments:
+    """Testes para o perfil e as estatísticas montados em lote."""
+
+    def test_one_document_per_athlete(self):
+        """Um documento por ID, em ordem de ID."""
+        assert [athlete_id for athlete_id, _, _ in build_athlete_documents(athlete_rows())] == [3, 7]
+        assert list(build_athlete_documents(athlete_rows().iloc[:0])) == []
+
+    def test_profile(self):
+        """Dados do registro mais recente; participações por ano; None no lugar de NaN."""
+        (_, missing, _), (_, profile, _) = build_athlete_documents(athlete_rows())
+        assert profile["name"] == "Ana New"
+        assert profile["team"] == "BRA"
+        assert (profile["height"], profile["weight"]) == (171.0, 61.0)
+        assert profile["age_range"] == {"min": 22, "max": 31}
+        assert profile["sports"] == ["Judo", "Sailing"]
+        assert profile["years"] == [2008, 2012, 2016]
+        assert profile["medals"] == {"gold": 1, "silver": 2, "bronze": 0, "total": 3}
+        assert [p["event"] for p in profile["participations"]] == ["E5", "E1", "E3", "E4"]
+        assert profile["participations"][2] == {
+            "year": 2016, "season": "Summer", "city": None, "sport": "Sailing", "event": "E3", "medal": "Silver"
+        }
+        assert missing["age_range"] == {"min": None, "max": None}
+        assert missing["height"] is None
+
+    def test_stats(self):
+        """Evolução por ano e medalhas por esporte do maior total ao menor."""
+        (_, _, stats), = build_athlete_documents(athlete_rows().query("ID == 7"))
+        assert stats["evolution"][-1] == {"Year": 2016, "Gold": 0, "Silver": 2, "Bronze": 0, "Total": 2, "Events": 2}
+        assert stats["biometrics"] == {"height": 171.0, "weight": 61.0, "sex": "F"}
+        assert [(s["name"], s["total"]) for s in stats["medals_by_sport"]] == [("Judo", 2), ("Sailing", 1)]
+
+    def test_encoded_like_json_response(self):
+        """Codificação compacta, com acentos preservados."""
+        assert encode_document({"name": "Ítalo", "height": None}) == '{"name":"Ítalo","height":null}'.encode()
+        (_, profile, _), _ = build_athlete_documents(athlete_rows())
+        assert json.loads(encode_document(profile)) == profile
+
+    def test_merge_documents(self):
+        """Objetos codificados viram um só, com os campos de todos."""
+        merged = merge_documents([encode_document({"a": 1}), encode_document({"b": [2], "c": "ç"})])
+        assert json.loads(merged) == {"a": 1, "b": [2], "c": "ç"}
+        assert merge_documents([b'{"a":1}']) == b'{"a":1}'
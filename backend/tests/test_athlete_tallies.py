@@ -0,0 +1,114 @@
+"""Testes para os rankings de atletas por partição."""
+import sqlite3
+
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+from app.athlete_tallies import AthleteTallies, TALLIES_SQL
+from app.filters import Filters
+
+
+def sql_ranking(conn, filters, limit):
+    """Ranking calculado com GROUP BY sobre athlete_medals, como no endpoint SQL."""
+    sort_col = filters.medal_type.lower() if filters.medal_type else 'total'
+    where, params = filters.to_sql()
+    return pd.read_sql_query(f"""
+        SELECT ID as id, Name as name, NOC as noc,
+            SUM(CASE WHEN Medal = 'Gold' THEN 1 ELSE 0 END) as gold,
+            SUM(CASE WHEN Medal = 'Silver' THEN 1 ELSE 0 END) as silver,
+            SUM(CASE WHEN Medal = 'Bronze' THEN 1 ELSE 0 END) as bronze,
+            COUNT(*) as total
+        FROM athlete_medals {where}
+        GROUP BY ID, Name, NOC
+        ORDER BY {sort_col} DESC, id, name, noc LIMIT ?
+    """, conn, params=params + [limit]).to_dict(orient='records')
+
+
+MEDALS = pd.DataFrame({
+        'ID': [1, 1, 1, 2, 2, 3, 3, 4, 5, 5, 6],
+        'Name': ['Ana', 'Ana', 'Ana', 'Bia', 'Bia', 'Caio', 'Caio', 'Duda', 'Edu', 'Edu', 'Fábio'],
+        'NOC': ['BRA', 'BRA', 'BRA', 'USA', 'USA', 'BRA', 'ARG', 'USA', 'BRA', 'BRA', 'USA'],
+        'Year': [2012, 2016, 2016, 2012, 2014, 2016, 2016, 2016, 2012, 2012, 2016],
+        'Season': ['Summer', 'Summer', 'Summer', 'Summer', 'Winter', 'Summer', 'Summer', 'Summer', 'Summer', 'Summer', 'Summer'],
+        'Sex': ['F', 'F', 'F', 'F', 'F', 'M', 'M', 'F', 'M', 'M', 'M'],
+        'Sport': ['Judo', 'Judo', 'Sailing', 'Rowing', 'Skiing', 'Judo', 'Judo', 'Rowing', 'Judo', 'Judo', 'Judo'],
+        'Event': ['E1', 'E1', 'E2', 'E3', 'E4', 'E5', 'E5', 'E3', 'E6', 'E7', 'E5'],
+        'Medal': ['Gold', 'Silver', 'Bronze', 'Gold', 'Gold', 'Bronze', 'Gold', 'Silver', 'Gold', 'Gold', 'Silver'],
+})
+
+
+@pytest.fixture(scope="module")
+def medals_db():
+    """Atletas com medalhas em mais de um esporte, edição e país."""
+    conn = sqlite3.connect(":memory:")
+    MEDALS.to_sql('athlete_medals', conn, index=False)
+    conn.execute(f"CREATE TABLE athlete_tallies AS {TALLIES_SQL}")
+    yield conn
+    conn.close()
+
+
+@pytest.fixture(scope="module")
+def tallies(medals_db):
+    return AthleteTallies.from_connection(medals_db)
+
+
+class TestAthleteTallies:
+    """Testes para o ranking por listas prontas e por agregação."""
+
+    @pytest.mark.parametrize("params", [
+        {}, {'season': 'Summer'}, {'sex': 'F'}, {'sport': 'Judo'}, {'country': 'BRA'},
+        {'countries': ['BRA', 'USA']}, {'countries': ['ARG', 'USA', 'ZZZ']}, {'countries': []},
+        {'medal_type': 'Gold'}, {'medal_type': 'Silver', 'countries': ['BRA', 'USA']},
+        {'sex': 'M', 'sport': 'Judo', 'country': 'BRA', 'medal_type': 'Gold'},
+        {'year': 2016}, {'start_year': 2012, 'end_year': 2014, 'sex': 'F'}, {'year': 2016, 'medal_type': 'Bronze'},
+        {'sport': 'Fencing'},
+    ])
+    @pytest.mark.parametrize("limit", [1, 2, 10])
+    def test_parity_with_group_by(self, medals_db, tallies, params, limit):
+        """Listas prontas, merge entre países e agregação batem com o SQL."""
+        filters = Filters.from_params(**params)
+        sort_col = filters.medal_type.lower() if filters.medal_type else 'total'
+        got = tallies.top(filters, sort_col, limit).to_dict(orient='records')
+        assert got == sql_ranking(medals_db, filters, limit)
+
+    def test_athlete_summed_across_partitions(self, tallies):
+        """Sem filtro de esporte, as medalhas de todos os esportes do atleta somam."""
+        top = tallies.top(Filters(), 'total', 1)
+        assert top.to_dict(orient='records') == [
+            {"id": 1, "name": "Ana", "noc": "BRA", "gold": 1, "silver": 1, "bronze": 1, "total": 3}
+        ]
+
+    def test_lists_keep_top_k(self, medals_db):
+        """Cada lista guarda só top_k atletas; limites maiores somam as linhas."""
+        tallies = AthleteTallies(pd.read_sql_query("SELECT * FROM athlete_tallies", medals_db), top_k=2)
+        assert all(len(athletes) <= 2 for athletes, _ in tallies._rankings.values())
+        assert tallies.top(Filters(), 'total', 5).to_dict(orient='records') == sql_ranking(medals_db, Filters(), 5)
+
+    @pytest.mark.parametrize("params", [
+        {'year': 2016}, {'year': 2012, 'sport': 'Judo'}, {'year': 2016, 'countries': ['BRA', 'USA']},
+        {'start_year': 2012, 'end_year': 2016}, {'start_year': 2014, 'end_year': 2016, 'medal_type': 'Gold'},
+    ])
+    def test_year_filters_with_short_lists(self, medals_db, params):
+        """Com listas cortadas, anos e intervalos continuam batendo com o SQL."""
+        tallies = AthleteTallies(pd.read_sql_query("SELECT * FROM athlete_tallies", medals_db), top_k=2)
+        filters = Filters.from_params(**params)
+        sort_col = filters.medal_type.lower() if filters.medal_type else 'total'
+        for limit in (1, 2):
+            got = tallies.top(filters, sort_col, limit).to_dict(orient='records')
+            assert got == sql_ranking(medals_db, filters, limit)
+
+    def test_single_year_uses_lists(self, tallies):
+        """Um único ano é a leitura de uma lista pronta, sem agregar as linhas."""
+        with patch.object(tallies, '_aggregate', side_effect=AssertionError):
+            assert tallies.top(Filters.from_params(year=2016), 'total', 2)['id'].tolist() == [1, 3]
+            assert tallies.top(Filters.from_params(year=2016, countries=['ARG', 'USA']), 'total', 2)['id'].tolist() == [3, 4]
+
+    def test_without_tallies_table(self, medals_db):
+        """Banco sem athlete_tallies agrega athlete_medals na carga."""
+        conn = sqlite3.connect(":memory:")
+        MEDALS.to_sql('athlete_medals', conn, index=False)
+        tallies = AthleteTallies.from_connection(conn)
+        conn.close()
+        assert tallies.stats()["athletes"] == 7
+        assert tallies.top(Filters(), 'total', 10).to_dict(orient='records') == sql_ranking(medals_db, Filters(), 10)
@@ -0,0 +1,193 @@
+"""Testes para a grade e a amostra de /api/stats/biometrics."""
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app import config
+from app.biometrics import BiometricSamples, allocate, bin_biometrics, row_priorities, sample_points
+from app.filters import Filters
+from app.main import app
+
+client = TestClient(app)
+
+
+class TestBinBiometrics:
+    """Testes para o agrupamento em células."""
+
+    def test_cells_counts_and_medals(self):
+        """Linhas da mesma faixa somam na mesma célula, com medalhas por tipo."""
+        rows = pd.DataFrame({
+            'Height': [180.0, 181.9, 182.0, 165.0],
+            'Weight': [75.0, 74.0, 75.0, 58.5],
+            'Medal': ['Gold', 'No Medal', 'Bronze', None],
+        })
+        result = bin_biometrics(rows, 2.0, 2.0)
+        assert result['population'] == 4
+        assert result['bins'] == [
+            {'height': 164.0, 'weight': 58.0, 'count': 1, 'gold': 0, 'silver': 0, 'bronze': 0},
+            {'height': 180.0, 'weight': 74.0, 'count': 2, 'gold': 1, 'silver': 0, 'bronze': 0},
+            {'height': 182.0, 'weight': 74.0, 'count': 1, 'gold': 0, 'silver': 0, 'bronze': 1},
+        ]
+
+    def test_resolution(self):
+        """Faixas mais largas juntam células; altura e peso têm larguras próprias."""
+        rows = pd.DataFrame({'Height': [170.0, 179.0], 'Weight': [60.0, 61.0], 'Medal': ['Gold', 'Gold']})
+        assert [b['count'] for b in bin_biometrics(rows, 10.0, 5.0)['bins']] == [2]
+        assert [(b['height'], b['weight']) for b in bin_biometrics(rows, 2.5, 1.0)['bins']] == [
+            (170.0, 60.0), (177.5, 61.0),
+        ]
+
+    def test_empty(self):
+        """Sem linhas, a grade vem vazia."""
+        rows = pd.DataFrame({'Height': [], 'Weight': [], 'Medal': []})
+        assert bin_biometrics(rows, 2.0, 2.0) == {'height_bin': 2.0, 'weight_bin': 2.0, 'population': 0, 'bins': []}
+
+
+class TestBiometricsBinsEndpoint:
+    """Testes para /api/stats/biometrics?mode=bins."""
+
+    @pytest.mark.parametrize("engine", ["sqlite", "columnar"])
+    def test_covers_whole_population(self, use_sample_db, engine):
+        """A grade conta todas as linhas filtradas, nos dois motores."""
+        with patch.object(config, 'QUERY_ENGINE', engine):
+            data = client.get("/api/stats/biometrics?mode=bins&season=Summer&height_bin=10&weight_bin=10").json()
+        assert data['population'] == 6
+        assert sum(b['count'] for b in data['bins']) == 6
+        assert sum(b['gold'] for b in data['bins']) == 3
+        assert data['bins'][0] == {'height': 160.0, 'weight': 50.0, 'count': 2, 'gold': 0, 'silver': 1, 'bronze': 0}
+
+    def test_default_resolution(self, use_sample_db):
+        """Sem largura informada, usa a configuração."""
+        with patch.object(config, 'BIOMETRICS_HEIGHT_BIN', 50.0), patch.object(config, 'BIOMETRICS_WEIGHT_BIN', 50.0):
+            data = client.get("/api/stats/biometrics?mode=bins").json()
+        assert (data['height_bin'], data['weight_bin']) == (50.0, 50.0)
+        assert data['bins'] == [{'height': 150.0, 'weight': 50.0, 'count': 10, 'gold': 3, 'silver': 2, 'bronze': 2}]
+
+    def test_points_mode_unchanged(self, use_sample_db):
+        """mode=points é o padrão e lista as linhas."""
+        assert client.get("/api/stats/biometrics?mode=points").json() == client.get("/api/stats/biometrics").json()
+
+    def test_error_keeps_response_shape(self):
+        """Em caso de erro, a grade vem vazia com as larguras pedidas."""
+        with patch('app.api._biometric_bins', side_effect=Exception("DB Error")):
+            data = client.get("/api/stats/biometrics?mode=bins&height_bin=5&weight_bin=4").json()
+        assert data == {'height_bin': 5.0, 'weight_bin': 4.0, 'population': 0, 'bins': []}
+
+    def test_invalid_parameters(self):
+        """Modo desconhecido e larguras fora do intervalo são rejeitados."""
+        assert client.get("/api/stats/biometrics?mode=hex").status_code == 422
+        assert client.get("/api/stats/biometrics?mode=bins&height_bin=0").status_code == 422
+        assert client.get("/api/stats/biometrics?mode=bins&weight_bin=100").status_code == 422
+
+
+@pytest.fixture(scope="module")
+def biometric_rows():
+    """Linhas com altura e peso espalhadas por poucas partições grandes."""
+    rng = np.random.default_rng(3)
+    n = 4000
+    return pd.DataFrame({
+        '_rowid': np.arange(1, n + 1) * 3,
+        'Name': [f'Athlete {i}' for i in range(n)],
+        'Sex': rng.choice(['M', 'F'], n, p=[0.7, 0.3]),
+        'Height': rng.normal(175, 10, n).round(),
+        'Weight': rng.normal(70, 10, n).round(),
+        'Medal': rng.choice(['No Medal', 'Gold', 'Silver', 'Bronze'], n, p=[0.97, 0.01, 0.01, 0.01]),
+        'NOC': rng.choice(['USA', 'BRA', 'GER'], n),
+        'Year': rng.choice([2008, 2012, 2016], n),
+        'Season': rng.choice(['Summer', 'Winter'], n),
+        'Sport': rng.choice(['Judo', 'Rowing'], n),
+    })
+
+
+class TestAllocate:
+    """Testes para a divisão das vagas entre os estratos."""
+
+    def test_small_population_is_kept_whole(self):
+        """Com menos linhas que vagas, todas entram."""
+        assert allocate(np.array([3, 0, 2]), 10).tolist() == [3, 0, 2]
+
+    def test_rare_strata_get_a_floor(self):
+        """Metade das vagas é igual entre estratos presentes; o resto é proporcional."""
+        quotas = allocate(np.array([9990, 5, 5, 0]), 100)
+        assert quotas.tolist() == [90, 5, 5, 0]
+        quotas = allocate(np.array([900, 60, 40]), 60)
+        assert quotas.sum() == 60
+        assert (quotas >= 10).all()
+
+
+class RowIndex:
+    """Índice linha a linha para avaliar os filtros sobre a tabela inteira."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.years = rows['Year'].to_numpy()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def isin(self, dim, values):
+        return self.rows[dim].isin(values).to_numpy()
+
+
+class TestBiometricSamples:
+    """Testes para a amostra estratificada por partição."""
+
+    def test_priorities_are_seeded(self):
+        """A prioridade depende só do rowid e da semente."""
+        rowids = np.arange(1, 6)
+        assert row_priorities(rowids, 1).tolist() == row_priorities(rowids, 1).tolist()
+        assert row_priorities(rowids, 1).tolist() != row_priorities(rowids, 2).tolist()
+        assert row_priorities(rowids[::-1], 1).tolist() == row_priorities(rowids, 1).tolist()[::-1]
+
+    @pytest.mark.parametrize("params", [
+        {}, {"year": 2016}, {"sex": "F"}, {"country": "BRA", "sport": "Judo"},
+        {"start_year": 2008, "end_year": 2012, "season": "Winter"}, {"countries": ["USA", "GER"]},
+    ])
+    @pytest.mark.parametrize("size", [1, 25, 60])
+    def test_matches_sample_over_table(self, biometric_rows, params, size):
+        """Juntar as listas truncadas dá a mesma amostra que sortear sobre a tabela."""
+        samples = BiometricSamples(biometric_rows, max_size=60, seed=7)
+        filters = Filters.from_params(**params)
+        rows = biometric_rows[filters.to_mask(RowIndex(biometric_rows))]
+        expected = sample_points(rows.drop(columns='_rowid'), rows['_rowid'].to_numpy(), size, 7)
+        assert samples.sample(filters, size) == expected
+        assert expected['population'] == len(rows)
+        assert len(expected['points']) == min(size, len(rows))
+
+    def test_rare_medalists_are_kept(self, biometric_rows):
+        """Medalhistas raras aparecem mesmo em uma amostra pequena."""
+        samples = BiometricSamples(biometric_rows, max_size=60, seed=7)
+        points = samples.sample(Filters.from_params(sex="F"), 40)['points']
+        assert {p['Medal'] for p in points} == {'No Medal', 'Gold', 'Silver', 'Bronze'}
+
+    def test_size_is_bounded(self, biometric_rows):
+        """O tamanho pedido é limitado ao das listas guardadas."""
+        samples = BiometricSamples(biometric_rows, max_size=10, seed=7)
+        assert len(samples.sample(Filters(), 500)['points']) == 10
+        assert samples.stats()['rows'] <= 10 * samples.stats()['partitions']
+
+
+class TestBiometricsPointsEndpoint:
+    """Testes para /api/stats/biometrics?mode=points."""
+
+    @pytest.mark.parametrize("samples,engine", [(True, "sqlite"), (False, "sqlite"), (False, "columnar")])
+    def test_same_sample_in_every_path(self, use_sample_db, samples, engine):
+        """Listas prontas, motor colunar e SQL sorteiam os mesmos pontos."""
+        with patch.object(config, 'BIOMETRICS_SAMPLES_ENABLED', samples), patch.object(config, 'QUERY_ENGINE', engine):
+            data = client.get("/api/stats/biometrics?season=Summer&sample_size=4").json()
+        assert data['population'] == 6
+        assert [p['Name'] for p in data['points']] == ['Athlete B', 'Athlete E', 'Athlete F', 'Athlete H']
+
+    def test_sql_reads_points_in_chunks(self, use_sample_db):
+        """Sem listas prontas, os pontos sorteados são lidos em blocos de parâmetros."""
+        with patch.object(config, 'BIOMETRICS_SAMPLES_ENABLED', False), \
+                patch.object(config, 'QUERY_ENGINE', 'sqlite'), patch('app.api.SQL_MAX_PARAMS', 3):
+            data = client.get("/api/stats/biometrics?season=Summer&sample_size=4").json()
+        assert [p['Name'] for p in data['points']] == ['Athlete B', 'Athlete E', 'Athlete F', 'Athlete H']
+
+    def test_sample_size_is_bounded(self):
+        """sample_size fora do intervalo é rejeitado."""
+        assert client.get("/api/stats/biometrics?sample_size=0").status_code == 422
+        assert client.get(f"/api/stats/biometrics?sample_size={config.BIOMETRICS_SAMPLE_MAX + 1}").status_code == 422
@@ -0,0 +1,228 @@
+"""Testes para o motor colunar em memória."""
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app import config
+from app.columnar import ColumnarStore, combined_key
+from app.filters import Filters
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def athletes_frame(sample_dataframe):
+    """Amostra com evento coletivo e linha duplicada para testar deduplicação."""
+    extra = pd.DataFrame({
+        'ID': [11, 12, 12, 13],
+        'Name': ['Athlete K', 'Athlete L', 'Athlete L', 'Athlete M'],
+        'Sex': ['M', 'M', 'M', 'F'],
+        'Age': [23.0, None, None, 29.0],
+        'Height': [181.0, None, None, 169.0],
+        'Weight': [77.0, None, None, 61.0],
+        'Team': ['USA', 'USA', 'USA', 'USA'],
+        'NOC': ['USA', 'USA', 'USA', 'USA'],
+        'Year': [2016, 2016, 2016, 2016],
+        'Season': ['Summer', 'Summer', 'Summer', 'Summer'],
+        'City': ['Rio', 'Rio', 'Rio', None],
+        'Sport': ['Basketball', 'Basketball', 'Basketball', 'Tennis'],
+        'Event': ['Event 1', 'Event 1', 'Event 1', 'Mixed Doubles'],
+        'Medal': ['Gold', 'Gold', 'Gold', 'Silver'],
+    })
+    return pd.concat([sample_dataframe, extra], ignore_index=True)
+
+
+@pytest.fixture
+def sqlite_conn(athletes_frame):
+    """Banco em memória com a mesma amostra, para comparação com SQL."""
+    conn = sqlite3.connect(":memory:")
+    athletes_frame.to_sql('athletes', conn, index=False)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def store(sqlite_conn):
+    return ColumnarStore.from_connection(sqlite_conn)
+
+
+class TestCombinedKey:
+    """Testes para a chave combinada."""
+
+    def test_preserves_lexicographic_order(self):
+        """Chave ordena como a tupla de códigos."""
+        a = np.array([1, 0, 1, 0])
+        b = np.array([0, 2, 1, -1])
+        key = combined_key([a, b], [2, 3])
+        assert list(np.argsort(key)) == [3, 1, 0, 2]
+
+    def test_recompacts_instead_of_overflowing(self):
+        """Cardinalidades grandes não estouram int64."""
+        codes = np.array([5, 5, 3, 3])
+        other = np.array([1, 0, 1, 1])
+        key = combined_key([codes] * 6 + [other], [2**20] * 6 + [2])
+        assert len(np.unique(key)) == 3
+
+
+class TestColumnarStore:
+    """Testes para carga e filtros."""
+
+    def test_categoricals_are_small_integer_codes(self, store):
+        """Colunas categóricas usam códigos inteiros pequenos."""
+        assert store.codes['Season'].dtype == np.int8
+        assert store.codes['Sex'].dtype == np.int8
+        assert list(store.categories['Season']) == ['Summer', 'Winter']
+
+    def test_null_city_is_encoded_as_missing(self, store):
+        """Valores nulos recebem código -1."""
+        assert (store.codes['City'] == -1).sum() == 1
+
+    def test_unknown_value_matches_nothing(self, store):
+        """Valor inexistente gera máscara vazia."""
+        assert not Filters.from_params(country='ZZZ').to_mask(store).any()
+
+    def test_mask_ignores_noop_values(self, store):
+        """'Both', 'All' e 'Total' não filtram."""
+        mask = Filters.from_params(
+            season='Both', sex='Both', country='All', sport='All', medal_type='Total'
+        ).to_mask(store)
+        assert mask.all()
+
+    def test_rows_keep_storage_order(self, store, athletes_frame):
+        """Linhas selecionadas mantêm a ordem de armazenamento."""
+        df = store.rows(Filters.from_params(country='USA').to_mask(store))
+        expected = athletes_frame[athletes_frame['NOC'] == 'USA']
+        assert df['ID'].tolist() == expected['ID'].tolist()
+
+
+class TestColumnarParity:
+    """Resultados do motor colunar devem ser idênticos aos do SQLite."""
+
+    FILTERS = [
+        {},
+        {'year': 2016},
+        {'start_year': 2008, 'end_year': 2012},
+        {'season': 'Summer', 'sex': 'M'},
+        {'country': 'USA'},
+        {'sport': 'Basketball'},
+        {'year': 1800},
+    ]
+
+    @staticmethod
+    def _where(filters):
+        clauses, params = ["Medal != 'No Medal'"], []
+        if filters.get('year'):
+            clauses.append("Year = ?")
+            params.append(filters['year'])
+        if filters.get('start_year') is not None:
+            clauses.append("Year >= ? AND Year <= ?")
+            params.extend([filters['start_year'], filters['end_year']])
+        for key, col in [('season', 'Season'), ('sex', 'Sex'), ('country', 'NOC'), ('sport', 'Sport')]:
+            if key in filters:
+                clauses.append(f"{col} = ?")
+                params.append(filters[key])
+        return " AND ".join(clauses), params
+
+    @pytest.mark.parametrize("filters", FILTERS)
+    def test_medal_event_counts(self, store, sqlite_conn, filters):
+        """Contagem de eventos distintos por NOC e medalha."""
+        where, params = self._where(filters)
+        expected = pd.read_sql_query(
+            f"SELECT NOC, Medal, COUNT(*) as Count FROM (SELECT DISTINCT Year, Season, NOC, Event, Medal "
+            f"FROM athletes WHERE {where}) GROUP BY NOC, Medal", sqlite_conn, params=params
+        )
+        got = store.distinct_count(
+            Filters.from_params(**filters).to_mask(store) & store.has_medal,
+            ("Year", "Season", "NOC", "Event", "Medal"), ("NOC", "Medal")
+        )
+        assert got.to_dict(orient='records') == expected.to_dict(orient='records')
+
+    @pytest.mark.parametrize("filters", FILTERS)
+    def test_distinct_athletes_by_sex(self, store, sqlite_conn, filters):
+        """COUNT(DISTINCT ID) agrupado por sexo."""
+        where, params = self._where(filters)
+        where = where.replace("Medal != 'No Medal'", "1=1")
+        expected = pd.read_sql_query(
+            f"SELECT Sex, COUNT(DISTINCT ID) as Count FROM athletes WHERE {where} GROUP BY Sex",
+            sqlite_conn, params=params
+        )
+        got = store.distinct_count(Filters.from_params(**filters).to_mask(store), ("Sex", "ID"), ("Sex",))
+        assert got.to_dict(orient='records') == expected.to_dict(orient='records')
+
+    @pytest.mark.parametrize("filters", FILTERS)
+    def test_medal_tally(self, store, sqlite_conn, filters):
+        """Ranking de atletas igual ao GROUP BY do SQLite."""
+        where, params = self._where(filters)
+        expected = pd.read_sql_query(
+            "SELECT ID as id, Name as name, NOC as noc, "
+            "SUM(CASE WHEN Medal = 'Gold' THEN 1 ELSE 0 END) as gold, "
+            "SUM(CASE WHEN Medal = 'Silver' THEN 1 ELSE 0 END) as silver, "
+            "SUM(CASE WHEN Medal = 'Bronze' THEN 1 ELSE 0 END) as bronze, "
+            "COUNT(*) as total FROM (SELECT DISTINCT ID, Name, NOC, Year, Season, Event, Medal "
+            f"FROM athletes WHERE {where}) GROUP BY ID, Name, NOC "
+            "ORDER BY total DESC, id, name, noc LIMIT 5", sqlite_conn, params=params
+        )
+        got = store.medal_tally(Filters.from_params(**filters).to_mask(store) & store.has_medal, 'total', 5)
+        assert got.to_dict(orient='records') == expected.to_dict(orient='records')
+
+    def test_team_event_counted_once(self, store):
+        """Evento coletivo com várias linhas conta uma única medalha."""
+        got = store.distinct_count(
+            Filters.from_params(country='USA', year=2016, sport='Basketball').to_mask(store) & store.has_medal,
+            ("Year", "Season", "NOC", "Event", "Medal"), ("NOC", "Medal")
+        )
+        assert got['Count'].tolist() == [1]
+
+
+class TestColumnarEngineEndpoints:
+    """Endpoints usando o motor colunar por configuração."""
+
+    @pytest.fixture(autouse=True)
+    def columnar_engine(self, store):
+        with patch.object(config, 'QUERY_ENGINE', 'columnar'), \
+                patch.object(config, 'MEDAL_CUBE_ENABLED', False), \
+                patch.object(config, 'ATHLETE_TALLIES_ENABLED', False), \
+                patch.object(config, 'ATHLETE_BITSETS_ENABLED', False), \
+                patch.object(config, 'BIOMETRICS_SAMPLES_ENABLED', False), \
+                patch('app.api.data_loader.get_columnar_store', return_value=store):
+            yield
+
+    def test_map_stats(self):
+        """Mapa agrega eventos distintos."""
+        data = client.get("/api/stats/map?year=2016").json()
+        usa = next(item for item in data if item['id'] == 'USA')
+        assert usa == {"id": "USA", "gold": 1, "silver": 1, "bronze": 0, "total": 2}
+
+    def test_gender_stats(self):
+        """Distribuição por gênero conta atletas distintos."""
+        data = client.get("/api/stats/gender?country=USA").json()
+        assert data == [{"Sex": "F", "Count": 1}, {"Sex": "M", "Count": 4}]
+
+    def test_top_athletes(self):
+        """Ranking respeita o tipo de medalha."""
+        data = client.get("/api/stats/top-athletes?medal_type=Gold&limit=2").json()
+        assert [item['gold'] for item in data] == [1, 1]
+        assert [item['id'] for item in data] == [1, 5]
+
+    def test_biometrics_skips_missing_values(self):
+        """Biometria ignora linhas sem altura ou peso."""
+        data = client.get("/api/stats/biometrics?country=USA").json()
+        assert all(item['Height'] is not None for item in data['points'])
+        assert data['population'] == len(data['points']) == 4
+
+    def test_evolution_top_countries(self):
+        """Evolução usa os países com mais medalhas."""
+        data = client.get("/api/stats/evolution?season=Summer").json()
+        assert data[0]['Year'] == 2008
+        assert 'USA' in data[0]
+
+    def test_query_filtered_uses_store(self):
+        """query_filtered responde a partir dos arrays em memória."""
+        from app.data_loader import data_loader
+        df = data_loader.query_filtered(countries=['USA', 'BRA'])
+        assert set(df['NOC']) == {'USA', 'BRA'}
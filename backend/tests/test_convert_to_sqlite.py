@@ -0,0 +1,220 @@
+"""Testes para o script de conversão CSV -> SQLite."""
+import json
+import sqlite3
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app import config
+from app.api import RESPONSE_CACHE
+from app.data_loader import data_loader
+from app.main import app
+from scripts.convert_to_sqlite import convert_csv_to_sqlite, dataset_version, MIXED_SEX
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def team_events_db(tmp_path, medals_only_dataframe):
+    """Banco com evento coletivo, evento misto e linha duplicada."""
+    extra = pd.DataFrame({
+        'ID': [6, 7, 8, 8],
+        'Name': ['Athlete F', 'Athlete G', 'Athlete H', 'Athlete H'],
+        'Sex': ['M', 'F', 'M', 'M'],
+        'Age': [24, 26, 27, 27],
+        'Height': [190.0, 175.0, 181.0, 181.0],
+        'Weight': [88.0, 66.0, 79.0, 79.0],
+        'Team': ['USA', 'USA', 'USA', 'USA'],
+        'NOC': ['USA', 'USA', 'USA', 'USA'],
+        'Year': [2016, 2012, 2016, 2016],
+        'Season': ['Summer', 'Winter', 'Summer', 'Summer'],
+        'City': ['Rio', 'Sochi', 'Rio', 'Rio'],
+        'Sport': ['Basketball', 'Basketball', 'Basketball', 'Basketball'],
+        'Event': ['Event 1', 'Event 3', 'Event 1', 'Event 1'],
+        'Medal': ['Gold', 'Gold', 'Gold', 'Gold'],
+    })
+    frame = pd.concat([medals_only_dataframe, extra], ignore_index=True)
+    csv_path = tmp_path / "athlete_events.csv"
+    db_path = tmp_path / "olympics.db"
+    frame.to_csv(csv_path, index=False)
+    convert_csv_to_sqlite(str(csv_path), str(db_path))
+    conn = sqlite3.connect(db_path)
+    yield conn
+    conn.close()
+
+
+class TestConvertCsvToSqlite:
+    """Testes para a conversão."""
+
+    def test_missing_csv_does_not_create_db(self, tmp_path):
+        """CSV inexistente não gera banco."""
+        db_path = tmp_path / "olympics.db"
+        convert_csv_to_sqlite(str(tmp_path / "missing.csv"), str(db_path))
+        assert not db_path.exists()
+
+    def test_failed_conversion_keeps_existing_db(self, tmp_path, sample_db):
+        """Falha na conversão não toca no banco em uso nem deixa temporários."""
+        before = open(sample_db, "rb").read()
+        empty_csv = tmp_path / "empty.csv"
+        empty_csv.write_text("")
+        convert_csv_to_sqlite(str(empty_csv), sample_db)
+        assert open(sample_db, "rb").read() == before
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["athlete_events.csv", "empty.csv", "olympics.db"]
+
+    def test_failed_build_step_removes_temporary_file(self, tmp_path, sample_db):
+        """Erro depois da carga (índices, perfis, ANALYZE) também apaga o temporário."""
+        before = open(sample_db, "rb").read()
+        with patch('scripts.convert_to_sqlite.build_athlete_profiles', side_effect=MemoryError("sem memória")):
+            with pytest.raises(MemoryError):
+                convert_csv_to_sqlite(str(tmp_path / "athlete_events.csv"), sample_db)
+        assert open(sample_db, "rb").read() == before
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["athlete_events.csv", "olympics.db"]
+
+    def test_dataset_version_is_stamped(self, tmp_path, sample_db):
+        """dataset_meta guarda a versão derivada do CSV e do formato do banco."""
+        conn = sqlite3.connect(sample_db)
+        meta = dict(conn.execute("SELECT key, value FROM dataset_meta").fetchall())
+        conn.close()
+        assert meta["version"] == dataset_version(str(tmp_path / "athlete_events.csv"))
+        assert meta["rows"] == "10"
+
+    def test_athletes_table_keeps_every_row(self, team_events_db):
+        """Tabela athletes mantém todas as linhas do CSV."""
+        assert team_events_db.execute("SELECT COUNT(*) FROM athletes").fetchone() == (9,)
+
+
+class TestMedalEventsTable:
+    """Testes para a tabela medal_events."""
+
+    def test_team_event_counted_once(self, team_events_db):
+        """Medalha de equipe vira uma única linha."""
+        rows = team_events_db.execute(
+            "SELECT Sex FROM medal_events WHERE Year = 2016 AND NOC = 'USA' AND Event = 'Event 1'"
+        ).fetchall()
+        assert rows == [('M',)]
+
+    def test_mixed_sex_medal_is_marked(self, team_events_db):
+        """Medalha dividida por homens e mulheres recebe o sexo misto."""
+        rows = team_events_db.execute(
+            "SELECT Sex FROM medal_events WHERE Year = 2012 AND NOC = 'USA' AND Event = 'Event 3'"
+        ).fetchall()
+        assert rows == [(MIXED_SEX,)]
+
+    def test_matches_distinct_subquery(self, team_events_db):
+        """Total bate com o DISTINCT original sobre athletes."""
+        expected = team_events_db.execute(
+            "SELECT COUNT(*) FROM (SELECT DISTINCT Year, Season, NOC, Event, Medal "
+            "FROM athletes WHERE Medal != 'No Medal')"
+        ).fetchone()
+        assert team_events_db.execute("SELECT COUNT(*) FROM medal_events").fetchone() == expected
+
+    def test_athlete_medals_removes_duplicate_rows(self, team_events_db):
+        """Linhas repetidas do mesmo atleta no mesmo evento são removidas."""
+        rows = team_events_db.execute("SELECT COUNT(*) FROM athlete_medals WHERE ID = 8").fetchone()
+        assert rows == (1,)
+
+
+class TestAthleteTalliesTable:
+    """Testes para a tabela athlete_tallies."""
+
+    def test_sums_athlete_medals(self, team_events_db):
+        """Uma linha por atleta, edição e esporte, somando as medalhas distintas."""
+        tallies = team_events_db.execute(
+            "SELECT COUNT(*), SUM(Gold), SUM(Total) FROM athlete_tallies"
+        ).fetchone()
+        medals = team_events_db.execute(
+            "SELECT COUNT(DISTINCT ID || Year || Sport), SUM(Medal = 'Gold'), COUNT(*) FROM athlete_medals"
+        ).fetchone()
+        assert tallies == medals
+        assert team_events_db.execute("SELECT Total FROM athlete_tallies WHERE ID = 8").fetchall() == [(1,)]
+
+
+class TestSexCountsTable:
+    """Testes para a tabela athlete_sex_counts."""
+
+    def test_counts_distinct_athletes(self, team_events_db):
+        """Uma linha por sexo, com os atletas distintos do banco inteiro."""
+        counts = team_events_db.execute("SELECT Sex, Count FROM athlete_sex_counts ORDER BY Sex").fetchall()
+        expected = team_events_db.execute(
+            "SELECT Sex, COUNT(DISTINCT ID) FROM athletes GROUP BY Sex ORDER BY Sex"
+        ).fetchall()
+        assert counts == expected
+
+
+class TestSearchIndex:
+    """Testes para o índice de busca athlete_search."""
+
+    def test_one_row_per_distinct_athlete(self, team_events_db):
+        """Linhas repetidas do mesmo atleta e esporte viram uma entrada."""
+        expected = team_events_db.execute(
+            "SELECT COUNT(*) FROM (SELECT DISTINCT ID, Name, NOC, Sport FROM athletes)"
+        ).fetchone()
+        assert team_events_db.execute("SELECT COUNT(*) FROM athlete_search").fetchone() == expected
+
+    def test_substring_uses_trigram_index(self, team_events_db):
+        """Busca por trecho do nome consulta o índice, sem varrer athletes."""
+        sql = "SELECT ID FROM athlete_search WHERE Name LIKE '%hlete H%'"
+        assert team_events_db.execute(sql).fetchall() == [(8,)]
+        plan = [row[3] for row in team_events_db.execute(f"EXPLAIN QUERY PLAN {sql}")]
+        assert any("VIRTUAL TABLE INDEX" in step for step in plan)
+
+
+class TestAthleteProfilesTable:
+    """Testes para a tabela athlete_profiles."""
+
+    def test_one_row_per_athlete(self, team_events_db):
+        """Um perfil por ID distinto de athletes."""
+        assert team_events_db.execute("SELECT COUNT(*) FROM athlete_profiles").fetchone() == (8,)
+
+    def test_stored_documents_match_rows(self, team_events_db):
+        """O documento guardado conta as linhas do atleta, repetidas inclusive."""
+        profile, stats = team_events_db.execute("SELECT profile, stats FROM athlete_profiles WHERE ID = 8").fetchone()
+        profile, stats = json.loads(profile), json.loads(stats)
+        assert profile["medals"] == {"gold": 2, "silver": 0, "bronze": 0, "total": 2}
+        assert len(profile["participations"]) == 2
+        assert stats["evolution"] == [{"Year": 2016, "Gold": 2, "Silver": 0, "Bronze": 0, "Total": 2, "Events": 2}]
+
+
+class TestEndpointsOnSampleDb:
+    """Endpoints de medalhas lendo as tabelas deduplicadas."""
+
+    @pytest.fixture(autouse=True)
+    def sql_path(self):
+        with patch.object(config, 'MEDAL_CUBE_ENABLED', False), \
+                patch.object(config, 'ATHLETE_TALLIES_ENABLED', False), \
+                patch.object(config, 'ATHLETE_BITSETS_ENABLED', False):
+            yield
+
+    def test_map_stats(self, use_sample_db):
+        """Mapa conta medalhas por país."""
+        data = client.get("/api/stats/map?year=2016").json()
+        assert {item['id']: item['total'] for item in data} == {'USA': 1, 'BRA': 1, 'AUS': 1}
+
+    def test_medal_table_by_sport(self, use_sample_db):
+        """Quadro agrupa por esporte quando há país selecionado."""
+        data = client.get("/api/stats/medals?country=USA").json()
+        assert data == [{"name": "Basketball", "code": "Basketball", "gold": 1, "silver": 0, "bronze": 0, "total": 1}]
+
+    def test_evolution_with_sex_filter(self, use_sample_db):
+        """Evolução filtra por sexo."""
+        data = client.get("/api/stats/evolution?sex=F&countries=BRA&countries=CHN").json()
+        assert data == [{"Year": 2012, "CHN": 1.0, "BRA": 0.0}, {"Year": 2016, "CHN": 0.0, "BRA": 1.0}]
+
+    def test_gender_without_filters(self, use_sample_db):
+        """Sem filtros, /stats/gender lê athlete_sex_counts; bancos sem a tabela contam em athletes."""
+        expected = [{"Sex": "F", "Count": 5}, {"Sex": "M", "Count": 5}]
+        assert client.get("/api/stats/gender").json() == expected
+        conn = sqlite3.connect(use_sample_db)
+        conn.execute("DROP TABLE athlete_sex_counts")
+        conn.commit()
+        conn.close()
+        RESPONSE_CACHE.clear()
+        data_loader.close()
+        assert client.get("/api/stats/gender").json() == expected
+
+    def test_top_athletes(self, use_sample_db):
+        """Ranking lê athlete_medals."""
+        data = client.get("/api/stats/top-athletes?medal_type=Gold").json()
+        assert [item['id'] for item in data] == [1, 5, 8]
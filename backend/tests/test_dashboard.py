@@ -0,0 +1,77 @@
+"""Testes para o endpoint agregado do painel."""
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app import config
+from app.data_loader import data_loader
+from app.main import app
+
+client = TestClient(app)
+
+FILTERS = [
+    "",
+    "year=2016",
+    "start_year=2008&end_year=2012",
+    "season=Summer&sex=M",
+    "country=USA",
+    "sport=Swimming",
+    "medal_type=Gold",
+    "sex=F&medal_type=Bronze&limit=1",
+    "countries=USA&countries=BRA",
+    "year=1700",
+]
+
+EVOLUTION_PARAMS = ("season", "sex", "country", "sport", "countries")
+
+
+def individual_payloads(params):
+    """Respostas dos endpoints individuais para o mesmo filtro."""
+    evolution = "&".join(p for p in params.split("&") if p.split("=")[0] in EVOLUTION_PARAMS)
+    return {
+        "map": client.get(f"/api/stats/map?{params}").json(),
+        "medals": client.get(f"/api/stats/medals?{params}").json(),
+        "evolution": client.get(f"/api/stats/evolution?{evolution}").json(),
+        "gender": client.get(f"/api/stats/gender?{params}").json(),
+        "top_athletes": client.get(f"/api/stats/top-athletes?{params}").json(),
+        "biometrics": client.get(f"/api/stats/biometrics?{params}").json(),
+    }
+
+
+class TestDashboard:
+    """O painel agregado devolve o mesmo que os seis endpoints."""
+
+    @pytest.mark.parametrize("cube_enabled", [True, False])
+    @pytest.mark.parametrize("params", FILTERS)
+    def test_matches_individual_endpoints(self, use_sample_db, params, cube_enabled):
+        """Cada gráfico é idêntico ao do endpoint correspondente."""
+        with patch.object(config, 'MEDAL_CUBE_ENABLED', cube_enabled):
+            data = client.get(f"/api/stats/dashboard?{params}").json()
+            assert data == individual_payloads(params)
+
+    def test_reads_each_slice_once(self, use_sample_db):
+        """Sem estruturas em memória, o painel faz uma leitura de eventos e uma de atletas."""
+        with patch.object(config, 'MEDAL_CUBE_ENABLED', False), \
+                patch.object(config, 'ATHLETE_TALLIES_ENABLED', False), \
+                patch.object(config, 'ATHLETE_BITSETS_ENABLED', False), \
+                patch.object(config, 'BIOMETRICS_SAMPLES_ENABLED', False), \
+                patch.object(data_loader, 'load_athletes_slice', wraps=data_loader.load_athletes_slice) as athletes, \
+                patch.object(data_loader, 'load_medal_events_slice', wraps=data_loader.load_medal_events_slice) as events:
+            data = client.get("/api/stats/dashboard?year=2016").json()
+        assert athletes.call_count == 1
+        assert events.call_count == 1
+        assert data == individual_payloads("year=2016")
+
+    def test_skips_athletes_slice_with_structures(self, use_sample_db):
+        """Com rankings, bitsets e amostras, o recorte de atletas não é lido."""
+        with patch.object(data_loader, 'load_athletes_slice', wraps=data_loader.load_athletes_slice) as athletes:
+            assert client.get("/api/stats/dashboard").status_code == 200
+        assert athletes.call_count == 0
+
+    def test_error_returns_empty_charts(self):
+        """Falha no banco devolve todos os gráficos vazios."""
+        with patch('app.api.data_loader') as mock_loader:
+            mock_loader.load_athletes_slice.side_effect = Exception("sem banco")
+            mock_loader.load_medal_events_slice.side_effect = Exception("sem banco")
+            data = client.get("/api/stats/dashboard").json()
+        assert data == {k: [] for k in ("map", "medals", "evolution", "gender", "top_athletes", "biometrics")}
@@ -5,8 +5,11 @@ import pandas as pd
 import numpy as np
 import os
 import sqlite3
+import threading
 
-from app.data_loader import DataLoader, data_loader, DB_PATH
+from app.columnar import ColumnarStore
+from app.data_loader import DataLoader, ConnectionPool, data_loader, DB_PATH
+from scripts.convert_to_sqlite import convert_csv_to_sqlite
 
 
 class TestDataLoaderSingleton:
@@ -52,14 +55,91 @@ class TestDataLoaderConnection:
                 result = cursor.fetchone()
                 assert result == (1,)
     
-    def test_get_connection_context_closes_connection(self):
-        """Context manager fecha a conexão."""
+    def test_get_connection_context_returns_connection_to_pool(self):
+        """Context manager devolve a conexão ao pool."""
         if os.path.exists(DB_PATH):
             loader = DataLoader()
             with loader.get_connection_context() as conn:
                 pass
-            with pytest.raises(sqlite3.ProgrammingError):
-                conn.cursor()
+            assert loader.get_pool_stats()["in_use"] == 0
+            with loader.get_connection_context() as conn2:
+                assert conn2 is conn
+
+    def test_get_connection_is_read_only(self):
+        """Conexões são abertas em modo somente leitura."""
+        if os.path.exists(DB_PATH):
+            conn = DataLoader().get_connection()
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("CREATE TABLE tmp_write_test (x INTEGER)")
+            conn.close()
+
+
+class TestConnectionPool:
+    """Testes para o pool de conexões."""
+
+    @staticmethod
+    def _memory_connect():
+        return sqlite3.connect(":memory:", check_same_thread=False)
+
+    def test_pool_reuses_connections(self):
+        """Conexão devolvida é reutilizada."""
+        pool = ConnectionPool(self._memory_connect, size=2, timeout=1)
+        conn = pool.acquire()
+        pool.release(conn)
+        assert pool.acquire() is conn
+        assert pool.stats()["opened"] == 1
+
+    def test_pool_respects_size_limit(self):
+        """Pool não abre mais conexões que o limite e expira a espera."""
+        pool = ConnectionPool(self._memory_connect, size=1, timeout=0.01)
+        pool.acquire()
+        with pytest.raises(TimeoutError):
+            pool.acquire()
+        stats = pool.stats()
+        assert stats["opened"] == 1
+        assert stats["timeouts"] == 1
+
+    def test_pool_waits_for_released_connection(self):
+        """Requisição aguarda conexão liberada por outra thread."""
+        pool = ConnectionPool(self._memory_connect, size=1, timeout=5)
+        conn = pool.acquire()
+        timer = threading.Timer(0.05, pool.release, args=[conn])
+        timer.start()
+        assert pool.acquire() is conn
+        timer.join()
+        assert pool.stats()["waits"] == 1
+
+    def test_pool_connect_failure_does_not_leak_slot(self):
+        """Falha ao conectar não consome vaga do pool."""
+        connect = MagicMock(side_effect=[sqlite3.OperationalError("falha"), self._memory_connect()])
+        pool = ConnectionPool(connect, size=1, timeout=0.01)
+        with pytest.raises(sqlite3.OperationalError):
+            pool.acquire()
+        assert pool.acquire() is not None
+
+    def test_pool_stats_and_close(self):
+        """Estatísticas refletem uso e close fecha ociosas."""
+        pool = ConnectionPool(self._memory_connect, size=3, timeout=1)
+        a, b = pool.acquire(), pool.acquire()
+        pool.release(a)
+        stats = pool.stats()
+        assert stats["in_use"] == 1
+        assert stats["idle"] == 1
+        assert stats["checkouts"] == 2
+        pool.release(b)
+        pool.close()
+        assert pool.stats()["opened"] == 0
+
+    def test_retired_pool_closes_borrowed_connections(self):
+        """Conexão emprestada de um pool aposentado é fechada ao voltar."""
+        pool = ConnectionPool(self._memory_connect, size=2, timeout=1)
+        conn = pool.acquire()
+        pool.retire()
+        conn.execute("SELECT 1")
+        pool.release(conn)
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+        assert pool.stats()["opened"] == 0
 
 
 class TestDataLoaderQueries:
@@ -284,6 +364,73 @@ class TestDataLoaderErrorHandling:
             assert result == {}
 
 
+class TestHotReload:
+    """Troca do olympics.db com o servidor em execução."""
+
+    @staticmethod
+    def _rebuild(db_path, frame):
+        csv_path = os.path.join(os.path.dirname(db_path), "rebuild.csv")
+        frame.to_csv(csv_path, index=False)
+        convert_csv_to_sqlite(csv_path, db_path)
+
+    def test_new_database_is_picked_up(self, use_sample_db, sample_dataframe):
+        """Consultas passam a ler o banco novo e a versão muda."""
+        version = data_loader.get_dataset_version()
+        assert len(data_loader.query_filtered(year=2016)) == 4
+        with data_loader.get_connection_context() as old_conn:
+            self._rebuild(use_sample_db, sample_dataframe.assign(Year=2016))
+            # A consulta em andamento continua lendo o banco anterior
+            assert old_conn.execute("SELECT COUNT(*) FROM athletes WHERE Year = 2016").fetchone() == (4,)
+            assert len(data_loader.query_filtered(year=2016)) == 10
+        assert data_loader.get_dataset_version() != version
+
+    def test_in_memory_structures_are_rebuilt(self, use_sample_db, sample_dataframe):
+        """Motor colunar já carregado é reconstruído a partir do banco novo."""
+        assert len(data_loader.get_columnar_store()) == 10
+        self._rebuild(use_sample_db, sample_dataframe.iloc[:6])
+        data_loader.refresh()
+        assert len(data_loader.get_columnar_store()) == 6
+
+    def test_listeners_are_notified(self, use_sample_db, sample_dataframe):
+        """Ouvintes recebem a nova versão uma única vez."""
+        data_loader.get_dataset_version()
+        versions = []
+        with patch.object(data_loader, '_reload_listeners', [versions.append]):
+            self._rebuild(use_sample_db, sample_dataframe.iloc[:6])
+            assert data_loader.refresh() is True
+            assert data_loader.refresh() is False
+        assert versions == [data_loader.get_dataset_version()]
+
+    def test_same_content_keeps_connections(self, use_sample_db, sample_dataframe):
+        """Regerar o banco com os mesmos dados não troca nada."""
+        version = data_loader.get_dataset_version()
+        reloads = data_loader.get_dataset_info()["reloads"]
+        self._rebuild(use_sample_db, sample_dataframe)
+        assert data_loader.refresh() is False
+        assert data_loader.get_dataset_info() == {"version": version, "reloads": reloads}
+
+    def test_failed_rebuild_is_retried(self, use_sample_db, sample_dataframe):
+        """Se a reconstrução falha, o banco anterior segue em uso e a próxima chamada tenta de novo."""
+        store = data_loader.get_columnar_store()
+        version = data_loader.get_dataset_version()
+        attempts = []
+
+        def build(conn):
+            attempts.append(conn)
+            if len(attempts) == 1:
+                raise MemoryError("sem memória")
+            return ColumnarStore.from_connection(conn)
+
+        self._rebuild(use_sample_db, sample_dataframe.iloc[:6])
+        with patch.dict(DataLoader._STRUCTURES, {"_columnar": build}):
+            assert data_loader.refresh() is False
+            assert data_loader._version == version
+            assert data_loader._columnar is store
+            assert data_loader.refresh() is True
+        assert data_loader.get_dataset_version() != version
+        assert len(data_loader.get_columnar_store()) == 6
+
+
 class TestDBPath:
     """Testes para caminho do banco de dados."""
     
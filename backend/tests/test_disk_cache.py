@@ -0,0 +1,102 @@
+"""Testes para o cache de respostas em disco."""
+import os
+import shutil
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app import api
+from app.data_loader import data_loader
+from app.disk_cache import DiskCache
+from app.main import app
+from app.response_cache import CachedBody, encode_json
+from scripts.convert_to_sqlite import convert_csv_to_sqlite
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache" / "responses.db"))
+    yield cache
+    cache.close()
+
+
+class TestDiskCache:
+    """Testes para o armazenamento em disco."""
+
+    def test_round_trip(self, disk_cache):
+        """O corpo gravado volta byte a byte."""
+        body = encode_json([{"code": "BRA", "total": 3}])
+        assert disk_cache.get("v1", "k") is None
+        disk_cache.set("v1", "k", body)
+        assert disk_cache.get("v1", "k") == body
+        assert disk_cache.stats()["hits"] == 1
+        assert disk_cache.stats()["misses"] == 1
+        assert disk_cache.stats()["writes"] == 1
+
+    def test_versions_are_isolated_and_pruned(self, disk_cache):
+        """Outra versão do banco não enxerga nem mantém as entradas antigas."""
+        disk_cache.set("v1", "k", CachedBody(b"[1]", "application/json"))
+        assert disk_cache.get("v2", "k") is None
+        disk_cache.set("v2", "k", CachedBody(b"[2]", "application/json"))
+        assert disk_cache.get("v1", "k") is None
+        assert disk_cache.get("v2", "k").body == b"[2]"
+
+    def test_old_worker_keeps_newer_versions(self, disk_cache):
+        """Em uma troca gradual, o worker antigo não apaga a versão nova."""
+        old_worker = DiskCache(disk_cache.path)
+        try:
+            old_worker.set("v1", "k", CachedBody(b"[1]", "application/json"))
+            disk_cache.set("v2", "k", CachedBody(b"[2]", "application/json"))
+            old_restarted = DiskCache(disk_cache.path)
+            try:
+                old_restarted.set("v1", "k", CachedBody(b"[1]", "application/json"))
+            finally:
+                old_restarted.close()
+            old_worker.set("v1", "other", CachedBody(b"[1]", "application/json"))
+            assert disk_cache.get("v2", "k").body == b"[2]"
+        finally:
+            old_worker.close()
+
+    def test_shared_between_instances(self, disk_cache):
+        """Dois workers com o mesmo arquivo compartilham as entradas."""
+        other = DiskCache(disk_cache.path)
+        try:
+            disk_cache.set("v1", "k", CachedBody(b"[1]", "application/json"))
+            assert other.get("v1", "k").body == b"[1]"
+        finally:
+            other.close()
+
+
+class TestDiskCacheEndpoints:
+    """Testes para o segundo nível no decorator dos endpoints."""
+
+    def test_memory_miss_is_served_from_disk(self, use_sample_db, disk_cache):
+        """Depois de limpar a memória, a resposta vem do disco sem recalcular."""
+        with patch.object(api, "DISK_CACHE", disk_cache):
+            first = client.get("/api/stats/medals?year=2016")
+            api.RESPONSE_CACHE.clear()
+            with patch.object(data_loader, "get_connection", side_effect=AssertionError("recalculou")):
+                second = client.get("/api/stats/medals?year=2016")
+        assert second.status_code == 200
+        assert second.content == first.content
+        assert disk_cache.stats()["hits"] == 1
+
+    def test_reload_clears_memory_cache(self, use_sample_db, sample_dataframe, tmp_path):
+        """Regerar o banco muda a resposta sem reiniciar o servidor."""
+        assert client.get("/api/stats/biometrics?year=2016").json()["population"] == 4
+        csv_path = str(tmp_path / "rebuild.csv")
+        sample_dataframe.assign(Year=2016).to_csv(csv_path, index=False)
+        convert_csv_to_sqlite(csv_path, use_sample_db)
+        assert client.get("/api/stats/biometrics?year=2016").json()["population"] == 10
+
+    def test_dataset_version_follows_content(self, use_sample_db, tmp_path):
+        """A versão depende do conteúdo, não do mtime do arquivo."""
+        version = data_loader.get_dataset_version()
+        copy = str(tmp_path / "copy.db")
+        shutil.copyfile(use_sample_db, copy)
+        os.utime(copy, ns=(0, 0))
+        with patch("app.data_loader.DB_PATH", copy):
+            assert data_loader.get_dataset_version() == version
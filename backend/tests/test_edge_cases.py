@@ -58,7 +58,7 @@ class TestBiometricsEdgeCases:
         response = client.get("/api/stats/biometrics?year=1800")
         assert response.status_code == 200
         data = response.json()
-        assert isinstance(data, list)
+        assert isinstance(data["points"], list)
     
     def test_biometrics_with_winter_sport(self):
         """Esporte de inverno."""
@@ -0,0 +1,119 @@
+"""Testes para o compilador de filtros."""
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.columnar import ColumnarStore
+from app.data_loader import MIXED_SEX
+from app.filters import Filters
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def sqlite_conn(sample_dataframe):
+    conn = sqlite3.connect(":memory:")
+    sample_dataframe.to_sql('athletes', conn, index=False)
+    yield conn
+    conn.close()
+
+
+class TestFiltersNormalization:
+    """Testes para a normalização dos parâmetros."""
+
+    def test_neutral_values_are_dropped(self):
+        """'Both', 'All' e 'Total' equivalem a não filtrar."""
+        neutral = Filters.from_params(season='Both', sex='Both', country='All', sport='All', medal_type='Total')
+        assert neutral == Filters()
+        assert neutral.to_sql() == ("", [])
+
+    def test_year_equals_single_year_range(self):
+        """year=2016 e start_year=end_year=2016 são o mesmo filtro."""
+        assert Filters.from_params(year=2016) == Filters.from_params(start_year=2016, end_year=2016)
+
+    def test_year_inside_range_is_intersected(self):
+        """year e intervalo juntos selecionam a interseção."""
+        assert Filters.from_params(year=2012, start_year=2008, end_year=2016).to_sql() == ("WHERE Year = ?", [2012])
+
+    def test_open_range_is_ignored(self):
+        """Intervalo sem uma das pontas não filtra, como antes."""
+        assert Filters.from_params(start_year=2008) == Filters()
+
+    def test_countries_are_sorted_and_deduplicated(self):
+        """A ordem dos países não muda o filtro."""
+        assert Filters.from_params(countries=['USA', 'BRA', 'USA']) == Filters.from_params(countries=['BRA', 'USA'])
+
+    def test_country_and_countries_are_intersected(self):
+        """country restringe a lista de países."""
+        assert Filters.from_params(country='USA', countries=['BRA', 'USA']).countries == ('USA',)
+        assert Filters.from_params(country='CHN', countries=['BRA', 'USA']).countries == ()
+
+
+class TestFiltersSql:
+    """Testes para o SQL gerado."""
+
+    def test_canonical_text_and_parameter_order(self):
+        """Colunas saem sempre na mesma ordem, independente da chamada."""
+        a = Filters.from_params(sport='Judo', sex='F', year=2016, country='BRA', season='Summer', medal_type='Gold')
+        b = Filters.from_params(medal_type='Gold', country='BRA', season='Summer', sex='F', start_year=2016, end_year=2016, sport='Judo')
+        assert a.to_sql() == b.to_sql() == (
+            "WHERE Year = ? AND Season = ? AND Sex = ? AND NOC = ? AND Sport = ? AND Medal = ?",
+            [2016, 'Summer', 'F', 'BRA', 'Judo', 'Gold'],
+        )
+
+    def test_base_conditions_come_first(self):
+        """Condições fixas do endpoint antecedem os filtros."""
+        where, params = Filters.from_params(start_year=2008, end_year=2012).to_sql(base=("Height IS NOT NULL",))
+        assert where == "WHERE Height IS NOT NULL AND Year >= ? AND Year <= ?"
+        assert params == [2008, 2012]
+
+    def test_mixed_sex(self):
+        """Em medal_events o filtro de sexo aceita medalhas mistas."""
+        where, params = Filters.from_params(sex='M').to_sql(mixed_sex=MIXED_SEX)
+        assert where == f"WHERE Sex IN (?, '{MIXED_SEX}')"
+        assert params == ['M']
+
+    def test_empty_country_list_matches_nothing(self, sqlite_conn):
+        """countries=() gera um IN vazio válido no SQLite."""
+        where, params = Filters(countries=()).to_sql()
+        assert sqlite_conn.execute(f"SELECT COUNT(*) FROM athletes {where}", params).fetchone() == (0,)
+
+
+class TestFiltersMask:
+    """A máscara vetorizada seleciona as mesmas linhas que o SQL."""
+
+    CASES = [
+        {},
+        {'year': 2016},
+        {'start_year': 2008, 'end_year': 2012},
+        {'season': 'Winter', 'sex': 'F'},
+        {'countries': ['USA', 'BRA']},
+        {'country': 'USA', 'sport': 'Basketball'},
+        {'medal_type': 'Gold'},
+        {'country': 'ZZZ'},
+    ]
+
+    @pytest.mark.parametrize("params", CASES)
+    def test_mask_matches_sql(self, sqlite_conn, params):
+        """Mesmos IDs pelo SQL e pela máscara."""
+        filters = Filters.from_params(**params)
+        where, values = filters.to_sql()
+        expected = [row[0] for row in sqlite_conn.execute(f"SELECT ID FROM athletes {where} ORDER BY rowid", values)]
+        store = ColumnarStore.from_connection(sqlite_conn)
+        assert store.rows(filters.to_mask(store))['ID'].tolist() == expected
+
+
+class TestEndpointFilters:
+    """Endpoints aplicam todos os filtros recebidos."""
+
+    def test_biometrics_respects_year_range(self, use_sample_db):
+        """Biometria filtra por intervalo de anos."""
+        data = client.get("/api/stats/biometrics?start_year=2008&end_year=2008").json()
+        assert data['points'] and {item['Year'] for item in data['points']} == {2008}
+
+    def test_medal_table_respects_year_range(self, use_sample_db):
+        """Quadro de medalhas filtra por intervalo de anos."""
+        data = client.get("/api/stats/medals?start_year=2008&end_year=2008").json()
+        assert {item['code'] for item in data} == {'GBR', 'JPN'}
@@ -6,6 +6,7 @@ import pandas as pd
 import numpy as np
 import sqlite3
 
+from app import config
 from app.main import app
 from app.data_loader import data_loader, DataLoader
 from app.api import RESPONSE_CACHE, get_cache_key
@@ -16,13 +17,14 @@ client = TestClient(app)
 class TestCacheOverflow:
     """Testes para overflow do cache."""
     
-    def test_cache_clear_on_overflow(self):
-        """Cache é limpo quando excede 1000 itens."""
+    def test_cache_keeps_entries_on_overflow(self):
+        """Muitas entradas não esvaziam o cache de uma vez."""
         for i in range(1005):
             RESPONSE_CACHE[f"test_key_{i}"] = {"data": i}
         
         response = client.get("/api/filters")
         assert response.status_code == 200
+        assert len(RESPONSE_CACHE) > 1000
         
         keys_to_remove = [k for k in RESPONSE_CACHE.keys() if k.startswith("test_key_")]
         for k in keys_to_remove:
@@ -48,7 +50,7 @@ class TestEmptyDataScenarios:
         """Retorna vazio para ano inexistente."""
         response = client.get("/api/stats/biometrics?year=1700")
         assert response.status_code == 200
-        assert response.json() == []
+        assert response.json() == {"population": 0, "points": []}
     
     def test_evolution_returns_empty_for_nonexistent_countries(self):
         """Retorna vazio para países inexistentes."""
@@ -113,7 +115,8 @@ class TestAllEndpointsWithMocks:
     
     def test_gender_stats_handles_exception(self):
         """/api/stats/gender trata exceções."""
-        with patch('app.api.data_loader') as mock_loader:
+        with patch('app.api.data_loader') as mock_loader, \
+                patch.object(config, 'ATHLETE_BITSETS_ENABLED', False):
             mock_ctx = MagicMock()
             mock_ctx.__enter__ = MagicMock(side_effect=Exception("Erro"))
             mock_ctx.__exit__ = MagicMock(return_value=False)
@@ -125,7 +128,8 @@ class TestAllEndpointsWithMocks:
     
     def test_biometrics_handles_exception(self):
         """/api/stats/biometrics trata exceções."""
-        with patch('app.api.data_loader') as mock_loader:
+        with patch('app.api.data_loader') as mock_loader, \
+                patch.object(config, 'BIOMETRICS_SAMPLES_ENABLED', False):
             mock_ctx = MagicMock()
             mock_ctx.__enter__ = MagicMock(side_effect=Exception("Erro"))
             mock_ctx.__exit__ = MagicMock(return_value=False)
@@ -133,7 +137,7 @@ class TestAllEndpointsWithMocks:
             
             response = client.get("/api/stats/biometrics")
             assert response.status_code == 200
-            assert response.json() == []
+            assert response.json() == {"population": 0, "points": []}
     
     def test_evolution_handles_exception(self):
         """/api/stats/evolution trata exceções."""
@@ -161,7 +165,8 @@ class TestAllEndpointsWithMocks:
     
     def test_top_athletes_handles_exception(self):
         """/api/stats/top-athletes trata exceções."""
-        with patch('app.api.data_loader') as mock_loader:
+        with patch('app.api.data_loader') as mock_loader, \
+                patch.object(config, 'ATHLETE_TALLIES_ENABLED', False):
             mock_ctx = MagicMock()
             mock_ctx.__enter__ = MagicMock(side_effect=Exception("Erro"))
             mock_ctx.__exit__ = MagicMock(return_value=False)
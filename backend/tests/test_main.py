@@ -16,6 +16,13 @@ def test_health_check():
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
 
+def test_health_stats():
+    """Estatísticas de runtime incluem o pool de conexões e o cache."""
+    response = client.get("/health/stats")
+    assert response.status_code == 200
+    assert "db_pool" in response.json()
+    assert "hits" in response.json()["response_cache"]
+
 def test_get_filters():
     """Filtros retornam dados válidos."""
     response = client.get("/api/filters")
@@ -0,0 +1,122 @@
+"""Testes para o cubo de medalhas em memória."""
+import sqlite3
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.data_loader import MIXED_SEX
+from app.filters import Filters
+from app.medal_cube import MedalCube
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def cube(sample_db):
+    conn = sqlite3.connect(sample_db)
+    yield MedalCube.from_connection(conn, MIXED_SEX)
+    conn.close()
+
+
+@pytest.fixture
+def mixed_cube():
+    """Cubo com uma medalha mista e duas masculinas."""
+    cells = pd.DataFrame({
+        'Year': [2012, 2012, 2016],
+        'Season': ['Summer', 'Summer', 'Summer'],
+        'Sex': [MIXED_SEX, 'M', 'M'],
+        'NOC': ['USA', 'USA', 'BRA'],
+        'Sport': ['Tennis', 'Judo', 'Judo'],
+        'Medal': ['Gold', 'Gold', 'Bronze'],
+        'Count': [1, 2, 1],
+    })
+    return MedalCube(cells, MIXED_SEX)
+
+
+class TestMedalCube:
+    """Testes para filtros e agregações do cubo."""
+
+    def test_cells_are_sparse(self, cube):
+        """Só células não vazias são guardadas."""
+        assert len(cube) == 7
+        assert (cube.counts > 0).all()
+
+    def test_totals_sorted_like_group_by(self, cube):
+        """Agrupamento devolve combinações ordenadas."""
+        df = cube.totals(Filters().to_mask(cube, mixed_sex=MIXED_SEX), ("NOC", "Medal"))
+        assert list(zip(df['NOC'], df['Medal'])) == sorted(zip(df['NOC'], df['Medal']))
+        assert df['Count'].sum() == 7
+
+    def test_year_range(self, cube):
+        """Intervalo de anos seleciona as células certas."""
+        df = cube.totals(Filters.from_params(start_year=2012, end_year=2012).to_mask(cube, mixed_sex=MIXED_SEX), ("Year",))
+        assert df.to_dict(orient='records') == [{"Year": 2012, "Count": 2}]
+
+    def test_unknown_value_selects_nothing(self, cube):
+        """Valor inexistente produz resultado vazio."""
+        assert cube.totals(Filters.from_params(country='ZZZ').to_mask(cube, mixed_sex=MIXED_SEX), ("NOC",)).empty
+
+    def test_mixed_medal_counts_for_each_sex(self, mixed_cube):
+        """Medalha mista entra no filtro de qualquer sexo, e uma vez sem filtro."""
+        def by_noc(**filters):
+            return mixed_cube.totals(Filters.from_params(**filters).to_mask(mixed_cube, mixed_sex=MIXED_SEX), ("NOC",)).to_dict(orient='records')
+
+        assert by_noc() == [{"NOC": "BRA", "Count": 1}, {"NOC": "USA", "Count": 3}]
+        assert by_noc(sex='F') == [{"NOC": "USA", "Count": 1}]
+        assert by_noc(sex='M') == [{"NOC": "BRA", "Count": 1}, {"NOC": "USA", "Count": 3}]
+
+    @pytest.mark.parametrize("filters", [
+        {}, {'year': 2016}, {'season': 'Winter'}, {'sex': 'F'}, {'sport': 'Basketball'},
+        {'countries': ['USA', 'CHN']}, {'start_year': 2008, 'end_year': 2012},
+    ])
+    def test_parity_with_medal_events(self, cube, sample_db, filters):
+        """Totais do cubo batem com GROUP BY sobre medal_events."""
+        clauses, params = ["1=1"], []
+        if 'year' in filters:
+            clauses.append("Year = ?")
+            params.append(filters['year'])
+        if 'start_year' in filters:
+            clauses.append("Year BETWEEN ? AND ?")
+            params.extend([filters['start_year'], filters['end_year']])
+        if 'season' in filters:
+            clauses.append("Season = ?")
+            params.append(filters['season'])
+        if 'sex' in filters:
+            clauses.append(f"Sex IN (?, '{MIXED_SEX}')")
+            params.append(filters['sex'])
+        if 'sport' in filters:
+            clauses.append("Sport = ?")
+            params.append(filters['sport'])
+        if 'countries' in filters:
+            clauses.append("NOC IN (?, ?)")
+            params.extend(filters['countries'])
+        conn = sqlite3.connect(sample_db)
+        expected = pd.read_sql_query(
+            f"SELECT NOC, Medal, COUNT(*) as Count FROM medal_events WHERE {' AND '.join(clauses)} "
+            "GROUP BY NOC, Medal", conn, params=params
+        )
+        conn.close()
+        got = cube.totals(Filters.from_params(**filters).to_mask(cube, mixed_sex=MIXED_SEX), ("NOC", "Medal"))
+        assert got.to_dict(orient='records') == expected.to_dict(orient='records')
+
+
+class TestCubeEndpoints:
+    """Endpoints respondidos pelo cubo."""
+
+    def test_map_stats(self, use_sample_db):
+        """Mapa por ano."""
+        data = client.get("/api/stats/map?year=2016").json()
+        assert {item['id']: item['total'] for item in data} == {'USA': 1, 'BRA': 1, 'AUS': 1}
+
+    def test_medal_table_sorted_by_gold(self, use_sample_db):
+        """Quadro de medalhas ordenado por ouro."""
+        data = client.get("/api/stats/medals").json()
+        assert [item['gold'] for item in data] == sorted([item['gold'] for item in data], reverse=True)
+        assert sum(item['total'] for item in data) == 7
+
+    def test_evolution_default_top_countries(self, use_sample_db):
+        """Evolução sem países usa os que têm mais medalhas."""
+        data = client.get("/api/stats/evolution?season=Summer").json()
+        assert [row['Year'] for row in data] == [2008, 2016]
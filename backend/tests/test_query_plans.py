@@ -0,0 +1,222 @@
+"""Auditoria dos planos de consulta gerados pelos endpoints."""
+import os
+import re
+import shutil
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app import config
+from app.data_loader import data_loader, DB_PATH
+from app.main import app
+
+client = TestClient(app)
+
+FILTER_COMBINATIONS = [
+    "",
+    "year=2016",
+    "start_year=2000&end_year=2016",
+    "season=Summer",
+    "sex=F",
+    "country=USA",
+    "sport=Swimming",
+    "medal_type=Gold",
+    "year=2016&season=Summer&sex=M&country=USA&sport=Swimming&medal_type=Gold",
+]
+
+ENDPOINTS = [
+    "/api/stats/map", "/api/stats/gender", "/api/stats/biometrics", "/api/stats/medals",
+    "/api/stats/top-athletes", "/api/stats/evolution",
+]
+
+OTHER_URLS = [
+    "/api/filters",
+    "/api/stats/evolution?countries=USA&countries=BRA",
+    "/api/stats/biometrics?mode=bins",
+    "/api/stats/biometrics?mode=bins&sex=F&year=2016",
+    "/api/athletes/search?query=Athlete",
+    "/api/athletes/1",
+    "/api/athletes/1/stats",
+    "/api/athletes/1/full",
+]
+
+
+def collect_statements():
+    """Executa todos os endpoints e devolve os SELECTs enviados ao SQLite."""
+    statements = []
+    original_connect = data_loader.get_connection
+
+    def traced_connect():
+        conn = original_connect()
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    with patch.object(data_loader, 'get_connection', side_effect=traced_connect), \
+            patch.object(config, 'MEDAL_CUBE_ENABLED', False), \
+            patch.object(config, 'ATHLETE_TALLIES_ENABLED', False), \
+            patch.object(config, 'ATHLETE_BITSETS_ENABLED', False), \
+            patch.object(config, 'BIOMETRICS_SAMPLES_ENABLED', False), \
+            patch.object(config, 'SEARCH_INDEX_ENABLED', False), \
+            patch.object(config, 'QUERY_ENGINE', 'sqlite'):
+        for endpoint in ENDPOINTS:
+            for params in FILTER_COMBINATIONS:
+                assert client.get(f"{endpoint}?{params}").status_code == 200
+        for url in OTHER_URLS:
+            assert client.get(url).status_code == 200
+        assert client.post("/api/athletes/batch", json={"ids": [1, 2, 3]}).status_code == 200
+
+    unique = dict.fromkeys(s.strip() for s in statements if s.lstrip().upper().startswith("SELECT"))
+    return list(unique)
+
+
+def collect_dashboard_statements():
+    """Executa /stats/dashboard com as estruturas em memória já montadas.
+
+    É a configuração padrão: cubo, rankings, bitsets e amostras respondem
+    todos os gráficos. Só sem elas o painel lê o recorte de atletas do filtro.
+    """
+    with patch.object(config, 'QUERY_ENGINE', 'sqlite'):
+        data_loader.get_medal_cube()
+        data_loader.get_athlete_tallies()
+        data_loader.get_athlete_bitsets()
+        data_loader.get_biometric_samples()
+        statements = []
+        original_connect = data_loader.get_connection
+
+        def traced_connect():
+            conn = original_connect()
+            conn.set_trace_callback(statements.append)
+            return conn
+
+        with patch.object(data_loader, 'get_connection', side_effect=traced_connect):
+            for params in FILTER_COMBINATIONS:
+                assert client.get(f"/api/stats/dashboard?{params}").status_code == 200
+    return [s.strip() for s in statements if s.lstrip().upper().startswith("SELECT")]
+
+
+# Varreduras inteiras de índice aceitas, por consulta e índice. As listas de
+# opções de /filters são lidas uma vez por versão do banco (a resposta fica em
+# cache) e só do índice estreito, com poucas dezenas ou centenas de valores.
+BOUNDED_INDEX_SCANS = [
+    (r"SELECT DISTINCT Year FROM athletes ORDER BY Year", "idx_athletes_games"),
+    (r"SELECT DISTINCT Sport FROM athletes ORDER BY Sport", "idx_athletes_sport"),
+    (r"SELECT DISTINCT Year, Season FROM athletes", "idx_athletes_games"),
+    (r"SELECT DISTINCT NOC, Team FROM athletes", "idx_athletes_noc"),
+    # Fallback SQL de /stats/biometrics sem amostras nem motor colunar: a grade
+    # e o sorteio precisam de toda a população com altura e peso do filtro, e
+    # o índice de biometria é a cópia mais estreita dela. Só filtros por
+    # colunas do próprio índice (Sex, Medal), que nenhum outro índice estreita.
+    (
+        r"SELECT (rowid AS _rowid, Sex, Medal|Height, Weight, Medal) FROM athletes "
+        r"WHERE Height IS NOT NULL AND Weight IS NOT NULL( AND (Sex|Medal) = '[^']*')*",
+        "idx_athletes_biometrics",
+    ),
+]
+
+
+def athletes_full_scans(conn, sql):
+    """Retorna os passos do plano que varrem a tabela athletes inteira.
+
+    Varrer um índice inteiro também conta, assim como buscas por um
+    intervalo aberto (`Height IS NOT NULL` vira `(Height>?)`), que leem quase
+    o índice todo; as duas são aceitas só nos pares de BOUNDED_INDEX_SCANS.
+    Uma varredura da tabela é aceita quando alimenta um LIMIT sem ordenação
+    nem agrupamento, pois para após as primeiras linhas encontradas.
+    """
+    plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+    statement = " ".join(sql.split())
+    streams_into_limit = (
+        re.search(r"\bLIMIT\b", sql, re.I)
+        and not re.search(r"\b(GROUP BY|DISTINCT)\b", sql, re.I)
+        and not any("TEMP B-TREE" in step for step in plan)
+    )
+    scans = []
+    for step in plan:
+        index = re.fullmatch(r"SEARCH athletes USING (?:COVERING )?INDEX (\w+) \(\w+[<>]\?\)", step)
+        if not index and not re.match(r"SCAN athletes\b", step):
+            continue
+        if re.fullmatch(r"SCAN athletes", step) and streams_into_limit:
+            continue
+        index = index or re.fullmatch(r"SCAN athletes USING COVERING INDEX (\w+)", step)
+        if index and any(
+            re.fullmatch(pattern, statement) and index.group(1) == allowed
+            for pattern, allowed in BOUNDED_INDEX_SCANS
+        ):
+            continue
+        scans.append(step)
+    return scans
+
+
+@pytest.fixture
+def sample_db_without_stats(use_sample_db, tmp_path):
+    """Banco de exemplo sem sqlite_stat1: o planejador assume tabelas grandes."""
+    path = tmp_path / "no_stats.db"
+    shutil.copy(use_sample_db, path)
+    conn = sqlite3.connect(path)
+    conn.execute("DELETE FROM sqlite_stat1")
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+class TestConverterIndexes:
+    """Testes para o conjunto de índices do conversor."""
+
+    def test_id_index_used_for_profile(self, sample_db):
+        """Perfil de atleta busca pelo índice de ID."""
+        conn = sqlite3.connect(sample_db)
+        plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN SELECT * FROM athletes WHERE ID = 1")]
+        conn.close()
+        assert any("idx_athletes_id" in step for step in plan)
+
+    def test_analyze_collects_statistics(self, sample_db):
+        """ANALYZE roda na conversão."""
+        conn = sqlite3.connect(sample_db)
+        tables = {row[0] for row in conn.execute("SELECT tbl FROM sqlite_stat1")}
+        conn.close()
+        assert {"athletes", "medal_events", "athlete_medals"} <= tables
+
+
+class TestQueryPlanAudit:
+    """Nenhuma consulta de api.py pode varrer a tabela athletes inteira."""
+
+    def test_statements_are_collected(self, use_sample_db):
+        """O rastreamento captura as consultas dos endpoints."""
+        statements = collect_statements()
+        assert any("FROM athletes" in sql for sql in statements)
+        assert any("FROM medal_events" in sql for sql in statements)
+
+    def test_dashboard_does_not_read_athletes(self, use_sample_db):
+        """Com as estruturas em memória, o painel não consulta a tabela athletes."""
+        assert [sql for sql in collect_dashboard_statements() if re.search(r"\bathletes\b", sql)] == []
+
+    def test_no_full_scans_on_sample_db(self, sample_db_without_stats):
+        """Planos no banco de exemplo sem estatísticas."""
+        statements = collect_statements()
+        conn = sqlite3.connect(sample_db_without_stats)
+        offenders = {sql: athletes_full_scans(conn, sql) for sql in statements}
+        conn.close()
+        assert {sql: scans for sql, scans in offenders.items() if scans} == {}
+
+    def test_no_full_scans_on_real_db(self, use_sample_db):
+        """Planos no banco real, com as estatísticas do ANALYZE."""
+        if not os.path.exists(DB_PATH):
+            pytest.skip("olympics.db ausente")
+        statements = collect_statements()
+        conn = sqlite3.connect(DB_PATH)
+        offenders = {sql: athletes_full_scans(conn, sql) for sql in statements}
+        conn.close()
+        assert {sql: scans for sql, scans in offenders.items() if scans} == {}
+
+    def test_index_scans_are_reported(self, sample_db):
+        """Varrer um índice inteiro ou um intervalo aberto fora da lista conta como varredura completa."""
+        conn = sqlite3.connect(sample_db)
+        scans = athletes_full_scans(conn, "SELECT Sex, COUNT(DISTINCT ID) FROM athletes GROUP BY Sex")
+        allowed = athletes_full_scans(conn, "SELECT DISTINCT Sport FROM athletes ORDER BY Sport")
+        open_range = athletes_full_scans(conn, "SELECT Height, Weight FROM athletes WHERE Height IS NOT NULL")
+        conn.close()
+        assert scans and all("COVERING INDEX" in step for step in scans)
+        assert allowed == []
+        assert open_range and all("(Height>?)" in step for step in open_range)
@@ -0,0 +1,264 @@
+"""Testes para o cache de respostas."""
+import threading
+import time
+
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app import config
+from app.api import RESPONSE_CACHE, cached_endpoint
+from app.main import app
+from app.response_cache import MISSING, ResponseCache, encode_json
+
+client = TestClient(app)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_cache(max_bytes=100, **kwargs):
+    return ResponseCache(max_bytes, sizeof=len, **kwargs)
+
+
+class TestResponseCache:
+    """Testes para eviction, TTL e estatísticas."""
+
+    def test_get_and_set(self):
+        """Valor guardado é devolvido; ausente retorna MISSING."""
+        cache = make_cache()
+        cache.set("a", "xx")
+        assert cache.get("a") == "xx"
+        assert cache.get("b") is MISSING
+
+    def test_evicts_least_recently_used_only(self):
+        """Passar do orçamento remove só as entradas menos recentes."""
+        cache = make_cache(max_bytes=30)
+        for key in "abc":
+            cache.set(key, "x" * 10)
+        cache.get("a")
+        cache.set("d", "x" * 10)
+        assert cache.keys() == ["c", "a", "d"]
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["bytes"] == 30
+
+    def test_large_entry_evicts_several(self):
+        """Entrada grande libera espaço removendo várias antigas."""
+        cache = make_cache(max_bytes=30)
+        for key in "abc":
+            cache.set(key, "x" * 10)
+        cache.set("d", "x" * 25)
+        assert cache.keys() == ["d"]
+
+    def test_entry_larger_than_budget_is_not_stored(self):
+        """Resposta maior que o orçamento não é guardada nem expulsa as outras."""
+        cache = make_cache(max_bytes=30)
+        cache.set("a", "x" * 10)
+        assert cache.set("b", "x" * 31) is False
+        assert cache.keys() == ["a"]
+        assert cache.stats()["rejected"] == 1
+
+    def test_replacing_key_updates_bytes(self):
+        """Regravar uma chave não conta o tamanho antigo."""
+        cache = make_cache()
+        cache.set("a", "x" * 10)
+        cache.set("a", "x" * 4)
+        assert cache.stats()["bytes"] == 4
+
+    def test_ttl_expiration(self):
+        """Entradas expiram após o TTL."""
+        clock = FakeClock()
+        cache = make_cache(default_ttl=10, clock=clock)
+        cache.set("a", "x")
+        cache.set("b", "x", ttl=60)
+        clock.now = 11
+        assert cache.get("a") is MISSING
+        assert cache.get("b") == "x"
+        assert cache.stats()["expirations"] == 1
+
+    def test_stats_count_hits_and_misses(self):
+        """Acertos e falhas são contabilizados."""
+        cache = make_cache()
+        cache.set("a", "x")
+        cache.get("a")
+        cache.get("a")
+        cache.get("b")
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (2, 1)
+        assert stats["hit_ratio"] == round(2 / 3, 4)
+
+
+class TestCachedEndpoint:
+    """Testes para o decorator."""
+
+    def test_second_call_is_a_hit(self):
+        """Mesma chamada é servida do cache."""
+        calls = []
+
+        @cached_endpoint
+        def endpoint(year=None):
+            calls.append(year)
+            return [year]
+
+        assert endpoint(year=2016).body == endpoint(year=2016).body == b"[2016]"
+        assert calls == [2016]
+
+    def test_hit_returns_cached_bytes_without_encoding(self):
+        """Acerto devolve os bytes guardados sem serializar de novo."""
+        @cached_endpoint
+        def endpoint_bytes():
+            return {"nome": "Ítalo", "valores": [1, 2.5]}
+
+        first = endpoint_bytes()
+        with patch('app.api.encode_json') as encode:
+            second = endpoint_bytes()
+        encode.assert_not_called()
+        assert second.body == first.body
+        assert second.media_type == "application/json"
+        assert second.headers["content-length"] == str(len(first.body))
+
+    def test_body_matches_default_json_response(self):
+        """Corpo em cache é idêntico ao que o FastAPI serializaria."""
+        value = [{"Year": 2016, "USA": 1.0, "name": "Müller"}]
+        assert encode_json(value).body == JSONResponse(value).body
+
+    def test_endpoint_ttl(self):
+        """TTL por endpoint é repassado ao cache."""
+        @cached_endpoint(ttl=30)
+        def endpoint_with_ttl():
+            return {"ok": True}
+
+        endpoint_with_ttl()
+        key = next(k for k in RESPONSE_CACHE.keys() if k.startswith("endpoint_with_ttl"))
+        assert RESPONSE_CACHE._entries[key][2] is not None
+
+
+class TestSingleFlight:
+    """Falhas concorrentes da mesma chave calculam uma única vez."""
+
+    def test_concurrent_misses_compute_once(self):
+        """Uma thread calcula e as outras recebem o mesmo resultado."""
+        cache = make_cache(max_bytes=1000)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "value"
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+        leader.start()
+        started.wait(5)
+        followers = [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+            for _ in range(4)
+        ]
+        for thread in followers:
+            thread.start()
+        while cache.stats()["coalesced"] < 4:
+            time.sleep(0.001)
+        release.set()
+        for thread in [leader] + followers:
+            thread.join(5)
+
+        assert calls == [1]
+        assert results == ["value"] * 5
+        assert cache.stats()["coalesced"] == 4
+        assert cache.stats()["in_flight"] == 0
+
+    def test_error_is_shared_and_not_cached(self):
+        """Exceção do cálculo chega aos que aguardavam e nada é guardado."""
+        cache = make_cache()
+
+        def failing():
+            raise ValueError("falhou")
+
+        with pytest.raises(ValueError):
+            cache.get_or_compute("k", failing)
+        assert "k" not in cache
+        assert cache.get_or_compute("k", lambda: "ok") == "ok"
+
+    def test_different_keys_are_not_coalesced(self):
+        """Chaves diferentes calculam em paralelo."""
+        cache = make_cache()
+        assert cache.get_or_compute("a", lambda: "1") == "1"
+        assert cache.get_or_compute("b", lambda: "2") == "2"
+        assert cache.stats()["coalesced"] == 0
+
+    def test_value_computed_across_clear_is_not_stored(self):
+        """Resultado iniciado antes de um clear (troca do banco) não volta ao cache."""
+        cache = make_cache()
+
+        def compute():
+            cache.clear()
+            return "antigo"
+
+        assert cache.get_or_compute("k", compute) == "antigo"
+        assert "k" not in cache
+
+
+class TestHttpValidators:
+    """ETag, If-None-Match e Cache-Control nos endpoints em cache."""
+
+    @pytest.fixture(autouse=True)
+    def no_database(self):
+        with patch('app.api.data_loader') as mock_loader:
+            mock_loader.get_dataset_version.return_value = "v1"
+            mock_loader.get_connection_context.side_effect = Exception("sem banco")
+            self.loader = mock_loader
+            yield
+
+    def test_response_has_validators(self):
+        """Resposta traz ETag forte e Cache-Control."""
+        response = client.get("/api/stats/gender?year=2016")
+        assert response.headers["etag"].startswith('"')
+        assert response.headers["cache-control"] == config.HTTP_CACHE_CONTROL
+
+    def test_if_none_match_returns_304_without_computing(self):
+        """ETag conhecido é respondido com 304 antes do cálculo."""
+        etag = client.get("/api/stats/gender?year=2016").headers["etag"]
+        RESPONSE_CACHE.clear()
+        with patch('app.api.encode_json') as encode:
+            response = client.get("/api/stats/gender?year=2016", headers={"If-None-Match": f'"x", {etag}'})
+        encode.assert_not_called()
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_weak_and_wildcard_validators(self):
+        """If-None-Match aceita W/ e '*'."""
+        etag = client.get("/api/stats/map").headers["etag"]
+        assert client.get("/api/stats/map", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+        assert client.get("/api/stats/map", headers={"If-None-Match": "*"}).status_code == 304
+
+    def test_etag_follows_canonical_key(self):
+        """Requisições equivalentes têm o mesmo ETag; filtros diferentes, não."""
+        a = client.get("/api/stats/map?season=Both&year=2016").headers["etag"]
+        b = client.get("/api/stats/map?start_year=2016&end_year=2016").headers["etag"]
+        c = client.get("/api/stats/map?year=2012").headers["etag"]
+        assert a == b != c
+
+    def test_etag_changes_with_dataset_version(self):
+        """Nova versão do banco invalida os ETags antigos."""
+        etag = client.get("/api/filters").headers["etag"]
+        self.loader.get_dataset_version.return_value = "v2"
+        response = client.get("/api/filters", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    def test_cache_control_is_configurable(self):
+        """Cache-Control vem da configuração e pode ser omitido."""
+        with patch.object(config, 'HTTP_CACHE_CONTROL', 'no-cache'):
+            assert client.get("/api/filters").headers["cache-control"] == "no-cache"
+        with patch.object(config, 'HTTP_CACHE_CONTROL', ''):
+            assert "cache-control" not in client.get("/api/filters").headers
@@ -0,0 +1,136 @@
+"""Testes para o índice de busca de atletas em memória."""
+import random
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.search_index import SearchIndex, char_matrix, edit_distances, normalize_name
+
+
+@pytest.fixture
+def index():
+    return SearchIndex(pd.DataFrame({
+        'ID': [1, 2, 3, 4, 5, 6, 7],
+        'Name': ['Ítalo Manzine', 'Italo', 'Anna Italo Costa', 'Vitalo Souza', 'italo Borges', 'Bruno Lima', 'Zoë Müller'],
+        'NOC': ['BRA', 'ITA', 'BRA', 'POR', 'BRA', 'BRA', 'GER'],
+        'Sport': ['Judo', 'Rowing', 'Judo', 'Sailing', 'Judo', 'Tennis', 'Swimming'],
+    }))
+
+
+class TestNormalizeName:
+    """Testes para a normalização dos nomes."""
+
+    def test_accents_case_and_spaces(self):
+        """Acentos e maiúsculas são ignorados e espaços colapsados."""
+        assert normalize_name("  Ítalo   MANZINE ") == "italo manzine"
+        assert normalize_name("Zoë Müller") == "zoe muller"
+
+
+class TestSearchIndex:
+    """Testes para a busca."""
+
+    def test_accent_insensitive(self, index):
+        """"Italo" encontra "Ítalo" e "ítalo" encontra "Italo"."""
+        assert 1 in [row[0] for row in index.search("Italo", 10)]
+        assert [row[0] for row in index.search("ítalo", 10)] == [row[0] for row in index.search("ITALO", 10)]
+
+    def test_ranking(self, index):
+        """Igual, prefixo (alfabético), trecho (alfabético)."""
+        assert [row[0] for row in index.search("italo", 10)] == [2, 5, 1, 3, 4]
+
+    def test_limit_and_payload(self, index):
+        """Respeita o limite e devolve (ID, Name, NOC, Sport)."""
+        assert index.search("italo", 2) == [(2, 'Italo', 'ITA', 'Rowing'), (5, 'italo Borges', 'BRA', 'Judo')]
+
+    def test_two_characters_use_bigrams(self, index):
+        """Termos curtos encontram trechos no meio do nome."""
+        assert [row[0] for row in index.search("ll", 10)] == [7]
+        assert [row[0] for row in index.search("za", 10)] == [4]
+
+    def test_grams_present_but_not_contiguous(self, index):
+        """Ter todos os trigramas não basta: o trecho precisa existir."""
+        assert index.search("ita souz", 10) == []
+        assert [row[0] for row in index.search("talo sou", 10)] == [4]
+
+    def test_no_match(self, index):
+        """Termo inexistente ou vazio não retorna nada."""
+        assert index.search("xyz", 10) == []
+        assert index.search("  ", 10) == []
+
+    def test_from_connection_without_fts_table(self, sample_dataframe):
+        """Sem athlete_search, lê os atletas distintos de athletes."""
+        conn = sqlite3.connect(":memory:")
+        pd.concat([sample_dataframe, sample_dataframe]).to_sql('athletes', conn, index=False)
+        index = SearchIndex.from_connection(conn)
+        conn.close()
+        assert len(index) == 10
+        assert [row[0] for row in index.search("athlete c", 5)] == [3]
+
+
+def reference_distance(a, b):
+    """Distância de edição com transposição, implementação direta."""
+    d = [[i + j if i * j == 0 else 0 for j in range(len(b) + 1)] for i in range(len(a) + 1)]
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[len(a)][len(b)]
+
+
+class TestEditDistances:
+    """Testes para a distância de edição vetorizada."""
+
+    def test_matches_reference(self):
+        """Bate com a implementação direta, limitada a max_distance + 1."""
+        rng = random.Random(7)
+        words = ["".join(rng.choices("abcd", k=rng.randint(0, 7))) for _ in range(300)]
+        lengths = np.array([len(word) for word in words])
+        for term in ["abca", "dd", "bacd", "a"]:
+            for max_distance in (1, 2):
+                expected = [min(reference_distance(term, word), max_distance + 1) for word in words]
+                assert edit_distances(term, char_matrix(words), lengths, max_distance).tolist() == expected
+
+    def test_transposition_costs_one(self):
+        """Letras vizinhas trocadas contam como uma edição."""
+        words = ["phelps", "usain"]
+        assert edit_distances("phelsp", char_matrix(words), np.array([6, 5]), 2).tolist()[0] == 1
+        assert edit_distances("usian", char_matrix(words), np.array([6, 5]), 1).tolist()[1] == 1
+
+
+class TestFuzzySearch:
+    """Testes para a busca tolerante a erros de digitação."""
+
+    @pytest.fixture
+    def index(self):
+        return SearchIndex(pd.DataFrame({
+            'ID': [1, 2, 3, 4, 5],
+            'Name': ['Michael Phelps', 'Usain Bolt', 'Ítalo Manzine', 'Michael Johnson', 'Phelps Bolt'],
+            'NOC': ['USA', 'JAM', 'BRA', 'USA', 'GBR'],
+            'Sport': ['Swimming', 'Athletics', 'Judo', 'Athletics', 'Rowing'],
+        }))
+
+    def test_typos_and_word_order(self, index):
+        """Troca de letras e ordem das palavras não impedem o resultado."""
+        assert index.search("Phelsp", 10) == []
+        assert [row[0] for row in index.search("Phelsp", 10, fuzzy=True)] == [1, 5]
+        assert [row[0] for row in index.search("Bolt Usian", 10, fuzzy=True)] == [2]
+        assert [row[0] for row in index.search("Itlao Manzien", 10, fuzzy=True)] == [3]
+
+    def test_exact_results_come_first(self, index):
+        """Resultados exatos antecedem os aproximados, do mais próximo ao mais distante."""
+        assert [row[0] for row in index.search("michael", 10, fuzzy=True)] == [4, 1]
+        positions, distances = index.fuzzy_positions("Micheal Jonhson", 2)
+        assert [index.ids[p] for p in positions] == [4]
+        assert distances.tolist() == [2]
+
+    def test_every_word_must_match(self, index):
+        """Todas as palavras do termo precisam de uma palavra próxima no nome."""
+        assert index.search("Phelsp Xyzzy", 10, fuzzy=True) == []
+
+    def test_max_distance(self, index):
+        """max_distance=0 só aceita palavras exatas."""
+        assert index.search("Phelsp", 10, fuzzy=True, max_distance=0) == []
+        assert [row[0] for row in index.search("Bolt Usain", 10, fuzzy=True, max_distance=0)] == [2]
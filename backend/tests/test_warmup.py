@@ -0,0 +1,143 @@
+"""Testes para o aquecimento do cache e a prontidão."""
+import threading
+import time
+
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app import config
+from app.api import RESPONSE_CACHE, get_top_athletes
+from app.main import app
+from app.warmup import CacheWarmer, call_kwargs, warmup_combinations
+
+client = TestClient(app)
+
+YEAR_SEASON_MAP = {2016: ['Summer'], 2014: ['Winter'], 1992: ['Summer', 'Winter']}
+
+
+class TestWarmupCombinations:
+    """Testes para a geração das combinações."""
+
+    def test_all_kinds(self):
+        """Sem filtro, cada ano, cada edição, cada temporada e cada sexo."""
+        combos = warmup_combinations(YEAR_SEASON_MAP, ["unfiltered", "years", "games", "seasons", "sexes"])
+        assert combos[0] == {}
+        assert {"year": 1992, "season": "Winter"} in combos
+        assert {"year": 2014} in combos
+        assert {"season": "Summer"} in combos and {"season": "Winter"} in combos
+        assert {"sex": "F"} in combos and {"sex": "M"} in combos
+        assert len(combos) == 1 + 3 + 4 + 2 + 2
+
+    def test_selected_kinds(self):
+        """Só os grupos configurados são gerados."""
+        assert warmup_combinations(YEAR_SEASON_MAP, ["sexes"]) == [{"sex": "F"}, {"sex": "M"}]
+
+
+class TestCallKwargs:
+    """Testes para os argumentos das chamadas diretas."""
+
+    def test_query_defaults_are_resolved(self):
+        """Padrões declarados com Query viram valores simples."""
+        kwargs = call_kwargs(get_top_athletes, {"year": 2016, "unknown": 1})
+        assert kwargs["limit"] == 10
+        assert kwargs["year"] == 2016
+        assert "unknown" not in kwargs
+        assert "request" not in kwargs
+
+
+class TestCacheWarmer:
+    """Testes para a execução do aquecimento."""
+
+    def test_run_fills_cache(self, use_sample_db):
+        """Após o aquecimento, a tela inicial já está em cache."""
+        warmer = CacheWarmer()
+        with patch.object(config, 'WARMUP_ENDPOINTS', ["map", "gender"]), \
+                patch.object(config, 'WARMUP_COMBINATIONS', ["unfiltered", "years"]):
+            warmer.run()
+        status = warmer.status()
+        assert status["status"] == "done"
+        assert status["ready"] is True
+        assert status["completed"] == status["total"] == 2 * 4
+        assert status["progress"] == 1.0
+
+        hits = RESPONSE_CACHE.stats()["hits"]
+        assert client.get("/api/stats/map?year=2016").status_code == 200
+        assert RESPONSE_CACHE.stats()["hits"] == hits + 1
+
+    def test_equivalent_tasks_are_deduplicated(self, use_sample_db):
+        """Combinações com a mesma chave de cache rodam uma vez."""
+        warmer = CacheWarmer()
+        with patch.object(config, 'WARMUP_ENDPOINTS', ["evolution"]), \
+                patch.object(config, 'WARMUP_COMBINATIONS', ["unfiltered", "years"]):
+            assert len(warmer.tasks()) == 1
+
+    def test_parallelism_is_bounded(self):
+        """Nunca há mais tarefas simultâneas que workers."""
+        running, peak = [0], [0]
+        lock = threading.Lock()
+
+        def slow(**kwargs):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+
+        warmer = CacheWarmer()
+        tasks = [(slow, {}) for _ in range(12)]
+        with patch.object(config, 'WARMUP_WORKERS', 3), \
+                patch.object(CacheWarmer, 'tasks', return_value=tasks), \
+                patch('app.warmup.api.get_filters'):
+            warmer.run()
+        assert warmer.status()["completed"] == 12
+        assert peak[0] <= 3
+
+    def test_failures_are_counted(self):
+        """Erro em uma tarefa não interrompe o aquecimento."""
+        def failing(**kwargs):
+            raise RuntimeError("falhou")
+
+        warmer = CacheWarmer()
+        with patch.object(CacheWarmer, 'tasks', return_value=[(failing, {}), (lambda **kw: None, {})]), \
+                patch('app.warmup.api.get_filters'):
+            warmer.run()
+        status = warmer.status()
+        assert (status["completed"], status["failed"]) == (1, 1)
+        assert status["ready"] is True
+
+
+class TestReadiness:
+    """Testes para /health/ready."""
+
+    def test_not_ready_before_warmup(self):
+        """Antes do aquecimento a instância responde 503."""
+        with patch('app.main.cache_warmer', CacheWarmer()):
+            response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["ready"] is False
+
+    def test_ready_after_warmup(self):
+        """Com o aquecimento concluído responde 200 e o progresso."""
+        warmer = CacheWarmer()
+        with patch.object(CacheWarmer, 'tasks', return_value=[]), patch('app.warmup.api.get_filters'):
+            warmer.run()
+        with patch('app.main.cache_warmer', warmer):
+            response = client.get("/health/ready")
+        assert response.status_code == 200
+        assert response.json()["warmup"]["status"] == "done"
+
+    def test_not_ready_when_warmup_crashes(self):
+        """Se o aquecimento falha por inteiro, a instância segue respondendo 503."""
+        warmer = CacheWarmer()
+        with patch('app.warmup.api.get_filters', side_effect=RuntimeError("sem banco")):
+            warmer.run()
+        with patch('app.main.cache_warmer', warmer):
+            response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["warmup"]["status"] == "failed"
+
+    def test_ready_when_warmup_disabled(self):
+        """Sem aquecimento configurado a instância fica pronta de imediato."""
+        with patch.object(config, 'WARMUP_ENABLED', False), patch('app.main.cache_warmer', CacheWarmer()):
+            assert client.get("/health/ready").status_code == 200
@@ -18,14 +18,8 @@ Object.defineProperty(window, 'localStorage', { value: localStorageMock });
 // Mock API
 jest.mock('../../lib/api', () => ({
   fetchFilters: jest.fn(),
-  fetchMapStats: jest.fn(),
-  fetchBiometrics: jest.fn(),
-  fetchEvolution: jest.fn(),
-  fetchMedalTable: jest.fn(),
-  fetchTopAthletes: jest.fn(),
-  fetchGenderStats: jest.fn(),
-  fetchAthleteProfile: jest.fn(),
-  fetchAthleteStats: jest.fn(),
+  fetchDashboard: jest.fn(),
+  fetchAthleteFull: jest.fn(),
   searchAthletes: jest.fn(),
 }));
 
@@ -117,25 +111,23 @@ jest.mock('../../components/AthleteProfileCard', () => {
 
 import {
   fetchFilters,
-  fetchMapStats,
-  fetchBiometrics,
-  fetchEvolution,
-  fetchMedalTable,
-  fetchTopAthletes,
-  fetchGenderStats,
-  fetchAthleteProfile,
-  fetchAthleteStats,
+  fetchDashboard,
+  fetchAthleteFull,
 } from '../../lib/api';
 
 const mockFetchFilters = fetchFilters as jest.Mock;
-const mockFetchMapStats = fetchMapStats as jest.Mock;
-const mockFetchBiometrics = fetchBiometrics as jest.Mock;
-const mockFetchEvolution = fetchEvolution as jest.Mock;
-const mockFetchMedalTable = fetchMedalTable as jest.Mock;
-const mockFetchTopAthletes = fetchTopAthletes as jest.Mock;
-const mockFetchGenderStats = fetchGenderStats as jest.Mock;
-const mockFetchAthleteProfile = fetchAthleteProfile as jest.Mock;
-const mockFetchAthleteStats = fetchAthleteStats as jest.Mock;
+const mockFetchDashboard = fetchDashboard as jest.Mock;
+const mockFetchAthleteFull = fetchAthleteFull as jest.Mock;
+
+// Resposta de /stats/dashboard sem dados, sobrescrita por campo nos testes
+const emptyDashboard = {
+  map: [],
+  medals: [],
+  evolution: [],
+  gender: [],
+  top_athletes: [],
+  biometrics: { population: 0, points: [] },
+};
 
 describe('Dashboard', () => {
   const mockFiltersData = {
@@ -181,11 +173,14 @@ describe('Dashboard', () => {
     jest.clearAllMocks();
     jest.useFakeTimers();
     mockFetchFilters.mockResolvedValue(mockFiltersData);
-    mockFetchMapStats.mockResolvedValue(mockMapData);
-    mockFetchBiometrics.mockResolvedValue(mockBiometricsData);
-    mockFetchEvolution.mockResolvedValue(mockEvolutionData);
-    mockFetchMedalTable.mockResolvedValue(mockMedalTableData);
-    mockFetchTopAthletes.mockResolvedValue(mockTopAthletesData);
+    mockFetchDashboard.mockResolvedValue({
+      ...emptyDashboard,
+      map: mockMapData,
+      medals: mockMedalTableData,
+      evolution: mockEvolutionData,
+      top_athletes: mockTopAthletesData,
+      biometrics: { population: mockBiometricsData.length, points: mockBiometricsData },
+    });
   });
 
   afterEach(() => {
@@ -298,12 +293,7 @@ describe('Dashboard with user interactions', () => {
     jest.clearAllMocks();
     jest.useFakeTimers();
     (fetchFilters as jest.Mock).mockResolvedValue(mockFiltersData);
-    (fetchMapStats as jest.Mock).mockResolvedValue([]);
-    (fetchBiometrics as jest.Mock).mockResolvedValue([]);
-    (fetchEvolution as jest.Mock).mockResolvedValue([]);
-    (fetchMedalTable as jest.Mock).mockResolvedValue([]);
-    (fetchTopAthletes as jest.Mock).mockResolvedValue([]);
-    (fetchGenderStats as jest.Mock).mockResolvedValue([]);
+    (fetchDashboard as jest.Mock).mockResolvedValue(emptyDashboard);
   });
 
   afterEach(() => {
@@ -437,7 +427,7 @@ describe('Dashboard with user interactions', () => {
     });
 
     // Store initial call count
-    const callsBefore = (fetchMapStats as jest.Mock).mock.calls.length;
+    const callsBefore = (fetchDashboard as jest.Mock).mock.calls.length;
 
     // Change filter and change back - should use cache
     await act(async () => {
@@ -455,12 +445,7 @@ describe('Dashboard year filtering', () => {
   beforeEach(() => {
     jest.clearAllMocks();
     jest.useFakeTimers();
-    (fetchMapStats as jest.Mock).mockResolvedValue([]);
-    (fetchBiometrics as jest.Mock).mockResolvedValue([]);
-    (fetchEvolution as jest.Mock).mockResolvedValue([]);
-    (fetchMedalTable as jest.Mock).mockResolvedValue([]);
-    (fetchTopAthletes as jest.Mock).mockResolvedValue([]);
-    (fetchGenderStats as jest.Mock).mockResolvedValue([]);
+    (fetchDashboard as jest.Mock).mockResolvedValue(emptyDashboard);
   });
 
   afterEach(() => {
@@ -576,14 +561,8 @@ describe('Dashboard athlete selection', () => {
     jest.clearAllMocks();
     jest.useFakeTimers();
     (fetchFilters as jest.Mock).mockResolvedValue(mockFiltersData);
-    (fetchMapStats as jest.Mock).mockResolvedValue([]);
-    (fetchBiometrics as jest.Mock).mockResolvedValue([]);
-    (fetchEvolution as jest.Mock).mockResolvedValue([]);
-    (fetchMedalTable as jest.Mock).mockResolvedValue([]);
-    (fetchTopAthletes as jest.Mock).mockResolvedValue([]);
-    (fetchGenderStats as jest.Mock).mockResolvedValue([]);
-    mockFetchAthleteProfile.mockResolvedValue(mockAthleteProfile);
-    mockFetchAthleteStats.mockResolvedValue(mockAthleteStats);
+    (fetchDashboard as jest.Mock).mockResolvedValue(emptyDashboard);
+    mockFetchAthleteFull.mockResolvedValue({ ...mockAthleteProfile, ...mockAthleteStats });
   });
 
   afterEach(() => {
@@ -627,9 +606,8 @@ describe('Dashboard athlete selection', () => {
       await Promise.resolve();
     });
 
-    // Profile and stats should be fetched
-    expect(mockFetchAthleteProfile).toHaveBeenCalledWith(1);
-    expect(mockFetchAthleteStats).toHaveBeenCalledWith(1);
+    // Profile and stats should be fetched in one request
+    expect(mockFetchAthleteFull).toHaveBeenCalledWith(1);
   });
 
   it('should show athlete profile card after loading', async () => {
@@ -694,7 +672,7 @@ describe('Dashboard athlete selection', () => {
 
   it('should handle error when loading athlete profile', async () => {
     const consoleSpy = jest.spyOn(console, 'error').mockImplementation(() => {});
-    mockFetchAthleteProfile.mockRejectedValue(new Error('Failed to load athlete'));
+    mockFetchAthleteFull.mockRejectedValue(new Error('Failed to load athlete'));
     
     const user = userEvent.setup({ advanceTimers: jest.advanceTimersByTime });
     
@@ -773,12 +751,7 @@ describe('Dashboard timeline player', () => {
     jest.clearAllMocks();
     jest.useFakeTimers();
     (fetchFilters as jest.Mock).mockResolvedValue(mockFiltersData);
-    (fetchMapStats as jest.Mock).mockResolvedValue([]);
-    (fetchBiometrics as jest.Mock).mockResolvedValue([]);
-    (fetchEvolution as jest.Mock).mockResolvedValue([]);
-    (fetchMedalTable as jest.Mock).mockResolvedValue([]);
-    (fetchTopAthletes as jest.Mock).mockResolvedValue([]);
-    (fetchGenderStats as jest.Mock).mockResolvedValue([]);
+    (fetchDashboard as jest.Mock).mockResolvedValue(emptyDashboard);
   });
 
   afterEach(() => {
@@ -966,12 +939,7 @@ describe('Dashboard medal type badges', () => {
     jest.clearAllMocks();
     jest.useFakeTimers();
     (fetchFilters as jest.Mock).mockResolvedValue(mockFiltersData);
-    (fetchMapStats as jest.Mock).mockResolvedValue([]);
-    (fetchBiometrics as jest.Mock).mockResolvedValue([]);
-    (fetchEvolution as jest.Mock).mockResolvedValue([]);
-    (fetchMedalTable as jest.Mock).mockResolvedValue([]);
-    (fetchTopAthletes as jest.Mock).mockResolvedValue([]);
-    (fetchGenderStats as jest.Mock).mockResolvedValue([]);
+    (fetchDashboard as jest.Mock).mockResolvedValue(emptyDashboard);
   });
 
   afterEach(() => {
@@ -1075,12 +1043,10 @@ describe('Dashboard playback and prefetch', () => {
     jest.clearAllMocks();
     jest.useFakeTimers();
     (fetchFilters as jest.Mock).mockResolvedValue(mockFiltersData);
-    (fetchMapStats as jest.Mock).mockResolvedValue([{ id: 'USA', total: 100, gold: 50, silver: 30, bronze: 20 }]);
-    (fetchBiometrics as jest.Mock).mockResolvedValue([]);
-    (fetchEvolution as jest.Mock).mockResolvedValue([]);
-    (fetchMedalTable as jest.Mock).mockResolvedValue([]);
-    (fetchTopAthletes as jest.Mock).mockResolvedValue([]);
-    (fetchGenderStats as jest.Mock).mockResolvedValue([]);
+    (fetchDashboard as jest.Mock).mockResolvedValue({
+      ...emptyDashboard,
+      map: [{ id: 'USA', total: 100, gold: 50, silver: 30, bronze: 20 }],
+    });
   });
 
   afterEach(() => {
@@ -1131,8 +1097,8 @@ describe('Dashboard playback and prefetch', () => {
 
   it('should handle loading state during playback', async () => {
     // Make fetch slow
-    (fetchMapStats as jest.Mock).mockImplementation(() => 
-      new Promise(resolve => setTimeout(() => resolve([]), 2000))
+    (fetchDashboard as jest.Mock).mockImplementation(() => 
+      new Promise(resolve => setTimeout(() => resolve(emptyDashboard), 2000))
     );
     
     const user = userEvent.setup({ advanceTimers: jest.advanceTimersByTime });
@@ -1185,12 +1151,7 @@ describe('Dashboard error states during data fetch', () => {
       countries: [{ code: 'All', label: 'All' }],
       year_season_map: { 2000: ['Summer'], 2004: ['Summer'] },
     });
-    (fetchMapStats as jest.Mock).mockResolvedValue([]);
-    (fetchBiometrics as jest.Mock).mockResolvedValue([]);
-    (fetchEvolution as jest.Mock).mockResolvedValue([]);
-    (fetchMedalTable as jest.Mock).mockResolvedValue([]);
-    (fetchTopAthletes as jest.Mock).mockResolvedValue([]);
-    (fetchGenderStats as jest.Mock).mockResolvedValue([]);
+    (fetchDashboard as jest.Mock).mockResolvedValue(emptyDashboard);
     
     const user = userEvent.setup({ advanceTimers: jest.advanceTimersByTime });
     
@@ -1211,19 +1172,7 @@ describe('Dashboard error states during data fetch', () => {
     
     if (playButton) {
       // Make next fetch fail before clicking play
-      (fetchMapStats as jest.Mock).mockImplementation(() => 
-        Promise.reject(new Error('Network error'))
-      );
-      (fetchBiometrics as jest.Mock).mockImplementation(() => 
-        Promise.reject(new Error('Network error'))
-      );
-      (fetchMedalTable as jest.Mock).mockImplementation(() => 
-        Promise.reject(new Error('Network error'))
-      );
-      (fetchTopAthletes as jest.Mock).mockImplementation(() => 
-        Promise.reject(new Error('Network error'))
-      );
-      (fetchGenderStats as jest.Mock).mockImplementation(() => 
+      (fetchDashboard as jest.Mock).mockImplementation(() => 
         Promise.reject(new Error('Network error'))
       );
       
@@ -2,12 +2,17 @@ import {
   fetchFilters,
   fetchMapStats,
   fetchBiometrics,
+  fetchBiometricSample,
+  fetchBiometricBins,
   fetchEvolution,
   fetchMedalTable,
   fetchTopAthletes,
+  fetchDashboard,
   searchAthletes,
   fetchAthleteProfile,
   fetchAthleteStats,
+  fetchAthleteFull,
+  fetchAthletesBatch,
   FilterState,
 } from '../../lib/api';
 
@@ -152,19 +157,54 @@ describe('API Module', () => {
       const mockData = [{ Name: 'Athlete1', Height: 180, Weight: 75 }];
       mockFetch.mockResolvedValueOnce({
         ok: true,
-        json: () => Promise.resolve(mockData),
+        json: () => Promise.resolve({ population: 1, points: mockData }),
       });
 
       const result = await fetchBiometrics({ year: 2016 });
       expect(result).toEqual(mockData);
     });
 
+    it('should request the sample size and return the population', async () => {
+      const mockData = { population: 5000, points: [{ Name: 'Athlete1', Height: 180, Weight: 75 }] };
+      mockFetch.mockResolvedValueOnce({
+        ok: true,
+        json: () => Promise.resolve(mockData),
+      });
+
+      const result = await fetchBiometricSample({ year: 2016 }, 500);
+      expect(result).toEqual(mockData);
+      expect(mockFetch).toHaveBeenCalledWith(
+        expect.stringContaining('/stats/biometrics?year=2016&sample_size=500')
+      );
+    });
+
     it('should throw error on failure', async () => {
       mockFetch.mockResolvedValueOnce({ ok: false });
       await expect(fetchBiometrics({})).rejects.toThrow('Failed to fetch biometrics');
     });
   });
 
+  describe('fetchBiometricBins', () => {
+    it('should request the height x weight grid', async () => {
+      const mockData = { height_bin: 5, weight_bin: 2, population: 1, bins: [] };
+      mockFetch.mockResolvedValueOnce({
+        ok: true,
+        json: () => Promise.resolve(mockData),
+      });
+
+      const result = await fetchBiometricBins({ year: 2016 }, 5, 2);
+      expect(result).toEqual(mockData);
+      expect(mockFetch).toHaveBeenCalledWith(
+        expect.stringContaining('/stats/biometrics?year=2016&mode=bins&height_bin=5&weight_bin=2')
+      );
+    });
+
+    it('should throw error on failure', async () => {
+      mockFetch.mockResolvedValueOnce({ ok: false });
+      await expect(fetchBiometricBins({})).rejects.toThrow('Failed to fetch biometric bins');
+    });
+  });
+
   describe('fetchEvolution', () => {
     it('should fetch evolution successfully', async () => {
       const mockData = [{ Year: 2016, USA: 100 }];
@@ -242,6 +282,28 @@ describe('API Module', () => {
     });
   });
 
+  describe('fetchDashboard', () => {
+    it('should fetch all charts in one request', async () => {
+      const mockData = { map: [], medals: [], evolution: [], gender: [], top_athletes: [], biometrics: { population: 0, points: [] } };
+      mockFetch.mockResolvedValueOnce({
+        ok: true,
+        json: () => Promise.resolve(mockData),
+      });
+
+      const result = await fetchDashboard({ year: 2016, medal_type: 'Gold' });
+      expect(result).toEqual(mockData);
+      expect(mockFetch).toHaveBeenCalledTimes(1);
+      expect(mockFetch).toHaveBeenCalledWith(
+        'http://localhost:8000/api/stats/dashboard?year=2016&medal_type=Gold&limit=10'
+      );
+    });
+
+    it('should throw error on failure', async () => {
+      mockFetch.mockResolvedValueOnce({ ok: false });
+      await expect(fetchDashboard({})).rejects.toThrow('Failed to fetch dashboard');
+    });
+  });
+
   describe('searchAthletes', () => {
     it('should return empty array for short query', async () => {
       const result = await searchAthletes('A');
@@ -259,7 +321,7 @@ describe('API Module', () => {
       const result = await searchAthletes('Michael');
       expect(result).toEqual(mockData);
       expect(mockFetch).toHaveBeenCalledWith(
-        'http://localhost:8000/api/athletes/search?query=Michael&limit=20'
+        'http://localhost:8000/api/athletes/search?query=Michael&limit=20&fuzzy=true'
       );
     });
 
@@ -306,4 +368,52 @@ describe('API Module', () => {
       await expect(fetchAthleteStats(1)).rejects.toThrow('Failed to fetch athlete stats');
     });
   });
+
+  describe('fetchAthletesBatch', () => {
+    it('should post the ids and return profiles keyed by id', async () => {
+      const mockData = { '1': { id: 1, name: 'Michael Phelps' } };
+      mockFetch.mockResolvedValueOnce({
+        ok: true,
+        json: () => Promise.resolve(mockData),
+      });
+
+      const result = await fetchAthletesBatch([1, 2]);
+      expect(result).toEqual(mockData);
+      expect(mockFetch).toHaveBeenCalledWith('http://localhost:8000/api/athletes/batch', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ ids: [1, 2] }),
+      });
+    });
+
+    it('should not call the API without ids', async () => {
+      const result = await fetchAthletesBatch([]);
+      expect(result).toEqual({});
+      expect(mockFetch).not.toHaveBeenCalled();
+    });
+
+    it('should throw error on failure', async () => {
+      mockFetch.mockResolvedValueOnce({ ok: false });
+      await expect(fetchAthletesBatch([1])).rejects.toThrow('Failed to fetch athletes');
+    });
+  });
+
+  describe('fetchAthleteFull', () => {
+    it('should fetch profile and stats in one request', async () => {
+      const mockData = { id: 1, name: 'Michael Phelps', evolution: [], medals_by_sport: [] };
+      mockFetch.mockResolvedValueOnce({
+        ok: true,
+        json: () => Promise.resolve(mockData),
+      });
+
+      const result = await fetchAthleteFull(1);
+      expect(result).toEqual(mockData);
+      expect(mockFetch).toHaveBeenCalledWith('http://localhost:8000/api/athletes/1/full');
+    });
+
+    it('should throw error on failure', async () => {
+      mockFetch.mockResolvedValueOnce({ ok: false });
+      await expect(fetchAthleteFull(1)).rejects.toThrow('Failed to fetch athlete');
+    });
+  });
 });
@@ -1,7 +1,7 @@
 "use client";
 
 import React, { useEffect, useState, useRef, useMemo, useTransition } from "react";
-import { fetchFilters, fetchMapStats, fetchBiometrics, fetchEvolution, fetchMedalTable, fetchTopAthletes, fetchGenderStats, FilterState, MedalStat, AthleteSearchResult, AthleteProfile, AthleteStats, TopAthlete, GenderStat, fetchAthleteProfile, fetchAthleteStats } from "../lib/api";
+import { fetchFilters, fetchDashboard, DashboardData, BiometricPoint, FilterState, MedalStat, AthleteSearchResult, AthleteProfile, AthleteStats, TopAthlete, GenderStat, fetchAthleteFull } from "../lib/api";
 import WorldMap from "./charts/WorldMap";
 import BiometricsChart from "./charts/BiometricsChart";
 import EvolutionChart from "./charts/EvolutionChart";
@@ -50,6 +50,18 @@ function setCachedData(key: string, data: any) {
   dataCache.set(key, { data, timestamp: Date.now() });
 }
 
+// Converte a resposta de /stats/dashboard para o formato guardado no cache
+function toChartData(res: DashboardData) {
+  return {
+    map: res.map,
+    bio: res.biometrics.points,
+    evo: res.evolution,
+    table: res.medals,
+    topAthletes: res.top_athletes,
+    gender: res.gender
+  };
+}
+
 export default function Dashboard() {
   const { t, tSport, tCountry } = useLanguage();
   const [loading, setLoading] = useState(true);
@@ -82,9 +94,9 @@ export default function Dashboard() {
   const [athleteProfile, setAthleteProfile] = useState<AthleteProfile | null>(null);
   const [athleteStats, setAthleteStats] = useState<AthleteStats | null>(null);
 
-  const [mapData, setMapData] = useState([]);
-  const [biometricsData, setBiometricsData] = useState([]);
-  const [evolutionData, setEvolutionData] = useState([]);
+  const [mapData, setMapData] = useState<DashboardData["map"]>([]);
+  const [biometricsData, setBiometricsData] = useState<BiometricPoint[]>([]);
+  const [evolutionData, setEvolutionData] = useState<DashboardData["evolution"]>([]);
   const [medalTableData, setMedalTableData] = useState<MedalStat[]>([]); 
   const [topAthletesData, setTopAthletesData] = useState<TopAthlete[]>([]);
   const [genderData, setGenderData] = useState<GenderStat[]>([]);
@@ -106,12 +118,9 @@ export default function Dashboard() {
   useEffect(() => {
     if (selectedAthlete) {
       setLoading(true);
-      Promise.all([
-        fetchAthleteProfile(selectedAthlete.id),
-        fetchAthleteStats(selectedAthlete.id)
-      ]).then(([profile, stats]) => {
-        setAthleteProfile(profile);
-        setAthleteStats(stats);
+      fetchAthleteFull(selectedAthlete.id).then(athlete => {
+        setAthleteProfile(athlete);
+        setAthleteStats(athlete);
         setLoading(false);
       }).catch(err => {
         console.error('Erro ao carregar atleta:', err);
@@ -205,82 +214,25 @@ export default function Dashboard() {
       });
       
       try {
-        const evolutionFilters = { ...debouncedFilters, year: undefined };
-        const evolutionCacheKey = getCacheKey(evolutionFilters);
-        let evoRes = getCachedData(evolutionCacheKey);
-        
-        // Carregar dados em paralelo mas atualizar UI conforme chegam
-        const mapPromise = fetchMapStats(debouncedFilters);
-        const bioPromise = fetchBiometrics(debouncedFilters);
-        const tablePromise = fetchMedalTable(debouncedFilters);
-        const topAthletesPromise = fetchTopAthletes(debouncedFilters);
-        const genderPromise = fetchGenderStats(debouncedFilters);
-        
-        let evoPromise: Promise<any> | null = null;
-        if (!evoRes) {
-           evoPromise = fetchEvolution(evolutionFilters);
-        } else {
-          // Se já temos cache, atualiza imediatamente
-          setEvolutionData(evoRes);
-          setLoadingStates(prev => ({ ...prev, evolution: false }));
-        }
-
-        // Atualizar cada componente assim que seus dados chegarem
-        mapPromise.then(res => {
-          setMapData(res);
-          setLoadingStates(prev => ({ ...prev, map: false }));
-        }).catch(() => {
-          setLoadingStates(prev => ({ ...prev, map: false }));
-        });
-        
-        bioPromise.then(res => {
-          setBiometricsData(res);
-          setLoadingStates(prev => ({ ...prev, biometrics: false }));
-        }).catch(() => {
-          setLoadingStates(prev => ({ ...prev, biometrics: false }));
-        });
-        
-        tablePromise.then(res => {
-          setMedalTableData(res);
-          setLoadingStates(prev => ({ ...prev, medals: false }));
-        }).catch(() => {
-          setLoadingStates(prev => ({ ...prev, medals: false }));
-        });
-        
-        topAthletesPromise.then(res => {
-          setTopAthletesData(res);
-          setLoadingStates(prev => ({ ...prev, topAthletes: false }));
-        }).catch(() => {
-          setLoadingStates(prev => ({ ...prev, topAthletes: false }));
-        });
+        // Uma única requisição traz os seis gráficos do filtro
+        const data = toChartData(await fetchDashboard(debouncedFilters));
         
-        genderPromise.then(res => {
-          setGenderData(res);
-          setLoadingStates(prev => ({ ...prev, gender: false }));
-        }).catch(() => {
-          setLoadingStates(prev => ({ ...prev, gender: false }));
+        setMapData(data.map);
+        setBiometricsData(data.bio);
+        setEvolutionData(data.evo);
+        setMedalTableData(data.table);
+        setTopAthletesData(data.topAthletes);
+        setGenderData(data.gender);
+        setLoadingStates({
+          map: false,
+          biometrics: false,
+          evolution: false,
+          medals: false,
+          topAthletes: false,
+          gender: false
         });
         
-        if (evoPromise) {
-          evoPromise.then(res => {
-            setEvolutionData(res);
-            setCachedData(evolutionCacheKey, res);
-            setLoadingStates(prev => ({ ...prev, evolution: false }));
-          }).catch(() => {
-            setLoadingStates(prev => ({ ...prev, evolution: false }));
-          });
-        }
-
-        // Aguardar todas as promises para cache e prefetch
-        const [mapRes, bioRes, tableRes, topAthletesRes, genderRes] = await Promise.all([
-          mapPromise, bioPromise, tablePromise, topAthletesPromise, genderPromise
-        ]);
-        
-        if (evoPromise) {
-            evoRes = await evoPromise;
-        }
-        
-        setCachedData(cacheKey, { map: mapRes, bio: bioRes, evo: evoRes, table: tableRes, topAthletes: topAthletesRes, gender: genderRes });
+        setCachedData(cacheKey, data);
         
         // Prefetch do próximo ano durante playback
         if (isPlaying) {
@@ -292,14 +244,8 @@ export default function Dashboard() {
             const nextCacheKey = getCacheKey(nextFilters);
             
             if (!getCachedData(nextCacheKey)) {
-              Promise.all([
-                fetchMapStats(nextFilters),
-                fetchBiometrics(nextFilters),
-                fetchMedalTable(nextFilters),
-                fetchTopAthletes(nextFilters),
-                fetchGenderStats(nextFilters)
-              ]).then(([mapR, bioR, tableR, topAthR, genderR]) => {
-                setCachedData(nextCacheKey, { map: mapR, bio: bioR, evo: evoRes, table: tableR, topAthletes: topAthR, gender: genderR });
+              fetchDashboard(nextFilters).then(res => {
+                setCachedData(nextCacheKey, toChartData(res));
               }).catch(() => {});
             }
           }
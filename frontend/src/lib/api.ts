@@ -53,13 +53,65 @@ export async function fetchMapStats(filters: FilterState) {
   return res.json();
 }
 
-export async function fetchBiometrics(filters: FilterState) {
+export interface BiometricPoint {
+  Name: string;
+  Sex: string;
+  Height: number;
+  Weight: number;
+  Medal: string;
+  NOC: string;
+  Year: number;
+  Sport: string;
+}
+
+export interface BiometricSample {
+  population: number;
+  points: BiometricPoint[];
+}
+
+export async function fetchBiometricSample(filters: FilterState, sampleSize?: number): Promise<BiometricSample> {
   const params = buildParams(filters);
+  if (sampleSize) params.append("sample_size", sampleSize.toString());
   const res = await fetch(`${API_BASE_URL}/stats/biometrics?${params}`);
   if (!res.ok) throw new Error("Failed to fetch biometrics");
   return res.json();
 }
 
+export async function fetchBiometrics(filters: FilterState) {
+  const sample = await fetchBiometricSample(filters);
+  return sample.points;
+}
+
+export interface BiometricBin {
+  height: number;
+  weight: number;
+  count: number;
+  gold: number;
+  silver: number;
+  bronze: number;
+}
+
+export interface BiometricBins {
+  height_bin: number;
+  weight_bin: number;
+  population: number;
+  bins: BiometricBin[];
+}
+
+export async function fetchBiometricBins(
+  filters: FilterState,
+  heightBin?: number,
+  weightBin?: number
+): Promise<BiometricBins> {
+  const params = buildParams(filters);
+  params.append("mode", "bins");
+  if (heightBin) params.append("height_bin", heightBin.toString());
+  if (weightBin) params.append("weight_bin", weightBin.toString());
+  const res = await fetch(`${API_BASE_URL}/stats/biometrics?${params}`);
+  if (!res.ok) throw new Error("Failed to fetch biometric bins");
+  return res.json();
+}
+
 export async function fetchEvolution(filters: FilterState, countries?: string[]) {
   const params = buildParams(filters);
   if (countries) {
@@ -108,6 +160,23 @@ export async function fetchGenderStats(filters: FilterState): Promise<GenderStat
   return res.json();
 }
 
+export interface DashboardData {
+  map: { id: string; gold: number; silver: number; bronze: number; total: number }[];
+  medals: MedalStat[];
+  evolution: { Year: number; [key: string]: number }[];
+  gender: GenderStat[];
+  top_athletes: TopAthlete[];
+  biometrics: BiometricSample;
+}
+
+export async function fetchDashboard(filters: FilterState, limit: number = 10): Promise<DashboardData> {
+  const params = buildParams(filters);
+  params.append("limit", limit.toString());
+  const res = await fetch(`${API_BASE_URL}/stats/dashboard?${params}`);
+  if (!res.ok) throw new Error("Failed to fetch dashboard");
+  return res.json();
+}
+
 export interface AthleteSearchResult {
   id: number;
   name: string;
@@ -161,7 +230,7 @@ export interface AthleteStats {
 
 export async function searchAthletes(query: string): Promise<AthleteSearchResult[]> {
   if (query.length < 2) return [];
-  const res = await fetch(`${API_BASE_URL}/athletes/search?query=${encodeURIComponent(query)}&limit=20`);
+  const res = await fetch(`${API_BASE_URL}/athletes/search?query=${encodeURIComponent(query)}&limit=20&fuzzy=true`);
   if (!res.ok) throw new Error("Failed to search athletes");
   return res.json();
 }
@@ -177,3 +246,22 @@ export async function fetchAthleteStats(athleteId: number): Promise<AthleteStats
   if (!res.ok) throw new Error("Failed to fetch athlete stats");
   return res.json();
 }
+
+export async function fetchAthletesBatch(athleteIds: number[]): Promise<Record<string, AthleteProfile>> {
+  if (athleteIds.length === 0) return {};
+  const res = await fetch(`${API_BASE_URL}/athletes/batch`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ ids: athleteIds }),
+  });
+  if (!res.ok) throw new Error("Failed to fetch athletes");
+  return res.json();
+}
+
+export type AthleteFull = AthleteProfile & AthleteStats;
+
+export async function fetchAthleteFull(athleteId: number): Promise<AthleteFull> {
+  const res = await fetch(`${API_BASE_URL}/athletes/${athleteId}/full`);
+  if (!res.ok) throw new Error("Failed to fetch athlete");
+  return res.json();
+}